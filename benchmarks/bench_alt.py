@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Landmark (ALT) A* against Manhattan A*: table build and load times, expansions and query times
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agent import calculate_path_cost
+from environment import load_map_from_file
+from landmarks import LandmarkTable
+from map_format import sections_from_environment, write_binary_map
+from planners.informed import ALTAStarPlanner, AStarPlanner
+from scenarios import ScenarioSpec, generate_environment, generate_queries
+
+def timed(planner, queries):
+    nodes, costs = 0, []
+    started = time.perf_counter()
+    for start, goal in queries:
+        path = planner.plan(start, goal)
+        nodes += planner.nodes_expanded
+        costs.append(calculate_path_cost(planner.env, path) if path else None)
+    return time.perf_counter() - started, nodes, costs
+
+def main():
+    parser = argparse.ArgumentParser(description='ALT heuristic benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[64, 128, 256])
+    parser.add_argument('--landmarks', type=int, default=8)
+    parser.add_argument('--queries', type=int, default=10)
+    parser.add_argument('--obstacles', type=float, default=0.2, help='Static obstacle density')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'Size':>5} {'Build s':>8} {'Load ms':>8} {'A* nodes':>9} {'ALT nodes':>10} "
+          f"{'A* s':>7} {'ALT s':>7} {'Speedup':>8}")
+    print("-" * 70)
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            spec = ScenarioSpec(size=size, obstacle_density=args.obstacles, queries=args.queries, seed=args.seed)
+            map_file = os.path.join(directory, f"bench_{size}.map")
+            write_binary_map(sections_from_environment(generate_environment(spec)), map_file)
+            env = load_map_from_file(map_file)
+            queries = generate_queries(spec, env)
+
+            started = time.perf_counter()
+            LandmarkTable.load_or_build(env, args.landmarks, map_file)
+            build = time.perf_counter() - started
+            started = time.perf_counter()
+            LandmarkTable.load_or_build(env, args.landmarks, map_file)
+            load = time.perf_counter() - started
+
+            alt = ALTAStarPlanner(env, landmarks=args.landmarks)
+            alt.landmark_table()
+            # Time-expanded A* on both sides, so only the heuristic differs
+            astar_time, astar_nodes, astar_costs = timed(AStarPlanner(env, bidirectional=False), queries)
+            alt_time, alt_nodes, alt_costs = timed(alt, queries)
+            if alt_costs != astar_costs:
+                print(f"size {size}: ALT path costs differ from A*")
+            print(f"{size:>5} {build:>8.2f} {load * 1e3:>8.1f} {astar_nodes:>9} {alt_nodes:>10} "
+                  f"{astar_time:>7.3f} {alt_time:>7.3f} {astar_time / alt_time:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
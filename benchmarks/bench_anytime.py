@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Path cost and suboptimality bound of the anytime A* planner under deadlines
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agent import calculate_path_cost
+from planners.informed import AStarPlanner, AnytimeAStarPlanner
+from scenarios import ScenarioSpec, generate_environment, generate_queries
+
+def main():
+    parser = argparse.ArgumentParser(description='Anytime A* deadline benchmark')
+    parser.add_argument('--size', type=int, default=256, help='Generated scenario size')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--queries', type=int, default=5)
+    parser.add_argument('--deadlines', type=float, nargs='+', default=[0.005, 0.02, 0.05, 0.1, 0.5],
+                        help='Budgets in seconds')
+    args = parser.parse_args()
+
+    spec = ScenarioSpec(size=args.size, seed=args.seed, queries=args.queries)
+    env = generate_environment(spec)
+    print(f"{'Query':<22} {'Budget(ms)':>10} {'Time(ms)':>9} {'Cost':>6} {'Optimal':>8} {'Bound':>6} {'Nodes':>8}")
+    print("-" * 76)
+    for start, goal in generate_queries(spec, env):
+        reference = AStarPlanner(env, bidirectional=False)
+        began = time.perf_counter()
+        optimal_path = reference.plan(start, goal)
+        elapsed = time.perf_counter() - began
+        if not optimal_path:
+            continue
+        optimal = calculate_path_cost(env, optimal_path)
+        query = f"{start}->{goal}"
+        print(f"{query:<22} {'A*':>10} {elapsed * 1000:>9.1f} {optimal:>6} {optimal:>8} {1.0:>6.2f} "
+              f"{reference.nodes_expanded:>8}")
+        for deadline in args.deadlines:
+            planner = AnytimeAStarPlanner(env)
+            began = time.perf_counter()
+            path = planner.plan(start, goal, deadline=deadline)
+            elapsed = time.perf_counter() - began
+            cost = calculate_path_cost(env, path) if path else '-'
+            print(f"{'':<22} {deadline * 1000:>10.0f} {elapsed * 1000:>9.1f} {cost:>6} {optimal:>8} "
+                  f"{planner.bound:>6.2f} {planner.nodes_expanded:>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Compare bidirectional and unidirectional Uniform Cost and A* on static queries
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from environment import load_map_from_file
+from agent import calculate_path_cost
+from planners.uninformed import UniformCostPlanner
+from planners.informed import AStarPlanner
+from scenarios import ScenarioSpec, generate_environment, generate_queries
+
+def cases(sizes, seed):
+    maps_dir = os.path.join(os.path.dirname(__file__), '..', 'maps')
+    for map_file in sorted(glob.glob(os.path.join(maps_dir, '*.map'))):
+        env = load_map_from_file(map_file)
+        yield os.path.basename(map_file), env, [((0, 0), (env.width - 1, env.height - 1))]
+    for size in sizes:
+        spec = ScenarioSpec(size=size, seed=seed)
+        env = generate_environment(spec)
+        yield spec.name(), env, generate_queries(spec, env)
+
+def run(planner, queries):
+    nodes, cost, elapsed = 0, 0, 0.0
+    for start, goal in queries:
+        begin = time.perf_counter()
+        path = planner.plan(start, goal)
+        elapsed += time.perf_counter() - begin
+        nodes += planner.nodes_expanded
+        cost += calculate_path_cost(planner.env, path) if path else 0
+    return nodes, cost, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Bidirectional search benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[32, 64, 128, 256],
+                        help='Generated scenario sizes, run after the maps in maps/')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'Map':<44} {'Planner':<13} {'Uni nodes':>10} {'Bi nodes':>10} {'Ratio':>6} "
+          f"{'Uni ms':>9} {'Bi ms':>9}")
+    print("-" * 107)
+    for name, env, queries in cases(args.sizes, args.seed):
+        if not env.compile().is_static_from(0):
+            print(f"{name[:44]:<44} time-dependent, always searched unidirectionally")
+            continue
+        for label, planner_class in [('Uniform_Cost', UniformCostPlanner), ('A_Star', AStarPlanner)]:
+            uni_nodes, uni_cost, uni_time = run(planner_class(env, bidirectional=False), queries)
+            bi_nodes, bi_cost, bi_time = run(planner_class(env), queries)
+            if uni_cost != bi_cost:
+                print(f"{name}: {label} bidirectional cost {bi_cost} differs from {uni_cost}")
+            print(f"{name[:44]:<44} {label:<13} {uni_nodes:>10} {bi_nodes:>10} "
+                  f"{bi_nodes / max(uni_nodes, 1):>6.2f} {uni_time * 1000:>9.1f} {bi_time * 1000:>9.1f}")
+
+if __name__ == '__main__':
+    main()
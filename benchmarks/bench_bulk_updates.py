@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Updates per second of the bulk terrain and dynamic-change feed against single-cell calls
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from planners.cached import RouteCache
+from planners.informed import AStarPlanner
+from scenarios import ScenarioSpec, generate_environment
+
+def timed(apply):
+    began = time.perf_counter()
+    apply()
+    return time.perf_counter() - began
+
+def live_feed(size, ticks, cells, max_entries, rng):
+    """Feed ticks batches of terrain updates to a map read by a route cache
+    and return the most changes its log ever kept."""
+    env = generate_environment(ScenarioSpec(size=size, obstacle_density=0.0, seed=0))
+    env.change_log.max_entries = max_entries
+    cache = RouteCache(AStarPlanner(env))
+    peak = 0
+    for _ in range(ticks):
+        env.set_terrain_costs(rng.integers(0, size, cells), rng.integers(0, size, cells),
+                              rng.choice([1, 3, 10, 15], cells))
+        cache.plan((0, 0), (size - 1, size - 1))
+        peak = max(peak, len(env.change_log) - env.change_log.base)
+    return env.version, peak
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk terrain update benchmark')
+    parser.add_argument('--size', type=int, default=1024, help='Generated scenario size')
+    parser.add_argument('--batches', type=int, nargs='+', default=[1000, 10000, 100000], help='Cells per batch')
+    parser.add_argument('--horizon', type=int, default=100, help='Time steps the dynamic changes spread over')
+    parser.add_argument('--ticks', type=int, default=200, help='Batches in the bounded live-feed run')
+    parser.add_argument('--tick-cells', type=int, default=5000, help='Cells per live-feed batch')
+    parser.add_argument('--max-log', type=int, default=50000, help='Change log entries kept before compacting')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    spec = ScenarioSpec(size=args.size, seed=args.seed)
+    rng = np.random.default_rng(args.seed)
+    # Warm up NumPy's sorting and indexing paths
+    generate_environment(ScenarioSpec(size=8)).set_terrain_costs([0, 1], [0, 1], [1, 1])
+    print(f"{'Update':<10} {'Batch':>7} {'Single upd/s':>13} {'Bulk upd/s':>12} {'Speedup':>8} {'Summary':>30}")
+    print("-" * 85)
+    for batch in args.batches:
+        xs = rng.integers(0, args.size, batch)
+        ys = rng.integers(0, args.size, batch)
+        costs = rng.choice([1, 3, 10, 15, 9999], batch)
+        times = rng.integers(0, args.horizon, batch)
+        cells = list(zip(xs.tolist(), ys.tolist(), costs.tolist(), times.tolist()))
+
+        for label in ('terrain', 'dynamic'):
+            single, bulk = generate_environment(spec), generate_environment(spec)
+            single.compile()
+            bulk.compile()
+            if label == 'terrain':
+                single_time = timed(lambda: [single.set_terrain_cost(x, y, c) for x, y, c, _ in cells])
+                summary = None
+                def apply():
+                    nonlocal summary
+                    summary = bulk.set_terrain_costs(xs, ys, costs)
+            else:
+                single_time = timed(lambda: [single.add_dynamic_change(t, x, y, c) for x, y, c, t in cells])
+                def apply():
+                    nonlocal summary
+                    summary = bulk.add_dynamic_changes(times, xs, ys, costs)
+            bulk_time = timed(apply)
+            window = summary.time_window or 'all times'
+            print(f"{label:<10} {batch:>7} {batch / single_time:>13.0f} {batch / bulk_time:>12.0f} "
+                  f"{single_time / bulk_time:>7.1f}x {f'{len(summary.blocks)} blocks, {window}':>30}")
+
+    # The log must stay bounded while a reader keeps up with the feed
+    logged, peak = live_feed(64, args.ticks, args.tick_cells, args.max_log, rng)
+    bound = args.max_log + args.tick_cells
+    print(f"\nLive feed: {args.ticks} batches of {args.tick_cells} cells, {logged} changes logged, "
+          f"at most {peak} kept ({'bounded' if peak <= bound else f'UNBOUNDED, limit {bound}'})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Throughput and conflicts of cooperative fleet planning against agents planning alone
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agent import DeliveryAgent
+from cost_engine import BLOCKED
+from fleet import FleetPlanner, find_conflicts
+from planners.informed import AStarPlanner
+from scenarios import ScenarioSpec, generate_environment
+
+def make_agents(env, count, seed):
+    """count agents on distinct free start and goal cells."""
+    rng = random.Random(seed)
+    free = [(x, y) for y in range(env.height) for x in range(env.width) if env.get_cost(x, y, 0) < BLOCKED]
+    cells = rng.sample(free, 2 * count)
+    agents = []
+    for i in range(count):
+        agent = DeliveryAgent(env)
+        agent.set_start_goal(cells[2 * i], cells[2 * i + 1])
+        agents.append(agent)
+    return agents
+
+def main():
+    parser = argparse.ArgumentParser(description='Multi-agent fleet planning benchmark')
+    parser.add_argument('--size', type=int, default=48, help='Generated scenario size')
+    parser.add_argument('--moving', type=int, default=2, help='Moving obstacles in the scenario')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--agents', type=int, nargs='+', default=[10, 25, 50, 100])
+    parser.add_argument('--window', type=int, default=8, help='Re-planning window for the windowed runs')
+    args = parser.parse_args()
+
+    env = generate_environment(ScenarioSpec(size=args.size, moving_obstacles=args.moving, seed=args.seed))
+    print(f"{'Agents':>6} {'Mode':<12} {'Conflicts':>9} {'Arrived':>8} {'Rounds':>6} {'Nodes':>9} "
+          f"{'Time(s)':>8} {'Agents/s':>9}")
+    print("-" * 74)
+    for count in args.agents:
+        agents = make_agents(env, count, args.seed + count)
+        planner = AStarPlanner(env)
+        began = time.perf_counter()
+        paths = {i: planner.plan(agent.position, agent.goal) for i, agent in enumerate(agents)}
+        elapsed = time.perf_counter() - began
+        arrived = sum(1 for path in paths.values() if path)
+        print(f"{count:>6} {'independent':<12} {len(find_conflicts(paths)):>9} {arrived:>8} {1:>6} {'-':>9} "
+              f"{elapsed:>8.2f} {count / elapsed:>9.1f}")
+        for label, window in [('fleet', None), (f'window {args.window}', args.window)]:
+            agents = make_agents(env, count, args.seed + count)
+            fleet = FleetPlanner(env, window=window)
+            began = time.perf_counter()
+            traces = fleet.run(agents)
+            elapsed = time.perf_counter() - began
+            stats = fleet.last_stats
+            planned = count * stats['rounds']
+            print(f"{count:>6} {label:<12} {len(find_conflicts(traces)):>9} {stats['arrived']:>8} "
+                  f"{stats['rounds']:>6} {stats['nodes_expanded']:>9} {elapsed:>8.2f} {planned / elapsed:>9.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Path evaluations per second of the genetic planner against simulated annealing
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agent import calculate_path_cost, is_valid_path
+from planners.genetic import GeneticPlanner
+from planners.local_search import SimulatedAnnealingPlanner
+from scenarios import ScenarioSpec, generate_environment, generate_queries
+
+def main():
+    parser = argparse.ArgumentParser(description='Genetic planner benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[32, 64, 128])
+    parser.add_argument('--queries', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'Scenario':<44} {'Planner':<20} {'Evals':>8} {'Evals/s':>9} {'Found':>6} {'Mean cost':>10}")
+    print("-" * 102)
+    for size in args.sizes:
+        for spec in [ScenarioSpec(size=size, seed=args.seed, queries=args.queries),
+                     ScenarioSpec(size=size, seed=args.seed, queries=args.queries,
+                                  moving_obstacles=size // 4, change_rate=1.0)]:
+            env = generate_environment(spec)
+            queries = generate_queries(spec, env)
+            for label, planner in [('Simulated_Annealing', SimulatedAnnealingPlanner(env, seed=args.seed)),
+                                   ('Genetic', GeneticPlanner(env, seed=args.seed))]:
+                evaluations, elapsed, costs = 0, 0.0, []
+                for start, goal in queries:
+                    began = time.perf_counter()
+                    path = planner.plan(start, goal)
+                    elapsed += time.perf_counter() - began
+                    evaluations += planner.nodes_expanded
+                    if is_valid_path(env, path, start, goal):
+                        costs.append(calculate_path_cost(env, path))
+                mean = f"{sum(costs) / len(costs):.1f}" if costs else '-'
+                print(f"{spec.name()[:44]:<44} {label:<20} {evaluations:>8} {evaluations / elapsed:>9.0f} "
+                      f"{len(costs):>4}/{len(queries)} {mean:>10}")
+
+if __name__ == '__main__':
+    main()
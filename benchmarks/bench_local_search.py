@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Iterations per second of the local-search improvement loop, scoring each
+mutation by re-walking the whole path against delta evaluation
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from planners.local_search import HillClimbingPlanner
+from scenarios import ScenarioSpec, generate_environment
+
+def snake(size, length):
+    """A path sweeping the rows back and forth from (0, 0)."""
+    path = []
+    for y in range(size):
+        row = [(x, y) for x in range(size)]
+        path.extend(row if y % 2 == 0 else row[::-1])
+    return path[:length]
+
+def full_walk(planner, path, iterations, start_time):
+    cost = planner.evaluate_path(path, start_time)
+    for _ in range(iterations):
+        new_path = planner.mutate_path(path)
+        new_cost = planner.evaluate_path(new_path, start_time)
+        if new_cost < cost:
+            path, cost = new_path, new_cost
+    return cost
+
+def delta(planner, path, iterations, start_time):
+    planner._prepare(start_time)
+    current = planner._score_path(path, start_time)
+    for _ in range(iterations):
+        mutation = planner.propose_mutation(current.path)
+        new_cost = planner._score_mutation(current, mutation, start_time)
+        if new_cost < current.cost:
+            current = planner._apply_mutation(current, mutation, start_time)
+    return current.cost
+
+def scoring_rates(planner, path, iterations, start_time):
+    """Mutations scored per second against a fixed path, without the random walks."""
+    random.seed(0)
+    mutations = [planner.propose_mutation(path) for _ in range(iterations)]
+    began = time.perf_counter()
+    full = [planner.evaluate_path(planner._apply_path(path, mutation), start_time) for mutation in mutations]
+    full_rate = iterations / (time.perf_counter() - began)
+    planner._prepare(start_time)
+    current = planner._score_path(path, start_time)
+    began = time.perf_counter()
+    scored = [planner._score_mutation(current, mutation, start_time) for mutation in mutations]
+    delta_rate = iterations / (time.perf_counter() - began)
+    return full_rate, delta_rate, full == scored
+
+def main():
+    parser = argparse.ArgumentParser(description='Local-search delta evaluation benchmark')
+    parser.add_argument('--size', type=int, default=128, help='Generated scenario size')
+    parser.add_argument('--lengths', type=int, nargs='+', default=[50, 200, 1000, 4000], help='Initial path lengths')
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # No static obstacles, so the sweeping initial paths start out valid
+    scenarios = [('static', ScenarioSpec(size=args.size, obstacle_density=0.0, seed=args.seed)),
+                 ('time-dependent', ScenarioSpec(size=args.size, obstacle_density=0.0, seed=args.seed,
+                                                 change_rate=8.0))]
+    print(f"{'Scenario':<16} {'Length':>7} {'Full it/s':>11} {'Delta it/s':>11} {'Speedup':>8} "
+          f"{'Full eval/s':>12} {'Delta eval/s':>13} {'Speedup':>8}")
+    print("-" * 95)
+    for label, spec in scenarios:
+        env = generate_environment(spec)
+        planner = HillClimbingPlanner(env)
+        for length in args.lengths:
+            path = snake(args.size, length)
+            rates, costs = [], []
+            for run in (full_walk, delta):
+                random.seed(args.seed)
+                began = time.perf_counter()
+                costs.append(run(planner, path, args.iterations, 0))
+                rates.append(args.iterations / (time.perf_counter() - began))
+            full_rate, delta_rate, same = scoring_rates(planner, path, args.iterations, 0)
+            if costs[0] != costs[1] or not same:
+                print(f"{label}: delta evaluation disagrees with the full walk")
+            print(f"{label:<16} {len(path):>7} {rates[0]:>11.0f} {rates[1]:>11.0f} {rates[1] / rates[0]:>7.1f}x "
+                  f"{full_rate:>12.0f} {delta_rate:>13.0f} {delta_rate / full_rate:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Expansions per second of the search kernel through get_neighbors (before and
+after the single cost lookup) against the precomputed NeighborTable
+"""
+
+import argparse
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from planners.uninformed import UniformCostPlanner
+from planners.informed import AStarPlanner
+from scenarios import ScenarioSpec, generate_environment, generate_queries
+
+def legacy_get_neighbors(self, x, y, time_step=0):
+    # get_neighbors before the table: two cost lookups per neighbour
+    neighbors = []
+    for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+        nx, ny = x + dx, y + dy
+        if self.env.is_valid_position(nx, ny, time_step):
+            neighbors.append((nx, ny, self.env.get_cost(nx, ny, time_step)))
+    return neighbors
+
+def run(planner, queries):
+    nodes, paths = 0, []
+    began = time.perf_counter()
+    for start, goal in queries:
+        paths.append(planner.plan(start, goal))
+        nodes += planner.nodes_expanded
+    return nodes / (time.perf_counter() - began), paths
+
+def main():
+    parser = argparse.ArgumentParser(description='Neighbour table benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[64, 128, 256])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'Scenario':<16} {'Size':>5} {'Planner':<13} {'Legacy n/s':>11} {'Single n/s':>11} "
+          f"{'Table n/s':>10} {'Speedup':>8}")
+    print("-" * 80)
+    for size in args.sizes:
+        for label, spec in [('static', ScenarioSpec(size=size, seed=args.seed)),
+                            ('time-dependent', ScenarioSpec(size=size, seed=args.seed, moving_obstacles=size // 4,
+                                                            change_rate=1.0))]:
+            env = generate_environment(spec)
+            queries = generate_queries(spec, env)
+            env.compile().neighbor_table()
+            for name, planner_class in [('Uniform_Cost', UniformCostPlanner), ('A_Star', AStarPlanner)]:
+                legacy = planner_class(env, bidirectional=False)
+                legacy.get_neighbors = types.MethodType(legacy_get_neighbors, legacy)
+                single = planner_class(env, bidirectional=False)
+                # An instance attribute sends the kernel through get_neighbors
+                single.get_neighbors = single.get_neighbors
+                table = planner_class(env, bidirectional=False)
+                rates = []
+                results = []
+                for planner in (legacy, single, table):
+                    rate, paths = run(planner, queries)
+                    rates.append(rate)
+                    results.append(paths)
+                if not results[0] == results[1] == results[2]:
+                    print(f"{label} {size} {name}: paths differ between neighbour sources")
+                print(f"{label:<16} {size:>5} {name:<13} {rates[0]:>11.0f} {rates[1]:>11.0f} {rates[2]:>10.0f} "
+                      f"{rates[2] / rates[0]:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
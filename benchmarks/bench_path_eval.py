@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Time to cost and validate long paths cell by cell against the vectorized path evaluator
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import path_eval
+from cost_engine import BLOCKED
+from scenarios import ScenarioSpec, generate_environment
+
+def walk(env, length, rng):
+    """A random walk of single moves that stays on the grid."""
+    moves = np.array([(0, 1), (1, 0), (0, -1), (-1, 0)])[rng.integers(0, 4, length - 1)]
+    cells = np.empty((length, 2), dtype=np.int64)
+    cells[0] = rng.integers(0, [env.width, env.height])
+    for i, (dx, dy) in enumerate(moves, 1):
+        x, y = cells[i - 1]
+        cells[i] = (min(max(x + dx, 0), env.width - 1), min(max(y + dy, 0), env.height - 1))
+    return cells
+
+def scalar_evaluate(env, path, start_time):
+    # evaluate_path as it was: one get_cost and validity check per cell
+    total = 0
+    for i, (x, y) in enumerate(path[1:]):
+        if not env.is_valid_position(x, y, start_time + i):
+            return float('inf')
+        total += env.get_cost(x, y, start_time + i)
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description='Vectorized path evaluation benchmark')
+    parser.add_argument('--size', type=int, default=256, help='Generated scenario size')
+    parser.add_argument('--lengths', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--batch', type=int, default=256, help='Paths per score_paths call')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'Scenario':<16} {'Length':>6} {'Scalar us':>10} {'List us':>9} {'Array us':>9} "
+          f"{'Batch us/path':>14} {'Speedup':>8}")
+    print("-" * 78)
+    for label, spec in [('static', ScenarioSpec(size=args.size, seed=args.seed, obstacle_density=0.0)),
+                        ('time-dependent', ScenarioSpec(size=args.size, seed=args.seed, obstacle_density=0.0,
+                                                        moving_obstacles=args.size // 8, change_rate=2.0))]:
+        env = generate_environment(spec)
+        # Score every cell so no path stops at its first blocked step
+        env.grid[env.grid >= BLOCKED] = 1
+        env.invalidate()
+        for length in args.lengths:
+            cells = walk(env, length, rng)
+            path = [tuple(cell) for cell in cells.tolist()]
+            batch = np.stack([walk(env, length, rng) for _ in range(args.batch)])
+            expected = scalar_evaluate(env, path, 0)
+            if path_eval.evaluate_path(env, path, 0) != expected or path_eval.evaluate_path(env, cells, 0) != expected:
+                print(f"{label} {length}: vectorized cost differs from {expected}")
+            number = max(1, 20000 // length)
+            scalar = timeit.timeit(lambda: scalar_evaluate(env, path, 0), number=number) / number
+            listed = timeit.timeit(lambda: path_eval.evaluate_path(env, path, 0), number=number) / number
+            arrays = timeit.timeit(lambda: path_eval.evaluate_path(env, cells, 0), number=number) / number
+            batched = timeit.timeit(lambda: path_eval.score_paths(env, batch, 0), number=1) / args.batch
+            print(f"{label:<16} {length:>6} {scalar * 1e6:>10.0f} {listed * 1e6:>9.0f} {arrays * 1e6:>9.0f} "
+                  f"{batched * 1e6:>14.1f} {scalar / arrays:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
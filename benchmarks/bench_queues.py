@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark the priority-queue backends of the Uniform Cost and A* planners
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from environment import GridEnvironment
+from agent import calculate_path_cost
+from planners.uninformed import UniformCostPlanner
+from planners.informed import AStarPlanner
+from planners.queues import QUEUE_BACKENDS
+
+def build_environment(size: int, seed: int) -> GridEnvironment:
+    rng = random.Random(seed)
+    env = GridEnvironment(size, size)
+    for y in range(size):
+        for x in range(size):
+            env.set_terrain_cost(x, y, rng.choice([1, 1, 1, 3, 10, 15]))
+    return env
+
+def main():
+    parser = argparse.ArgumentParser(description='Priority-queue backend benchmark')
+    parser.add_argument('--size', type=int, default=40, help='Grid width and height')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per backend, best time is kept')
+    args = parser.parse_args()
+
+    env = build_environment(args.size, args.seed)
+    start, goal = (0, 0), (args.size - 1, args.size - 1)
+
+    print(f"{'Planner':<14} {'Queue':<8} {'Cost':>6} {'Nodes':>8} {'Pushes':>8} {'Stale':>8} {'Time(ms)':>10}")
+    print("-" * 68)
+    for name, planner_class in [('Uniform_Cost', UniformCostPlanner), ('A_Star', AStarPlanner)]:
+        for backend in QUEUE_BACKENDS:
+            planner = planner_class(env, queue=backend, bidirectional=False)
+            best = float('inf')
+            for _ in range(args.repeat):
+                begin = time.perf_counter()
+                path = planner.plan(start, goal)
+                best = min(best, time.perf_counter() - begin)
+            stats = planner.queue_stats
+            cost = calculate_path_cost(env, path) if path else 'inf'
+            print(f"{name:<14} {backend:<8} {cost:>6} {planner.nodes_expanded:>8} {stats['pushes']:>8} "
+                  f"{stats['stale_pops']:>8} {best * 1000:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Hit rate and query time of the route cache on repeated queries between map changes
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cost_engine import BLOCKED
+from planners.informed import AStarPlanner
+from planners.cached import RouteCache
+from scenarios import ScenarioSpec, generate_environment
+
+def workload(env, pairs, queries, change_every, seed):
+    """Queries over a fixed set of pairs, with a terrain change every change_every queries."""
+    rng = random.Random(seed)
+    free = [(x, y) for y in range(env.height) for x in range(env.width) if env.get_cost(x, y, 0) < BLOCKED]
+    routes = [(rng.choice(free), rng.choice(free)) for _ in range(pairs)]
+    for index in range(queries):
+        if change_every and index and index % change_every == 0:
+            yield 'change', (rng.randrange(env.width), rng.randrange(env.height), rng.choice([1, 3, 10, 15]))
+        yield 'query', rng.choice(routes)
+
+def run(env, planner, events):
+    elapsed = 0.0
+    for kind, item in events:
+        if kind == 'change':
+            env.set_terrain_cost(*item)
+            continue
+        began = time.perf_counter()
+        planner.plan(*item)
+        elapsed += time.perf_counter() - began
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Route cache benchmark')
+    parser.add_argument('--size', type=int, default=128, help='Generated scenario size')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pairs', type=int, default=50, help='Distinct (start, goal) pairs')
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--change-every', type=int, nargs='+', default=[0, 100, 10],
+                        help='Queries between terrain changes, 0 for none')
+    args = parser.parse_args()
+
+    spec = ScenarioSpec(size=args.size, seed=args.seed)
+    print(f"{'Change every':>12} {'A* ms/query':>12} {'Cached ms/query':>16} {'Speedup':>8} {'Hit rate':>9} "
+          f"{'Invalidated':>12} {'Evicted':>8}")
+    print("-" * 84)
+    for change_every in args.change_every:
+        env = generate_environment(spec)
+        events = list(workload(env, args.pairs, args.queries, change_every, args.seed))
+        plain = run(env, AStarPlanner(env), events)
+        env = generate_environment(spec)
+        cache = RouteCache(AStarPlanner(env))
+        cached = run(env, cache, events)
+        stats = cache.stats
+        print(f"{change_every or '-':>12} {plain / args.queries * 1000:>12.3f} {cached / args.queries * 1000:>16.3f} "
+              f"{plain / cached:>7.1f}x {stats['hits'] / args.queries:>9.2f} {stats['invalidations']:>12} "
+              f"{stats['evictions']:>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark the parent-pointer search kernel against the original
+list-carrying BFS, Uniform Cost and A* implementations
+"""
+
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque, defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from environment import GridEnvironment
+from planners.uninformed import BFSPlanner, UniformCostPlanner
+from planners.informed import AStarPlanner
+
+def legacy_bfs(planner, start, goal, start_time=0):
+    planner.nodes_expanded = 0
+    queue = deque([(start[0], start[1], start_time, [start])])
+    visited = set()
+    while queue:
+        x, y, time_step, path = queue.popleft()
+        if (x, y) == goal:
+            return path
+        if (x, y, time_step) in visited:
+            continue
+        visited.add((x, y, time_step))
+        planner.nodes_expanded += 1
+        for nx, ny, cost in planner.get_neighbors(x, y, time_step):
+            if (nx, ny, time_step + 1) not in visited:
+                queue.append((nx, ny, time_step + 1, path + [(nx, ny)]))
+    return []
+
+def legacy_uniform(planner, start, goal, start_time=0):
+    planner.nodes_expanded = 0
+    queue = [(0, start[0], start[1], start_time, [start])]
+    visited = defaultdict(lambda: float('inf'))
+    while queue:
+        total_cost, x, y, time_step, path = heapq.heappop(queue)
+        if (x, y) == goal:
+            return path
+        if total_cost >= visited[(x, y, time_step)]:
+            continue
+        visited[(x, y, time_step)] = total_cost
+        planner.nodes_expanded += 1
+        for nx, ny, cost in planner.get_neighbors(x, y, time_step):
+            new_cost = total_cost + cost
+            if new_cost < visited[(nx, ny, time_step + 1)]:
+                heapq.heappush(queue, (new_cost, nx, ny, time_step + 1, path + [(nx, ny)]))
+    return []
+
+def legacy_astar(planner, start, goal, start_time=0):
+    planner.nodes_expanded = 0
+    queue = [(planner.heuristic(start, goal), 0, start[0], start[1], start_time, [start])]
+    visited = {}
+    while queue:
+        f_cost, g_cost, x, y, time_step, path = heapq.heappop(queue)
+        if (x, y) == goal:
+            return path
+        state = (x, y, time_step)
+        if state in visited and visited[state] <= g_cost:
+            continue
+        visited[state] = g_cost
+        planner.nodes_expanded += 1
+        for nx, ny, cost in planner.get_neighbors(x, y, time_step):
+            new_g_cost = g_cost + cost
+            new_state = (nx, ny, time_step + 1)
+            if new_state not in visited or new_g_cost < visited[new_state]:
+                heapq.heappush(queue, (new_g_cost + planner.heuristic((nx, ny), goal), new_g_cost,
+                                       nx, ny, time_step + 1, path + [(nx, ny)]))
+    return []
+
+def build_environment(size: int, seed: int) -> GridEnvironment:
+    rng = random.Random(seed)
+    env = GridEnvironment(size, size)
+    for y in range(size):
+        for x in range(size):
+            env.set_terrain_cost(x, y, rng.choice([1, 1, 1, 3, 10, 15]))
+    return env
+
+def measure(fn, repeat: int):
+    """Result, best untraced time over repeat runs and peak traced memory of fn.
+
+    One untimed run first builds the compiled engine and its neighbour
+    table; memory is traced in a pass of its own, since tracing slows
+    every allocation.
+    """
+    path = fn()
+    elapsed = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return path, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description='Search kernel benchmark')
+    parser.add_argument('--size', type=int, default=40, help='Grid width and height')
+    parser.add_argument('--bfs-size', type=int, default=12, help='Grid size for BFS, which searches every depth')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case; the fastest is reported')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # The legacy planners search unfolded time forward only, so the kernel
+    # runs without time folding and off the bidirectional static-query path
+    cases = [
+        ('BFS', BFSPlanner, legacy_bfs, args.bfs_size, {'fold_time': False}),
+        ('Uniform_Cost', UniformCostPlanner, legacy_uniform, args.size, {'fold_time': False, 'bidirectional': False}),
+        ('A_Star', AStarPlanner, legacy_astar, args.size, {'fold_time': False, 'bidirectional': False}),
+    ]
+
+    print(f"{'Planner':<14} {'Impl':<8} {'Nodes':>8} {'Time(ms)':>10} {'us/node':>9} {'Peak KiB':>10} {'Speedup':>8}")
+    print("-" * 73)
+    for name, planner_class, legacy, size, options in cases:
+        env = build_environment(size, args.seed)
+        start, goal = (0, 0), (size - 1, size - 1)
+        planner = planner_class(env, **options)
+        rows = []
+        for impl, fn in [('legacy', lambda: legacy(planner, start, goal)),
+                         ('kernel', lambda: planner.plan(start, goal))]:
+            path, elapsed, peak = measure(fn, args.repeat)
+            rows.append((impl, planner.nodes_expanded, elapsed, peak, path))
+        if rows[0][4] != rows[1][4] or rows[0][1] != rows[1][1]:
+            print(f"{name}: kernel result differs from the legacy implementation")
+        for impl, nodes, elapsed, peak, _ in rows:
+            print(f"{name:<14} {impl:<8} {nodes:>8} {elapsed * 1000:>10.1f} "
+                  f"{elapsed * 1e6 / max(nodes, 1):>9.2f} {peak / 1024:>10.1f} {rows[0][2] / elapsed:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Per-query latency of the one-shot cli against the long-running planning service
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from service import send_queries
+
+def main():
+    parser = argparse.ArgumentParser(description='Planning service benchmark')
+    parser.add_argument('--map', default=os.path.join(ROOT, 'maps', 'medium.map'))
+    parser.add_argument('--start', default='0,0')
+    parser.add_argument('--goal', default='9,9')
+    parser.add_argument('--planners', nargs='+', default=['bfs', 'uniform', 'astar', 'hpastar'])
+    parser.add_argument('--queries', type=int, default=10, help='Queries per planner')
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, 'src'))
+    cli = os.path.join(ROOT, 'src', 'cli.py')
+    socket_path = os.path.join(tempfile.mkdtemp(), 'planning.sock')
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'src', 'service.py'), '--socket', socket_path],
+                              env=env, stderr=subprocess.DEVNULL)
+    try:
+        while not os.path.exists(socket_path):
+            time.sleep(0.05)
+        start, goal = [list(map(int, cell.split(','))) for cell in (args.start, args.goal)]
+
+        print(f"{'Planner':<10} {'CLI ms/query':>13} {'Service ms/query':>17} {'Batched ms/query':>17} {'Speedup':>8}")
+        print("-" * 69)
+        for planner in args.planners:
+            began = time.perf_counter()
+            for _ in range(args.queries):
+                subprocess.run([sys.executable, cli, '--map', args.map, '--start', args.start,
+                                '--goal', args.goal, '--planner', planner],
+                               env=env, check=True, stdout=subprocess.DEVNULL)
+            one_shot = (time.perf_counter() - began) / args.queries
+
+            query = {'map': args.map, 'start': start, 'goal': goal, 'planner': planner}
+            began = time.perf_counter()
+            for _ in range(args.queries):
+                reply = send_queries(socket_path, [query])[0]
+                if 'error' in reply:
+                    raise SystemExit(json.dumps(reply))
+            served = (time.perf_counter() - began) / args.queries
+
+            # Identical queries sent together are coalesced into one search
+            began = time.perf_counter()
+            send_queries(socket_path, [query] * args.queries)
+            batched = (time.perf_counter() - began) / args.queries
+            print(f"{planner:<10} {one_shot * 1000:>13.1f} {served * 1000:>17.2f} {batched * 1000:>17.2f} "
+                  f"{one_shot / served:>7.0f}x")
+        print(json.dumps(send_queries(socket_path, [{'op': 'stats'}])[0]))
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == '__main__':
+    main()
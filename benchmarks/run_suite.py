@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Run every planner over the generated benchmark scenarios
+
+Each (scenario, planner) pair is reported as one JSON line with latency
+percentiles, nodes expanded per second, peak traced memory and the
+optimality gap against Uniform Cost on the same queries.
+"""
+
+import argparse
+import json
+import os
+import sys
+import numpy as np
+from collections import defaultdict
+from dataclasses import asdict, replace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from runner import ExperimentTask, ParallelExperimentRunner
+from planners.uninformed import BFSPlanner, UniformCostPlanner
+from planners.informed import AStarPlanner, AnytimeAStarPlanner, ALTAStarPlanner
+from planners.hierarchical import HPAStarPlanner
+from planners.bidirectional import BidirectionalDijkstraPlanner, BidirectionalAStarPlanner
+from planners.local_search import HillClimbingPlanner, SimulatedAnnealingPlanner
+from planners.genetic import GeneticPlanner
+from planners.incremental import DStarLitePlanner
+from planners.matrix import DistanceMatrixPlanner
+from scenarios import ScenarioSpec, default_suite, generate_environment, generate_queries, load_scenario
+
+PLANNERS = {
+    'bfs': BFSPlanner,
+    'uniform_cost': UniformCostPlanner,
+    'astar': AStarPlanner,
+    'alt_astar': ALTAStarPlanner,
+    'anytime_astar': AnytimeAStarPlanner,
+    'hpastar': HPAStarPlanner,
+    'bidirectional_dijkstra': BidirectionalDijkstraPlanner,
+    'bidirectional_astar': BidirectionalAStarPlanner,
+    'hill_climbing': HillClimbingPlanner,
+    'simulated_annealing': SimulatedAnnealingPlanner,
+    'genetic': GeneticPlanner,
+    'dstar_lite': DStarLitePlanner,
+    'distance_matrix': DistanceMatrixPlanner,
+}
+# Optimal costs for the optimality gap come from this planner
+REFERENCE = 'uniform_cost'
+
+def build_tasks(specs, planners, repeat, measure_memory):
+    tasks, names = [], {}
+    for spec in specs:
+        key = spec.key()
+        names[key] = spec
+        env = generate_environment(spec)
+        for index, (start, goal) in enumerate(generate_queries(spec, env)):
+            for name in planners:
+                task = ExperimentTask(key, name, PLANNERS[name], start, goal, repeat=repeat,
+                                      measure_memory=measure_memory, seed=spec.seed + index)
+                tasks.append(task)
+    return tasks, names
+
+def summarize(spec, planner, results, optimal):
+    times = [t for r in results if r['status'] == 'ok' for t in r['planning_times']]
+    ok = [r for r in results if r['status'] == 'ok']
+    statuses = defaultdict(int)
+    for r in results:
+        statuses[r['status']] += 1
+
+    gaps = []
+    for r in ok:
+        best = optimal.get((r['start'], r['goal']))
+        if best and r.get('valid'):
+            gaps.append(r['path_cost'] / best - 1)
+
+    nodes = sum(r['nodes_expanded'] for r in ok)
+    seconds = sum(r['planning_times'][-1] for r in ok)
+    percentiles = np.percentile(times, [50, 90, 99]) * 1000 if times else [None] * 3
+    return {
+        'scenario': spec.name(),
+        'spec': asdict(spec),
+        'planner': planner,
+        'queries': len(results),
+        'found': sum(1 for r in ok if r.get('valid')),
+        'statuses': dict(statuses),
+        'latency_ms': {'p50': percentiles[0], 'p90': percentiles[1], 'p99': percentiles[2],
+                       'max': max(times) * 1000 if times else None},
+        'nodes_expanded': nodes,
+        'nodes_per_sec': nodes / seconds if seconds > 0 else None,
+        'peak_memory_bytes': max((r.get('peak_memory', 0) for r in ok), default=None),
+        'optimality_gap': {'mean': float(np.mean(gaps)) if gaps else None,
+                           'max': max(gaps) if gaps else None},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Planner benchmark suite over generated scenarios')
+    parser.add_argument('--quick', action='store_true', help='Small maps only')
+    parser.add_argument('--sizes', type=int, nargs='+', help='Run only a size sweep with these sizes')
+    parser.add_argument('--seeds', type=int, default=1, help='Seeds per scenario')
+    parser.add_argument('--planners', nargs='+', choices=list(PLANNERS), default=list(PLANNERS))
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per query')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc run')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Per-task timeout in seconds')
+    parser.add_argument('--memory-mb', type=int, default=None, help='Per-worker memory cap in MB')
+    parser.add_argument('--output', help='Write JSON lines here instead of stdout')
+    args = parser.parse_args()
+
+    base = [ScenarioSpec(size=size) for size in args.sizes] if args.sizes else default_suite(args.quick)
+    specs = [replace(spec, seed=seed) for spec in base for seed in range(args.seeds)]
+    planners = list(args.planners)
+    if REFERENCE not in planners:
+        planners.append(REFERENCE)
+
+    tasks, names = build_tasks(specs, planners, args.repeat, not args.no_memory)
+    grouped = defaultdict(list)
+    runner = ParallelExperimentRunner(args.workers, args.timeout, args.memory_mb, loader=load_scenario)
+    for result in runner.run(tasks):
+        grouped[(result['map'], result['algorithm'])].append(result)
+        print(f"  {names[result['map']].name()} {result['algorithm']}: {result['status']}", file=sys.stderr)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for key, spec in names.items():
+            optimal = {(r['start'], r['goal']): r['path_cost']
+                       for r in grouped.get((key, REFERENCE), []) if r['status'] == 'ok' and r.get('valid')}
+            for planner in args.planners:
+                record = summarize(spec, planner, grouped.get((key, planner), []), optimal)
+                out.write(json.dumps(record) + '\n')
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Seeded scenario generator for planner benchmarks
+"""
+
+import json
+import os
+import sys
+import numpy as np
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from environment import GridEnvironment, CellType
+from cost_engine import BLOCKED
+
+DEFAULT_MIX = {'ROAD': 0.5, 'GRASS': 0.3, 'WATER': 0.15, 'MOUNTAIN': 0.05}
+
+@dataclass
+class ScenarioSpec:
+    """Parameters of one generated map; the same spec always builds the same map."""
+    size: int = 64
+    terrain_mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MIX))  # CellType name -> share
+    obstacle_density: float = 0.1  # share of cells that are static obstacles
+    moving_obstacles: int = 0
+    moving_period: int = 8  # cycle length of each moving obstacle, rounded down to even
+    change_rate: float = 0.0  # dynamic changes per time step
+    change_horizon: int = 0  # time steps that get dynamic changes, 0 means 2 * size
+    queries: int = 3
+    seed: int = 0
+
+    def key(self) -> str:
+        return json.dumps(asdict(self), sort_keys=True)
+
+    @classmethod
+    def from_key(cls, key: str) -> 'ScenarioSpec':
+        return cls(**json.loads(key))
+
+    def name(self) -> str:
+        mix = ''.join(f"{name[0]}{share:g}" for name, share in sorted(self.terrain_mix.items()))
+        return (f"n{self.size}_{mix}_obs{self.obstacle_density:g}_mov{self.moving_obstacles}x{self.moving_period}"
+                f"_chg{self.change_rate:g}_s{self.seed}")
+
+def _terrain(spec: ScenarioSpec, rng: np.random.Generator) -> np.ndarray:
+    names = sorted(spec.terrain_mix)
+    costs = np.array([CellType[name].value for name in names], dtype=np.int32)
+    shares = np.array([spec.terrain_mix[name] for name in names], dtype=float)
+    terrain = rng.choice(costs, size=(spec.size, spec.size), p=shares / shares.sum())
+    # Static obstacles are written into the terrain as blocked cells, which
+    # costs the same to plan around as static_obstacles but keeps a
+    # 4096x4096 map from needing a multi-million entry set.
+    if spec.obstacle_density > 0:
+        terrain[rng.random((spec.size, spec.size)) < spec.obstacle_density] = BLOCKED
+    return terrain
+
+def _patrol(spec: ScenarioSpec, rng: np.random.Generator) -> List[Tuple[int, int]]:
+    # Back and forth along a random row or column segment
+    x, y = (int(v) for v in rng.integers(0, spec.size, 2))
+    dx, dy = [(1, 0), (0, 1)][int(rng.integers(2))]
+    reach = max(spec.moving_period // 2, 1)
+    line = [(min(x + dx * i, spec.size - 1), min(y + dy * i, spec.size - 1)) for i in range(reach + 1)]
+    positions = line + line[-2:0:-1]
+    return positions[:spec.moving_period] if spec.moving_period > 1 else [line[0]]
+
+def generate_environment(spec: ScenarioSpec) -> GridEnvironment:
+    rng = np.random.default_rng(spec.seed)
+    env = GridEnvironment(spec.size, spec.size, grid=_terrain(spec, rng))
+    for _ in range(spec.moving_obstacles):
+        env.add_moving_obstacle(_patrol(spec, rng))
+
+    horizon = spec.change_horizon or 2 * spec.size
+    count = int(round(spec.change_rate * horizon))
+    if count:
+        times = rng.integers(1, horizon + 1, count)
+        cells = rng.integers(0, spec.size, (count, 2))
+        new_costs = rng.choice([CellType.ROAD.value, CellType.WATER.value, BLOCKED], count)
+        for time_step, (x, y), new_cost in zip(times.tolist(), cells.tolist(), new_costs.tolist()):
+            env.add_dynamic_change(time_step, x, y, new_cost)
+    env.clear_changes()
+    return env
+
+def generate_queries(spec: ScenarioSpec, env: GridEnvironment) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """Start/goal pairs on free cells, at least half the map apart where possible."""
+    rng = np.random.default_rng(spec.seed + 1)
+    queries = []
+    for _ in range(spec.queries):
+        start = goal = None
+        for attempt in range(1000):
+            x, y = (int(v) for v in rng.integers(0, spec.size, 2))
+            if not env.is_valid_position(x, y, 0):
+                continue
+            if start is None:
+                start = (x, y)
+            elif (x, y) != start and (abs(x - start[0]) + abs(y - start[1]) >= spec.size // 2 or attempt > 500):
+                goal = (x, y)
+                break
+        if start is not None and goal is not None:
+            queries.append((start, goal))
+    return queries
+
+def load_scenario(key: str) -> GridEnvironment:
+    """Map loader for ParallelExperimentRunner; the map key is ScenarioSpec.key()."""
+    return generate_environment(ScenarioSpec.from_key(key))
+
+def default_suite(quick: bool = False) -> List[ScenarioSpec]:
+    """Size sweep on the default mix plus one-at-a-time variations on a mid-sized map."""
+    sizes = [10, 32, 64] if quick else [10, 64, 256, 1024, 4096]
+    base = 32 if quick else 128
+    specs = [ScenarioSpec(size=size) for size in sizes]
+    specs += [
+        ScenarioSpec(size=base, terrain_mix={'ROAD': 1.0}),
+        ScenarioSpec(size=base, terrain_mix={'GRASS': 0.3, 'WATER': 0.4, 'MOUNTAIN': 0.3}),
+        ScenarioSpec(size=base, obstacle_density=0.0),
+        ScenarioSpec(size=base, obstacle_density=0.3),
+        ScenarioSpec(size=base, moving_obstacles=base // 8, moving_period=4),
+        ScenarioSpec(size=base, moving_obstacles=base // 2, moving_period=16),
+        ScenarioSpec(size=base, change_rate=1.0),
+        ScenarioSpec(size=base, change_rate=8.0),
+    ]
+    return specs
@@ -20,6 +20,8 @@ from agent import calculate_path_cost
 from planners.uninformed import BFSPlanner, UniformCostPlanner
 from planners.informed import AStarPlanner
 from planners.local_search import HillClimbingPlanner, SimulatedAnnealingPlanner
+from runner import ExperimentTask, ParallelExperimentRunner
+from instrumentation import format_record
 
 # Custom JSON encoder for numpy types
 class NumpyEncoder(json.JSONEncoder):
@@ -28,11 +30,26 @@ class NumpyEncoder(json.JSONEncoder):
             return int(obj) if isinstance(obj, np.integer) else float(obj)
         return super().default(obj)
 
+ALGORITHMS = {
+    "BFS": BFSPlanner,
+    "Uniform_Cost": UniformCostPlanner,
+    "A_Star": AStarPlanner,
+    "Hill_Climbing": HillClimbingPlanner,
+    "Simulated_Annealing": SimulatedAnnealingPlanner
+}
+
 class OutputGenerator:
-    def __init__(self, output_dir="output"):
+    def __init__(self, output_dir="output", workers=1, timeout=None, memory_limit_mb=None, stats=False):
         self.output_dir = output_dir
         self.results = {}
         self.timestamp = datetime.now()
+        # workers > 1, a timeout or a memory cap runs every (map, algorithm)
+        # pair on a process pool, which enforces the caps
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        # stats prints and stores each planner's counters and phase times
+        self.stats = stats
         
         # Create output directories
         self._create_directories()
@@ -82,12 +99,54 @@ class OutputGenerator:
             "experiments": {}
         }
         
+        if self.workers > 1 or self.timeout or self.memory_limit_mb:
+            results["experiments"] = self._test_maps_parallel(map_files, start, goal)
+            return results
+        
         for map_file in map_files:
             print(f"Testing {map_file}...")
             results["experiments"][map_file] = self._test_single_map(map_file, start, goal)
         
         return results
     
+    def _test_maps_parallel(self, map_files: List[str], start: tuple, goal: tuple) -> Dict[str, Any]:
+        """Test all algorithms on all maps with a process pool, logging results as they finish"""
+        tasks = [ExperimentTask(map_file, algo_name, planner_class, start, goal, instrument=self.stats)
+                 for map_file in map_files for algo_name, planner_class in ALGORITHMS.items()]
+        runner = ParallelExperimentRunner(self.workers, self.timeout, self.memory_limit_mb)
+        
+        finished = {map_file: {} for map_file in map_files}
+        for result in runner.run(tasks):
+            print(f"  {result['map']} {result['algorithm']}: {result['status']}")
+            if result.get('instrumentation'):
+                print(f"    {format_record(result['instrumentation'])}")
+            finished[result['map']][result['algorithm']] = result
+        
+        experiments = {}
+        for map_file in map_files:
+            runs = finished[map_file]
+            loaded = [run for run in runs.values() if 'width' in run]
+            if not loaded:
+                experiments[map_file] = {"error": next(iter(runs.values())).get('error', 'map not loaded')}
+                continue
+            width, height = loaded[0]['width'], loaded[0]['height']
+            experiments[map_file] = {
+                "map_info": {
+                    "filename": map_file,
+                    "size": f"{width}x{height}",
+                    "width": width,
+                    "height": height
+                },
+                "algorithms": {
+                    algo_name: self._format_result(runs[algo_name]['path'], runs[algo_name]['path_cost'],
+                                                   runs[algo_name]['nodes_expanded'],
+                                                   runs[algo_name]['planning_time'], runs[algo_name]['status'],
+                                                   runs[algo_name].get('instrumentation'))
+                    for algo_name in ALGORITHMS
+                }
+            }
+        return experiments
+    
     def _test_single_map(self, map_file: str, start: tuple, goal: tuple) -> Dict[str, Any]:
         """Test all algorithms on a single map"""
         try:
@@ -102,13 +161,7 @@ class OutputGenerator:
                 "algorithms": {}
             }
             
-            algorithms = {
-                "BFS": BFSPlanner(env),
-                "Uniform_Cost": UniformCostPlanner(env),
-                "A_Star": AStarPlanner(env),
-                "Hill_Climbing": HillClimbingPlanner(env),
-                "Simulated_Annealing": SimulatedAnnealingPlanner(env)
-            }
+            algorithms = {name: planner_class(env) for name, planner_class in ALGORITHMS.items()}
             
             for algo_name, planner in algorithms.items():
                 print(f"  Running {algo_name}...")
@@ -123,30 +176,45 @@ class OutputGenerator:
     
     def _run_algorithm(self, planner, env, start: tuple, goal: tuple, algo_name: str) -> Dict[str, Any]:
         """Run a single algorithm and return results"""
+        if self.stats:
+            planner.instrument()
         start_time = time.time()
         path = planner.plan(start, goal)
         planning_time = time.time() - start_time
         
+        record = planner.last_instrumentation if self.stats else None
+        if record:
+            print(f"    {format_record(record)}")
+        total_cost = calculate_path_cost(env, path) if path else float('inf')
+        return self._format_result(path, total_cost, planner.nodes_expanded, planning_time, instrumentation=record)
+    
+    def _format_result(self, path, total_cost, nodes_expanded, planning_time, run_status="ok",
+                       instrumentation=None) -> Dict[str, Any]:
+        """Build the per-algorithm result record"""
         if path and len(path) > 0:
-            total_cost = calculate_path_cost(env, path)
             path_coords = [(x, y) for x, y in path]
             path_str = " -> ".join([f"({x},{y})" for x, y in path])
         else:
-            total_cost = float('inf')
             path_coords = []
-            path_str = "No path found"
+            path_str = "No path found" if run_status == "ok" else f"No path found ({run_status})"
         
-        return {
+        result = {
             "path_found": len(path) > 0,
             "path_length": len(path) if path else 0,
             "path_cost": total_cost if total_cost != float('inf') else "inf",
-            "nodes_expanded": planner.nodes_expanded,
+            "nodes_expanded": nodes_expanded,
             "planning_time_ms": round(planning_time * 1000, 3),
             "path_coordinates": path_coords,
             "path_string": path_str,
-            "efficiency_ratio": round(planner.nodes_expanded / max(len(path), 1), 2) if path else "N/A",
+            "efficiency_ratio": round(nodes_expanded / max(len(path), 1), 2) if path else "N/A",
             "status": "SUCCESS" if len(path) > 0 else "FAILED"
         }
+        if instrumentation:
+            result["instrumentation"] = {
+                "counters": instrumentation["counters"],
+                "phases_ms": {name: round(seconds * 1000, 3) for name, seconds in instrumentation["phases"].items()}
+            }
+        return result
     
     def _generate_json_output(self):
         """Generate detailed JSON output"""
@@ -30,6 +30,9 @@ Examples:
     parser.add_argument('--goal', type=str, help='Goal position (x,y)')
     parser.add_argument('--output-dir', default='output', help='Output directory')
     parser.add_argument('--config', help='Configuration file (JSON)')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for the experiments')
+    parser.add_argument('--timeout', type=float, help='Per-algorithm timeout in seconds')
+    parser.add_argument('--stats', action='store_true', help='Print and save planner counters and phase times')
     
     args = parser.parse_args()
     
@@ -61,7 +64,7 @@ Examples:
     print("")
     
     # Generate outputs
-    generator = OutputGenerator(args.output_dir)
+    generator = OutputGenerator(args.output_dir, workers=args.workers, timeout=args.timeout, stats=args.stats)
     generator.generate_all_outputs(maps, start, goal)
     
     print("")
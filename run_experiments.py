@@ -3,21 +3,23 @@
 Main experiment runner for comparing path planning algorithms
 """
 
+import argparse
 import json
 import time
 import numpy as np
 import sys
 import os
 
-# Add the current directory to Python path
-sys.path.insert(0, os.path.dirname(__file__))
+# Add the src directory to Python path; the planners import their
+# siblings as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-# Now import from src
-from src.environment import load_map_from_file
-from src.agent import calculate_path_cost
-from src.planners.uninformed import BFSPlanner, UniformCostPlanner
-from src.planners.informed import AStarPlanner
-from src.planners.local_search import HillClimbingPlanner, SimulatedAnnealingPlanner
+from environment import load_map_from_file
+from agent import calculate_path_cost
+from planners.uninformed import BFSPlanner, UniformCostPlanner
+from planners.informed import AStarPlanner
+from planners.local_search import HillClimbingPlanner, SimulatedAnnealingPlanner
+from runner import ExperimentTask, ParallelExperimentRunner
 
 # Custom JSON encoder to handle numpy types
 class NumpyEncoder(json.JSONEncoder):
@@ -26,17 +28,44 @@ class NumpyEncoder(json.JSONEncoder):
             return int(obj) if isinstance(obj, np.integer) else float(obj)
         return super().default(obj)
 
-def run_comprehensive_experiments():
-    """Run all algorithms on all test maps"""
+ALGORITHMS = {
+    'bfs': BFSPlanner,
+    'uniform_cost': UniformCostPlanner,
+    'astar': AStarPlanner,
+    'hill_climbing': HillClimbingPlanner,
+    'simulated_annealing': SimulatedAnnealingPlanner
+}
+
+def run_parallel_experiments(maps, workers, timeout=None, memory_limit_mb=None):
+    """Run all (map, algorithm) pairs on a process pool, printing results as they finish"""
+    results = {map_name: {} for map_name in maps}
+    tasks = [ExperimentTask(f'maps/{map_name}', algo_name, algo_class, (0, 0))
+             for map_name in maps for algo_name, algo_class in ALGORITHMS.items()]
+    runner = ParallelExperimentRunner(workers, timeout, memory_limit_mb)
+    
+    for result in runner.run(tasks):
+        map_name = os.path.basename(result['map'])
+        if result['status'] == 'error':
+            print(f"Error with {map_name} / {result['algorithm']}: {result['error']}")
+        path = result['path']
+        total_cost = result['path_cost']
+        results[map_name][result['algorithm']] = {
+            'path_length': len(path),
+            'path_cost': int(total_cost) if total_cost != float('inf') else 'inf',
+            'nodes_expanded': result['nodes_expanded'],
+            'planning_time': float(result['planning_time']),
+            'success': len(path) > 0,
+            'status': result['status']
+        }
+        print(f"  {map_name} {result['algorithm']}: {result['status']}, "
+              f"Path found: {len(path) > 0}, Cost: {total_cost}")
+    
+    return results
+
+def run_serial_experiments(maps):
+    """Run every algorithm on each map in this process."""
     results = {}
-    maps = ['small.map', 'medium.map']
-    algorithms = {
-        'bfs': BFSPlanner,
-        'uniform_cost': UniformCostPlanner,
-        'astar': AStarPlanner,
-        'hill_climbing': HillClimbingPlanner,
-        'simulated_annealing': SimulatedAnnealingPlanner
-    }
+    algorithms = ALGORITHMS
     
     for map_name in maps:
         print(f"\n=== Testing on {map_name} ===")
@@ -72,10 +101,28 @@ def run_comprehensive_experiments():
             traceback.print_exc()
             continue
     
+    return results
+
+def run_comprehensive_experiments(workers=1, timeout=None, memory_limit_mb=None):
+    """Run all algorithms on all test maps"""
+    maps = ['small.map', 'medium.map']
+    
+    # A timeout or memory cap needs a worker process to enforce it, even with one worker
+    if workers > 1 or timeout or memory_limit_mb:
+        results = run_parallel_experiments(maps, workers, timeout, memory_limit_mb)
+    else:
+        results = run_serial_experiments(maps)
+    
+    os.makedirs('results', exist_ok=True)
     with open('results/experiment_results.json', 'w') as f:
         json.dump(results, f, indent=2, cls=NumpyEncoder)
     
     print("\nExperiments completed! Results saved to results/experiment_results.json")
 
 if __name__ == '__main__':
-    run_comprehensive_experiments()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Compare path planning algorithms')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes (1 runs in-process unless capped)')
+    parser.add_argument('--timeout', type=float, help='Per-experiment timeout in seconds')
+    parser.add_argument('--memory-mb', type=int, help='Per-worker memory cap in MiB')
+    args = parser.parse_args()
+    run_comprehensive_experiments(args.workers, args.timeout, args.memory_mb)
\ No newline at end of file
@@ -1,7 +1,16 @@
-from typing import List, Tuple, Dict, Optional
+from typing import Any, Callable, List, Tuple, Dict, Optional
 from abc import ABC, abstractmethod
 import time
 
+try:
+    from cost_engine import BLOCKED
+    from instrumentation import DISABLED, CountingEnvironment, Instrumentation
+    import path_eval
+except ImportError:  # imported as src.agent
+    from .cost_engine import BLOCKED
+    from .instrumentation import DISABLED, CountingEnvironment, Instrumentation
+    from . import path_eval
+
 # We'll import GridEnvironment only when needed to avoid circular imports
 # from environment import GridEnvironment
 
@@ -14,6 +23,7 @@ class DeliveryAgent:
         self.time_step = 0
         self.path: List[Tuple[int, int]] = []
         self.movement_history: List[Tuple[int, int, int]] = []
+        self.replan_log: List[Dict] = []
         
     def set_start_goal(self, start: Tuple[int, int], goal: Tuple[int, int]):
         self.position = start
@@ -29,12 +39,72 @@ class DeliveryAgent:
         
     def replan(self, planner, recalculate_heuristic: bool = True) -> List[Tuple[int, int]]:
         self.path = planner.plan(self.position, self.goal, self.time_step, recalculate_heuristic)
+        # Incremental planners describe how much of the search they repaired
+        entry = {'time_step': self.time_step, 'nodes_expanded': planner.nodes_expanded}
+        entry.update(getattr(planner, 'last_stats', {}))
+        self.replan_log.append(entry)
         return self.path
 
 class Planner(ABC):
-    def __init__(self, env):
+    def __init__(self, env, fold_time: bool = True, allow_wait: bool = False):
         self.env = env
         self.nodes_expanded = 0
+        # Search (x, y, time) states with time folded onto the obstacle period
+        self.fold_time = fold_time
+        # Offer staying in place as a move so moving obstacles can pass
+        self.allow_wait = allow_wait
+        # Space-time reservations of other agents (fleet.ReservationTable),
+        # honoured by the search kernel
+        self.reservations = None
+        self.instrumentation: Instrumentation = DISABLED
+        
+    def instrument(self, sink: Optional[Callable[[Dict[str, Any]], None]] = None) -> Instrumentation:
+        """Report counters and phase times of every later plan() call to sink.
+
+        plan and get_neighbors are wrapped on this instance only, so planners
+        that were never instrumented run the plain methods.
+        """
+        self.instrumentation = Instrumentation(sink)
+        self.plan = self._instrumented_plan
+        self.get_neighbors = self._counted_get_neighbors
+        return self.instrumentation
+        
+    def uninstrument(self):
+        self.instrumentation = DISABLED
+        self.__dict__.pop('plan', None)
+        self.__dict__.pop('get_neighbors', None)
+        
+    def _counted_get_neighbors(self, x: int, y: int, time_step: int = 0) -> List[Tuple[int, int, int]]:
+        neighbors = type(self).get_neighbors(self, x, y, time_step)
+        self._neighbor_calls += 1
+        self._neighbors_generated += len(neighbors)
+        return neighbors
+        
+    def _instrumented_plan(self, start: Tuple[int, int], goal: Tuple[int, int],
+                           start_time: int = 0, recalculate_heuristic: bool = True,
+                           **options) -> List[Tuple[int, int]]:
+        instrumentation = self.instrumentation
+        instrumentation.reset()
+        self._neighbor_calls = self._neighbors_generated = 0
+        env = self.env
+        self.env = counting = CountingEnvironment(env)
+        started = time.perf_counter()
+        try:
+            path = type(self).plan(self, start, goal, start_time, recalculate_heuristic, **options)
+        finally:
+            total_time = time.perf_counter() - started
+            self.env = env
+        instrumentation.update(counting.counters())
+        instrumentation.update({'get_neighbors': self._neighbor_calls,
+                                'neighbors_generated': self._neighbors_generated,
+                                'nodes_expanded': self.nodes_expanded})
+        record = {'planner': type(self).__name__, 'start': tuple(start), 'goal': tuple(goal),
+                  'start_time': start_time, 'path_length': len(path) if path else 0,
+                  'total_time': total_time}
+        record.update(instrumentation.snapshot())
+        self.last_instrumentation = record
+        instrumentation.emit(record)
+        return path
         
     @abstractmethod
     def plan(self, start: Tuple[int, int], goal: Tuple[int, int], 
@@ -42,19 +112,27 @@ class Planner(ABC):
         pass
         
     def get_neighbors(self, x: int, y: int, time_step: int = 0) -> List[Tuple[int, int, int]]:
+        # One cost lookup per cell; a cost below BLOCKED is what
+        # is_valid_position checks inside the grid
+        env = self.env
+        width, height = env.width, env.height
         neighbors = []
         for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
             nx, ny = x + dx, y + dy
-            if self.env.is_valid_position(nx, ny, time_step):
-                cost = self.env.get_cost(nx, ny, time_step)
-                neighbors.append((nx, ny, cost))
+            if 0 <= nx < width and 0 <= ny < height:
+                cost = env.get_cost(nx, ny, time_step)
+                if cost < BLOCKED:
+                    neighbors.append((nx, ny, cost))
+        if self.allow_wait and 0 <= x < width and 0 <= y < height:
+            cost = env.get_cost(x, y, time_step)
+            if cost < BLOCKED:
+                neighbors.append((x, y, cost))
         return neighbors
 
 def calculate_path_cost(env, path: List[Tuple[int, int]], start_time: int = 0) -> int:
-    total_cost = 0
-    current_time = start_time
-    for i in range(1, len(path)):
-        x, y = path[i]
-        total_cost += env.get_cost(x, y, current_time)
-        current_time += 1
-    return total_cost
\ No newline at end of file
+    return path_eval.path_cost(env, path, start_time)
+
+def is_valid_path(env, path: List[Tuple[int, int]], start: Tuple[int, int], goal: Tuple[int, int],
+                  start_time: int = 0) -> bool:
+    """Whether path runs from start to goal in single moves (or waits) through free cells."""
+    return path_eval.is_valid_path(env, path, start, goal, start_time)
@@ -11,8 +11,12 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from src.environment import load_map_from_file
 from src.agent import calculate_path_cost
 from src.planners.uninformed import BFSPlanner, UniformCostPlanner
-from src.planners.informed import AStarPlanner
+from src.planners.informed import AStarPlanner, AnytimeAStarPlanner, ALTAStarPlanner
+from src.planners.hierarchical import HPAStarPlanner
 from src.planners.local_search import HillClimbingPlanner, SimulatedAnnealingPlanner
+from src.planners.genetic import GeneticPlanner
+from src.instrumentation import JsonLinesSink
+from src.map_cache import MapCache
 
 # Custom JSON encoder to handle numpy types
 class NumpyEncoder(json.JSONEncoder):
@@ -21,20 +25,25 @@ class NumpyEncoder(json.JSONEncoder):
             return int(obj) if isinstance(obj, np.integer) else float(obj)
         return super().default(obj)
 
-def run_single_experiment(map_file: str, start: tuple, goal: tuple, 
-                         planner_type: str, time_step: int = 0):
-    env = load_map_from_file(map_file)
-    
-    planners = {
-        'bfs': BFSPlanner(env),
-        'uniform': UniformCostPlanner(env),
-        'astar': AStarPlanner(env),
-        'hillclimb': HillClimbingPlanner(env),
-        'annealing': SimulatedAnnealingPlanner(env)
+PLANNER_TYPES = ['bfs', 'uniform', 'astar', 'alt', 'anytime', 'hpastar', 'hillclimb', 'annealing', 'genetic']
+
+def build_planner(env, planner_type: str, deadline: float = None, max_expansions: int = None,
+                  seed: int = None, workers: int = 1):
+    factories = {
+        'bfs': lambda: BFSPlanner(env),
+        'uniform': lambda: UniformCostPlanner(env),
+        'astar': lambda: AStarPlanner(env),
+        'alt': lambda: ALTAStarPlanner(env),
+        'anytime': lambda: AnytimeAStarPlanner(env, deadline=deadline, max_expansions=max_expansions),
+        'hpastar': lambda: HPAStarPlanner(env),
+        'hillclimb': lambda: HillClimbingPlanner(env, seed=seed, workers=workers),
+        'annealing': lambda: SimulatedAnnealingPlanner(env, seed=seed, workers=workers),
+        'genetic': lambda: GeneticPlanner(env, seed=seed)
     }
-    
-    planner = planners[planner_type]
-    
+    return factories[planner_type]()
+
+def run_query(env, planner, planner_type: str, start: tuple, goal: tuple, time_step: int = 0,
+              stats: bool = False):
     start_time = time.time()
     path = planner.plan(start, goal, time_step)
     planning_time = time.time() - start_time
@@ -49,25 +58,131 @@ def run_single_experiment(map_file: str, start: tuple, goal: tuple,
         'planning_time': float(planning_time),
         'path_found': len(path) > 0
     }
+    if planner_type == 'anytime':
+        result['suboptimality_bound'] = planner.bound if planner.bound != float('inf') else 'inf'
+    if stats:
+        result['stats'] = {key: planner.last_instrumentation[key]
+                           for key in ('counters', 'phases', 'total_time')}
     
     return result
 
+def run_single_experiment(map_file: str, start: tuple, goal: tuple, 
+                         planner_type: str, time_step: int = 0, stats: bool = False, stats_sink=None,
+                         deadline: float = None, max_expansions: int = None, seed: int = None,
+                         workers: int = 1):
+    env = load_map_from_file(map_file)
+    planner = build_planner(env, planner_type, deadline, max_expansions, seed, workers)
+    if stats or stats_sink is not None:
+        planner.instrument(stats_sink)
+    return run_query(env, planner, planner_type, start, goal, time_step, stats)
+
+def parse_position(value) -> tuple:
+    """(x, y) from "x,y" or a two-item list."""
+    if isinstance(value, str):
+        value = value.split(',')
+    x, y = map(int, value)
+    return x, y
+
+def check_positions(env, *cells):
+    """Raise ValueError for a cell outside env."""
+    for x, y in cells:
+        if not (0 <= x < env.width and 0 <= y < env.height):
+            raise ValueError(f"position ({x}, {y}) is outside the {env.width}x{env.height} map")
+
+def run_batch(lines, out, defaults: dict, stats_sink=None, cache: MapCache = None):
+    """Answer one JSON query per input line, writing one JSON result line each.
+
+    A query holds map, start, goal, planner and optionally time, deadline,
+    max_expansions, seed, workers, stats and an id that is echoed back;
+    missing fields come from defaults. Maps are parsed once and planners
+    reused across queries. A bad query yields {"error": ..., "line": n}
+    and the batch goes on.
+    """
+    cache = cache if cache is not None else MapCache()
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        query = {}
+        try:
+            query = json.loads(line)
+            if not isinstance(query, dict):
+                raise ValueError('query must be a JSON object')
+            fields = dict(defaults, **{key: value for key, value in query.items() if value is not None})
+            planner_type = fields['planner']
+            if planner_type not in PLANNER_TYPES:
+                raise ValueError(f"unknown planner {planner_type!r}")
+            options = (fields.get('deadline'), fields.get('max_expansions'), fields.get('seed'),
+                       fields.get('workers', 1))
+            stats = bool(fields.get('stats'))
+            instrumented = stats or stats_sink is not None
+
+            def factory(env):
+                planner = build_planner(env, planner_type, *options)
+                if instrumented:
+                    planner.instrument(stats_sink)
+                return planner
+
+            start, goal = parse_position(fields['start']), parse_position(fields['goal'])
+            with cache.checkout(fields['map'], (planner_type, options, instrumented), factory) as (env, planner):
+                check_positions(env, start, goal)
+                result = run_query(env, planner, planner_type, start, goal, int(fields.get('time', 0)), stats)
+        except Exception as e:  # reported on the query's line, the batch goes on
+            result = {'error': f"{type(e).__name__}: {e}", 'line': number}
+        if 'id' in query:
+            result['id'] = query['id']
+        out.write(json.dumps(result, cls=NumpyEncoder) + '\n')
+        out.flush()
+
 def main():
     parser = argparse.ArgumentParser(description='Autonomous Delivery Agent')
-    parser.add_argument('--map', type=str, required=True, help='Map file')
-    parser.add_argument('--start', type=str, required=True, help='Start position (x,y)')
-    parser.add_argument('--goal', type=str, required=True, help='Goal position (x,y)')
+    parser.add_argument('--map', type=str, help='Map file')
+    parser.add_argument('--start', type=str, help='Start position (x,y)')
+    parser.add_argument('--goal', type=str, help='Goal position (x,y)')
     parser.add_argument('--planner', type=str, 
-                       choices=['bfs', 'uniform', 'astar', 'hillclimb', 'annealing'],
-                       required=True, help='Planning algorithm')
+                       choices=PLANNER_TYPES,
+                       help='Planning algorithm')
     parser.add_argument('--time', type=int, default=0, help='Start time step')
+    parser.add_argument('--deadline', type=float, help='Planning budget in seconds (anytime planner)')
+    parser.add_argument('--max-expansions', type=int, help='Planning budget in expanded states (anytime planner)')
+    parser.add_argument('--seed', type=int, help='Seed the local-search planners (hillclimb, annealing, genetic)')
+    parser.add_argument('--workers', type=int, default=1, help='Processes for seeded local-search restarts')
+    parser.add_argument('--stats', action='store_true', help='Include planner counters and phase times')
+    parser.add_argument('--stats-file', type=str, help='Append planner counters and phase times as JSON lines')
+    parser.add_argument('--batch', type=str, metavar='FILE',
+                        help='Answer JSON-lines queries from FILE (- for stdin), one result line each; '
+                             'the other options give defaults for missing fields')
     
     args = parser.parse_args()
     
+    if args.batch:
+        defaults = {'map': args.map, 'start': args.start, 'goal': args.goal, 'planner': args.planner,
+                    'time': args.time, 'deadline': args.deadline, 'max_expansions': args.max_expansions,
+                    'seed': args.seed, 'workers': args.workers, 'stats': args.stats}
+        defaults = {key: value for key, value in defaults.items() if value is not None}
+        sink = JsonLinesSink(args.stats_file) if args.stats_file else None
+        source = sys.stdin if args.batch == '-' else open(args.batch)
+        try:
+            run_batch(source, sys.stdout, defaults, sink)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if sink is not None:
+                sink.close()
+        return
+    missing = [name for name in ('map', 'start', 'goal', 'planner') if getattr(args, name) is None]
+    if missing:
+        parser.error('the following arguments are required: ' + ', '.join('--' + name for name in missing))
+    
     start = tuple(map(int, args.start.split(',')))
     goal = tuple(map(int, args.goal.split(',')))
     
-    result = run_single_experiment(args.map, start, goal, args.planner, args.time)
+    sink = JsonLinesSink(args.stats_file) if args.stats_file else None
+    try:
+        result = run_single_experiment(args.map, start, goal, args.planner, args.time, args.stats, sink,
+                                       args.deadline, args.max_expansions, args.seed, args.workers)
+    finally:
+        if sink is not None:
+            sink.close()
     print(json.dumps(result, indent=2, cls=NumpyEncoder))
 
 if __name__ == '__main__':
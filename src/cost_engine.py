@@ -0,0 +1,451 @@
+"""
+Compiled space-time cost engine for GridEnvironment
+"""
+
+import math
+import threading
+import numpy as np
+from typing import Dict, List, Tuple, Optional
+
+BLOCKED = 9999
+
+# Serializes the lazy builds of engines and their tables, so threads
+# planning on one environment (the planning service) build each only once;
+# mutating an environment while other threads plan on it is not supported
+BUILD_LOCK = threading.RLock()
+
+# Neighbour offsets in Planner.get_neighbors order
+NEIGHBOR_OFFSETS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+class NeighborTable:
+    """CSR adjacency of the grid for the search kernel.
+
+    Row c lists the flat indices y * width + x of the cells a move from cell
+    c can enter, in get_neighbors order, with their terrain costs. Cells that
+    are blocked at every time step are left out. Cells whose cost depends on
+    time (moving obstacles, dynamic changes) are flagged in `dynamic`; only
+    those need a cost lookup, and a blocked check, at the time of the move.
+
+    indptr, indices, costs and dynamic are NumPy arrays. The search loops
+    index the memoryviews over them from scalar_view(), which return
+    plain ints.
+    """
+
+    def __init__(self, engine: 'CompiledCostEngine'):
+        width, height = engine.width, engine.height
+        cells = width * height
+        base = engine.base_costs()
+        dynamic = np.zeros(cells, dtype=bool)
+        dynamic[engine._flatten(engine.varying_cells(0))] = True
+        static = np.zeros(cells, dtype=bool)
+        static[engine._static_flat] = True
+        enterable = ~static & ((base < BLOCKED) | dynamic)
+
+        ys, xs = np.divmod(np.arange(cells, dtype=np.int64), width)
+        targets = np.empty((cells, len(NEIGHBOR_OFFSETS)), dtype=np.int64)
+        valid = np.empty(targets.shape, dtype=bool)
+        for column, (dx, dy) in enumerate(NEIGHBOR_OFFSETS):
+            nx, ny = xs + dx, ys + dy
+            inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+            targets[:, column] = np.where(inside, ny * width + nx, 0)
+            valid[:, column] = inside & enterable[targets[:, column]]
+
+        self.width = width
+        self.indptr = np.concatenate([[0], np.cumsum(valid.sum(axis=1))]).astype(np.int64)
+        self.indices = targets[valid]
+        self.costs = base[self.indices]
+        self.dynamic = dynamic
+        self._scalar = None
+
+    def scalar_view(self) -> Tuple[memoryview, memoryview, memoryview, memoryview]:
+        # Views over the arrays' own buffers, so the table is not held twice
+        if self._scalar is None:
+            self._scalar = (memoryview(self.indptr).cast('B').cast('q'),
+                            memoryview(self.indices).cast('B').cast('q'),
+                            memoryview(self.costs).cast('B').cast('q'),
+                            memoryview(self.dynamic.view(np.uint8)))
+        return self._scalar
+
+class CompiledCostEngine:
+    """Pre-indexed view of a GridEnvironment.
+
+    Dynamic changes are indexed per time step and cell, and moving obstacle
+    occupancy is indexed per phase of the obstacle periods, so a cost lookup
+    does not depend on the number of obstacles. The terrain array is shared
+    with the environment rather than copied.
+    """
+
+    # Largest combined obstacle period indexed as a single phase table
+    MAX_PHASES = 4096
+
+    def __init__(self, env):
+        self.env = env
+        self.rebuild()
+
+    def rebuild(self):
+        env = self.env
+        self.width = env.width
+        self.height = env.height
+        self.grid = env.grid
+        self.static = set(env.static_obstacles)
+        self._static_flat: Optional[np.ndarray] = None
+        self._neighbors: Optional[NeighborTable] = None
+        self._space_time: Optional[Tuple] = None
+        self.dynamic: Dict[int, Dict[Tuple[int, int], int]] = {}
+        self._dynamic_arrays: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self.last_change = -1
+        for time_step, changes in env.dynamic_changes.items():
+            for x, y, new_cost in changes:
+                self.patch_dynamic(time_step, x, y, new_cost)
+        self._index_moving()
+
+    def _index_moving(self):
+        obstacles = [o for o in self.env.moving_obstacles if o.positions]
+        self.period = 1
+        for obstacle in obstacles:
+            self.period = self.period * len(obstacle.positions) // math.gcd(self.period, len(obstacle.positions))
+        self._phase_arrays: Dict[int, np.ndarray] = {}
+        self._space_time = None
+
+        # One occupancy set per phase of the combined period when it is small
+        # enough, otherwise one table per distinct obstacle period.
+        if self.period <= self.MAX_PHASES:
+            self.phases: Optional[List[set]] = [set() for _ in range(self.period)]
+            self.groups: Dict[int, List[set]] = {}
+            for obstacle in obstacles:
+                positions = obstacle.positions
+                for phase in range(self.period):
+                    self.phases[phase].add(positions[phase % len(positions)])
+        else:
+            self.phases = None
+            self.groups = {}
+            for obstacle in obstacles:
+                positions = obstacle.positions
+                table = self.groups.setdefault(len(positions), [set() for _ in positions])
+                for phase, position in enumerate(positions):
+                    table[phase].add(position)
+
+    def patch_terrain(self, x: int, y: int):
+        # The terrain array is shared with the environment, nothing to reindex
+        self._neighbors = None
+
+    def patch_static(self, x: int, y: int):
+        self.static.add((x, y))
+        self._static_flat = None
+        self._neighbors = None
+        self._space_time = None
+
+    def patch_dynamic(self, time_step: int, x: int, y: int, new_cost: int):
+        # The first change recorded for a cell at a time step wins, matching
+        # the order in which GridEnvironment.dynamic_changes is scanned.
+        self.dynamic.setdefault(time_step, {}).setdefault((x, y), new_cost)
+        self._dynamic_arrays.pop(time_step, None)
+        self.last_change = max(self.last_change, time_step)
+        self._neighbors = None
+        self._space_time = None
+
+    def patch_dynamic_group(self, time_step: int, cells: List[Tuple[int, int]], new_costs: List[int]):
+        """patch_dynamic for many cells changed at one time step."""
+        changes = self.dynamic.get(time_step, {})
+        # Built back to front so the first change for a cell wins, then the
+        # changes already recorded win over the new ones
+        batch = dict(zip(reversed(cells), reversed(new_costs)))
+        batch.update(changes)
+        self.dynamic[time_step] = batch
+        self._dynamic_arrays.pop(time_step, None)
+        self.last_change = max(self.last_change, time_step)
+        self._neighbors = None
+        self._space_time = None
+
+    def patch_moving(self, positions: List[Tuple[int, int]]):
+        if not positions:
+            return
+        self._neighbors = None
+        period = len(positions)
+        if self.phases is not None and self.period % period == 0:
+            for phase in range(self.period):
+                self.phases[phase].add(positions[phase % period])
+            self._phase_arrays.clear()
+            self._space_time = None
+        else:
+            self._index_moving()
+
+    def neighbor_table(self) -> Optional[NeighborTable]:
+        """The grid adjacency, built on first use; None for terrain paged in by tile."""
+        if not isinstance(self.grid, np.ndarray):
+            return None
+        if self._neighbors is None:
+            with BUILD_LOCK:
+                if self._neighbors is None:
+                    self._neighbors = NeighborTable(self)
+        return self._neighbors
+
+    def fold_time(self, time_step: int) -> int:
+        """Map a time step onto a canonical one with identical costs everywhere.
+
+        After the last dynamic change only the moving obstacles depend on
+        time, and they repeat with the combined period, so later time steps
+        are folded onto one period. This keeps time-expanded state spaces
+        finite.
+        """
+        if time_step <= self.last_change:
+            return time_step
+        return self.last_change + 1 + (time_step - self.last_change - 1) % self.period
+
+    def is_static_from(self, time_step: int) -> bool:
+        """Whether every cell keeps the same cost from time_step on."""
+        return self.period == 1 and time_step > self.last_change
+
+    def time_dependent_cells(self, time_step: int) -> set:
+        """Cells whose cost at time_step may differ from their base cost."""
+        cells = set(self.dynamic.get(time_step, ()))
+        if self.phases is not None:
+            cells |= self.phases[time_step % self.period]
+        else:
+            for period, table in self.groups.items():
+                cells |= table[time_step % period]
+        return cells
+
+    def varying_cells(self, time_step: int) -> set:
+        """Cells whose cost at some time from time_step on may differ from their base cost."""
+        cells = set()
+        for change_time, changes in self.dynamic.items():
+            if change_time >= time_step:
+                cells.update(changes)
+        for table in ([self.phases] if self.phases is not None else self.groups.values()):
+            for occupied in table:
+                cells |= occupied
+        return cells
+
+    def lowest_dynamic_costs(self, time_step: int) -> Dict[Tuple[int, int], int]:
+        """Cheapest cost each cell takes through a dynamic change from time_step on."""
+        lowest = {}
+        for change_time, changes in self.dynamic.items():
+            if change_time >= time_step:
+                for cell, cost in changes.items():
+                    if cost < lowest.get(cell, BLOCKED + 1):
+                        lowest[cell] = cost
+        return lowest
+
+    def is_moving_obstacle(self, x: int, y: int, time_step: int) -> bool:
+        if self.phases is not None:
+            return (x, y) in self.phases[time_step % self.period]
+        for period, table in self.groups.items():
+            if (x, y) in table[time_step % period]:
+                return True
+        return False
+
+    def get_cost(self, x: int, y: int, time_step: int = 0) -> int:
+        if (x, y) in self.static:
+            return BLOCKED
+
+        changes = self.dynamic.get(time_step)
+        if changes is not None:
+            new_cost = changes.get((x, y))
+            if new_cost is not None:
+                return new_cost
+
+        if self.phases is not None:
+            if (x, y) in self.phases[time_step % self.period]:
+                return BLOCKED
+        elif self.is_moving_obstacle(x, y, time_step):
+            return BLOCKED
+
+        return self.grid.item(y, x)
+
+    def is_valid_position(self, x: int, y: int, time_step: int = 0) -> bool:
+        return (0 <= x < self.width and 0 <= y < self.height and
+                self.get_cost(x, y, time_step) < BLOCKED)
+
+    def _moving_flat(self, time_step: int) -> np.ndarray:
+        """Sorted flat indices of cells occupied by moving obstacles."""
+        if self.phases is not None:
+            phase = time_step % self.period
+            cached = self._phase_arrays.get(phase)
+            if cached is None:
+                with BUILD_LOCK:
+                    cached = self._phase_arrays.get(phase)
+                    if cached is None:
+                        cached = self._phase_arrays[phase] = self._flatten(self.phases[phase])
+            return cached
+        occupied = set()
+        for period, table in self.groups.items():
+            occupied |= table[time_step % period]
+        return self._flatten(occupied)
+
+    def _flatten(self, cells) -> np.ndarray:
+        flat = [y * self.width + x for x, y in cells
+                if 0 <= x < self.width and 0 <= y < self.height]
+        return np.unique(np.array(flat, dtype=np.int64))
+
+    def _dynamic_flat(self, time_step: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted flat indices and costs of the dynamic changes at a time step."""
+        cached = self._dynamic_arrays.get(time_step)
+        if cached is None:
+            changes = self.dynamic.get(time_step, {})
+            items = sorted((y * self.width + x, cost) for (x, y), cost in changes.items()
+                           if 0 <= x < self.width and 0 <= y < self.height)
+            keys = np.array([k for k, _ in items], dtype=np.int64)
+            costs = np.array([c for _, c in items], dtype=np.int64)
+            cached = (keys, costs)
+            self._dynamic_arrays[time_step] = cached
+        return cached
+
+    def costs(self, xs, ys, time_step: int = 0) -> np.ndarray:
+        """Costs of many cells at one time step; out-of-bounds cells are BLOCKED."""
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        xs, ys = np.broadcast_arrays(xs, ys)
+        result = np.full(xs.shape, BLOCKED, dtype=np.int64)
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        xi, yi = xs[inside], ys[inside]
+        flat = yi * self.width + xi
+
+        values = np.asarray(self.grid[yi, xi], dtype=np.int64)
+        values[np.isin(flat, self._moving_flat(time_step))] = BLOCKED
+        keys, new_costs = self._dynamic_flat(time_step)
+        if len(keys):
+            pos = np.searchsorted(keys, flat)
+            pos[pos == len(keys)] = 0
+            hit = keys[pos] == flat
+            values[hit] = new_costs[pos[hit]]
+        if self._static_flat is None:
+            self._static_flat = self._flatten(self.static)
+        values[np.isin(flat, self._static_flat)] = BLOCKED
+
+        result[inside] = values
+        return result
+
+    def _space_time_index(self) -> Tuple[List[Tuple[int, np.ndarray]], np.ndarray, np.ndarray]:
+        """Sorted space-time keys for costs_along, built on first use.
+
+        Moving obstacles: one (period, keys) pair per obstacle table, keys
+        phase * cells + flat. Dynamic changes: keys time * cells + flat,
+        with their costs.
+        """
+        if self._space_time is None:
+            with BUILD_LOCK:
+                if self._space_time is None:
+                    self._space_time = self._build_space_time()
+        return self._space_time
+
+    def _build_space_time(self) -> Tuple[List[Tuple[int, np.ndarray]], np.ndarray, np.ndarray]:
+        cells = self.width * self.height
+        tables = [(self.period, self.phases)] if self.phases is not None else list(self.groups.items())
+        moving = []
+        for period, table in tables:
+            keys = [self._flatten(occupied) + phase * cells for phase, occupied in enumerate(table)]
+            keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+            if len(keys):
+                moving.append((period, np.sort(keys)))
+        items = sorted((time_step * cells + y * self.width + x, cost)
+                       for time_step, changes in self.dynamic.items()
+                       for (x, y), cost in changes.items()
+                       if 0 <= x < self.width and 0 <= y < self.height)
+        keys = np.array([key for key, _ in items], dtype=np.int64)
+        costs = np.array([cost for _, cost in items], dtype=np.int64)
+        return moving, keys, costs
+
+    @staticmethod
+    def _find(keys: np.ndarray, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions of queries in the sorted keys, and which are present."""
+        pos = np.searchsorted(keys, queries)
+        pos[pos == len(keys)] = 0
+        return pos, keys[pos] == queries
+
+    def costs_along(self, xs, ys, times) -> np.ndarray:
+        """Cost of each cell (xs[i], ys[i]) at times[i], as get_cost gives it,
+        in one pass; out-of-bounds cells are BLOCKED."""
+        xs, ys, times = (np.asarray(a, dtype=np.int64) for a in np.broadcast_arrays(xs, ys, times))
+        result = np.full(xs.shape, BLOCKED, dtype=np.int64)
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        xi, yi, ti = xs[inside], ys[inside], times[inside]
+        if not len(xi):
+            return result
+        cells = self.width * self.height
+        flat = yi * self.width + xi
+        values = np.asarray(self.grid[yi, xi], dtype=np.int64)
+
+        moving, keys, new_costs = self._space_time_index()
+        for period, occupied in moving:
+            values[self._find(occupied, (ti % period) * cells + flat)[1]] = BLOCKED
+        # A dynamic change overrides a moving obstacle, a static obstacle both
+        if len(keys):
+            pos, hit = self._find(keys, ti * cells + flat)
+            values[hit] = new_costs[pos[hit]]
+        if self._static_flat is None:
+            self._static_flat = self._flatten(self.static)
+        if len(self._static_flat):
+            values[self._find(self._static_flat, flat)[1]] = BLOCKED
+
+        result[inside] = values
+        return result
+
+    def base_costs(self) -> np.ndarray:
+        """Flat terrain costs indexed y * width + x, with static obstacles blocked.
+
+        Needs the terrain in memory; terrain paged in by tile is read
+        where it is needed through base_costs_at instead.
+        """
+        if not isinstance(self.grid, np.ndarray):
+            raise TypeError(f"base_costs() needs in-memory terrain, not {type(self.grid).__name__}; "
+                            "use base_costs_at()")
+        base = np.array(self.grid, dtype=np.int64).reshape(-1)
+        if self._static_flat is None:
+            self._static_flat = self._flatten(self.static)
+        base[self._static_flat] = BLOCKED
+        return base
+
+    def base_costs_at(self, flat: np.ndarray) -> np.ndarray:
+        """base_costs()[flat] gathered through the terrain backend, so only
+        the tiles flat points into are read."""
+        flat = np.asarray(flat, dtype=np.int64)
+        ys, xs = np.divmod(flat, self.width)
+        values = np.asarray(self.grid[ys, xs], dtype=np.int64)
+        if self._static_flat is None:
+            self._static_flat = self._flatten(self.static)
+        values[np.isin(flat, self._static_flat)] = BLOCKED
+        return values
+
+    def overlay(self, t0: int, t1: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse space-time overlay on base_costs() for time steps t0..t1-1.
+
+        Returns the sorted keys (t - t0) * width * height + y * width + x of
+        every cell a moving obstacle or dynamic change affects at time t, and
+        the cost of each such cell at that time.
+        """
+        cells = self.width * self.height
+        if self._static_flat is None:
+            self._static_flat = self._flatten(self.static)
+        keys, costs = [], []
+        for time_step in range(t0, t1):
+            moving = self._moving_flat(time_step)
+            changed, new_costs = self._dynamic_flat(time_step)
+            # A dynamic change overrides a moving obstacle on the same cell
+            if len(changed):
+                moving = moving[~np.isin(moving, changed)]
+            offset = (time_step - t0) * cells
+            keys.append(moving + offset)
+            costs.append(np.full(len(moving), BLOCKED, dtype=np.int64))
+            keys.append(changed + offset)
+            costs.append(new_costs)
+        if not keys:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        keys, costs = np.concatenate(keys), np.concatenate(costs)
+        order = np.argsort(keys, kind='stable')
+        keys, costs = keys[order], costs[order]
+        costs[np.isin(keys % cells, self._static_flat)] = BLOCKED
+        return keys, costs
+
+    def neighborhood(self, x: int, y: int, time_step: int = 0, radius: int = 1) -> np.ndarray:
+        """(2r+1, 2r+1) block of costs centred on (x, y), indexed [dy, dx]."""
+        offsets = np.arange(-radius, radius + 1)
+        ys, xs = np.meshgrid(y + offsets, x + offsets, indexing='ij')
+        return self.costs(xs, ys, time_step)
+
+    def row(self, y: int, time_step: int = 0, x0: int = 0, x1: Optional[int] = None) -> np.ndarray:
+        """Costs of cells x0..x1-1 on row y."""
+        if x1 is None:
+            x1 = self.width
+        xs = np.arange(x0, x1)
+        return self.costs(xs, np.full_like(xs, y), time_step)
@@ -1,8 +1,15 @@
+import weakref
 import numpy as np
+from bisect import bisect_left, bisect_right
 from enum import Enum
 from typing import List, Tuple, Dict, Optional
 from dataclasses import dataclass
 
+try:
+    from cost_engine import BUILD_LOCK, CompiledCostEngine, BLOCKED
+except ImportError:  # imported as src.environment
+    from .cost_engine import BUILD_LOCK, CompiledCostEngine, BLOCKED
+
 class CellType(Enum):
     ROAD = 1
     GRASS = 3
@@ -18,63 +25,374 @@ class MovingObstacle:
     def get_position_at_time(self, time_step: int) -> Tuple[int, int]:
         return self.positions[time_step % len(self.positions)]
 
+# Stands for "every cell" in the x column and "every time step" in the
+# time column of a ChangeLog
+ALL = -1
+
+@dataclass
+class ChangeSummary:
+    """Where and when the changes between two change log versions apply.
+
+    bounds is the (x0, y0, x1, y1) box, ends exclusive, around the changed
+    cells and blocks the sorted ids (y // block_size) * columns + x //
+    block_size of the block_size squares containing them. time_window is
+    the (t0, t1) range, end exclusive, of the timed changes, and
+    all_times whether some change applies at every time step. everything
+    means the whole map may have changed.
+    """
+    start_version: int
+    end_version: int
+    cells: int
+    everything: bool
+    bounds: Optional[Tuple[int, int, int, int]]
+    time_window: Optional[Tuple[int, int]]
+    all_times: bool
+    block_size: int
+    blocks: np.ndarray
+
+    def __bool__(self) -> bool:
+        return self.cells > 0
+
+class ChangeLog:
+    """Cells touched by GridEnvironment mutations, in order, with the time
+    step each change applies to.
+
+    Single changes collect in a list; bulk updates are kept as the arrays
+    they came in, so logging a batch does not depend on its size. A
+    version is the number of changes logged before it, and the start
+    version of every array chunk is indexed for bisecting to it.
+    lowered lists, in order, the versions of the changes (or the start
+    versions of the batches) that may have made some cost cheaper.
+
+    Versions count every change ever logged, but only the changes from
+    base on are kept: compact() drops older ones, never past the
+    env_version of a registered reader, and runs by itself once more than
+    max_entries changes are kept. Reading from a version before base
+    yields one change of every cell at every time step.
+    """
+
+    def __init__(self, max_entries: int = 1 << 20):
+        self.max_entries = max_entries
+        self.readers = weakref.WeakSet()
+        self.base = 0
+        self.starts: List[int] = []
+        self.chunks: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        # Version at the end of the chunks, where the tail starts
+        self.size = 0
+        self.tail: List[Tuple[Optional[Tuple[int, int]], Optional[int]]] = []
+        self.lowered: List[int] = []
+
+    def __getstate__(self):
+        # Readers stay with the process that registered them
+        state = self.__dict__.copy()
+        del state['readers']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.readers = weakref.WeakSet()
+
+    def __len__(self) -> int:
+        return self.size + len(self.tail)
+
+    def clear(self):
+        """Drop every kept change; versions keep counting."""
+        self.compact(len(self), force=True)
+
+    def compact(self, version: Optional[int] = None, force: bool = False):
+        """Drop the changes before version (default: all), but unless forced
+        none a registered reader has not read yet."""
+        version = len(self) if version is None else min(version, len(self))
+        if not force:
+            version = min([version] + [reader.env_version for reader in self.readers])
+        if version <= self.base:
+            return
+        first = bisect_right(self.starts, version) - 1
+        partial = first >= 0 and self.starts[first] < version < self.starts[first] + len(self.chunks[first][0])
+        cut = bisect_left(self.lowered, version)
+        lowered = self.lowered[cut:]
+        if partial and cut and self.lowered[cut - 1] >= self.starts[first]:
+            # The rest of a batch marked lowered keeps the mark
+            lowered.insert(0, version)
+        if version >= self.size:
+            self.tail = self.tail[version - self.size:]
+            self.starts, self.chunks, self.size = [], [], version
+        else:
+            self.starts, self.chunks = self.starts[max(first, 0):], self.chunks[max(first, 0):]
+            if partial:
+                skip = version - self.starts[0]
+                # Copied so the dropped part of the batch is freed
+                self.chunks[0] = tuple(column[skip:].copy() for column in self.chunks[0])
+                self.starts[0] = version
+        self.lowered = lowered
+        self.base = version
+
+    def _trim(self):
+        if len(self) - self.base > self.max_entries:
+            self.compact()
+
+    def append(self, cell: Optional[Tuple[int, int]], time_step: Optional[int] = None, lowered: bool = False):
+        if lowered:
+            self.lowered.append(len(self))
+        self.tail.append((cell, time_step))
+        self._trim()
+
+    def lowered_since(self, version: int) -> bool:
+        """Whether a change from version on may have lowered a cost."""
+        return version < self.base or bisect_left(self.lowered, version) < len(self.lowered)
+
+    def _tail_arrays(self, tail) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        xs = np.array([ALL if cell is None else cell[0] for cell, _ in tail], dtype=np.int64)
+        ys = np.array([ALL if cell is None else cell[1] for cell, _ in tail], dtype=np.int64)
+        times = np.array([ALL if time_step is None else time_step for _, time_step in tail], dtype=np.int64)
+        return xs, ys, times
+
+    def extend(self, xs: np.ndarray, ys: np.ndarray, times: np.ndarray, lowered: bool = False):
+        """Log a batch of changes, given as equally long int64 arrays."""
+        if lowered and len(xs):
+            self.lowered.append(len(self))
+        if self.tail:
+            self.starts.append(self.size)
+            self.chunks.append(self._tail_arrays(self.tail))
+            self.size += len(self.tail)
+            self.tail = []
+        if len(xs):
+            self.starts.append(self.size)
+            self.chunks.append((xs, ys, times))
+            self.size += len(xs)
+        self._trim()
+
+    def arrays_since(self, version: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """xs, ys and times of the changes from version on, ALL marking every
+        cell or every time step."""
+        parts = []
+        if version < self.base:
+            parts.append(tuple(np.array([ALL], dtype=np.int64) for _ in range(3)))
+        first = max(bisect_right(self.starts, version) - 1, 0)
+        for start, chunk in zip(self.starts[first:], self.chunks[first:]):
+            skip = max(version - start, 0)
+            parts.append(tuple(column[skip:] for column in chunk))
+        tail = self.tail[max(version - self.size, 0):]
+        if tail:
+            parts.append(self._tail_arrays(tail))
+        if not parts:
+            return tuple(np.empty(0, dtype=np.int64) for _ in range(3))
+        return tuple(np.concatenate(columns) for columns in zip(*parts))
+
+    def since(self, version: int) -> List[Tuple[Optional[Tuple[int, int]], Optional[int]]]:
+        if version >= self.size:
+            return self.tail[version - self.size:]
+        xs, ys, times = self.arrays_since(version)
+        return [(None if x == ALL else (x, y), None if t == ALL else t)
+                for x, y, t in zip(xs.tolist(), ys.tolist(), times.tolist())]
+
+    def summary(self, version: int, width: int, height: int, block_size: int = 16) -> ChangeSummary:
+        xs, ys, times = self.arrays_since(version)
+        cells = xs != ALL
+        everything = not cells.all()
+        xs, ys = xs[cells], ys[cells]
+        timed = times[times != ALL]
+        bounds = None
+        if len(xs):
+            bounds = (int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+        columns = (width + block_size - 1) // block_size
+        return ChangeSummary(
+            start_version=version, end_version=len(self), cells=len(times), everything=everything,
+            bounds=bounds,
+            time_window=(int(timed.min()), int(timed.max()) + 1) if len(timed) else None,
+            all_times=len(timed) < len(times), block_size=block_size,
+            blocks=np.unique((ys // block_size) * columns + xs // block_size))
+
+def _change_arrays(width: int, height: int, *columns) -> List[np.ndarray]:
+    """Flat int64 copies of broadcast coordinate and value arrays, with
+    the coordinates checked against the grid."""
+    columns = [np.asarray(column, dtype=np.int64).ravel() for column in np.broadcast_arrays(*columns)]
+    xs, ys = columns[-3], columns[-2]
+    if len(xs) and (xs.min() < 0 or xs.max() >= width or ys.min() < 0 or ys.max() >= height):
+        raise ValueError(f"Cell coordinates outside the {width}x{height} grid")
+    return columns
+
 class GridEnvironment:
-    def __init__(self, width: int, height: int):
+    def __init__(self, width: int, height: int, grid: Optional[np.ndarray] = None):
         self.width = width
         self.height = height
-        self.grid = np.ones((height, width), dtype=int)
+        # A supplied terrain array (e.g. a memory map) is used as is, not copied
+        if grid is not None and grid.shape != (height, width):
+            raise ValueError(f"Terrain shape {grid.shape} does not match {width}x{height}")
+        self.grid = grid if grid is not None else np.ones((height, width), dtype=int)
         self.static_obstacles = set()
         self.moving_obstacles: List[MovingObstacle] = []
         self.dynamic_changes: Dict[int, List[Tuple[int, int, int]]] = {}
+        self._engine: Optional[CompiledCostEngine] = None
+        # Cells touched by each mutation, in order, and the time step each
+        # change applies to; a None cell means "anything may have changed".
+        # Incremental planners and caches replay it from their version and
+        # register through track_changes so compaction keeps what they need.
+        self.change_log = ChangeLog()
+        # Map file the environment was loaded from, if any, and its version then
+        self.source: Optional[str] = None
+        self.source_version: Optional[int] = None
+        
+    def __getstate__(self):
+        # The compiled engine is rebuilt on demand after unpickling
+        state = self.__dict__.copy()
+        state['_engine'] = None
+        return state
+        
+    @property
+    def version(self) -> int:
+        return len(self.change_log)
+    
+    def changes_since(self, version: int) -> List[Optional[Tuple[int, int]]]:
+        return [cell for cell, _ in self.change_log.since(version)]
+    
+    def timed_changes_since(self, version: int) -> List[Tuple[Optional[Tuple[int, int]], Optional[int]]]:
+        """(cell, time step) of each change since version; a None time step
+        means every time step, a None cell every cell."""
+        return self.change_log.since(version)
+    
+    def change_summary(self, version: int = 0, block_size: int = 16) -> ChangeSummary:
+        """Summary of the changes since version."""
+        return self.change_log.summary(version, self.width, self.height, block_size)
+    
+    def clear_changes(self):
+        """Forget the logged changes, e.g. once a freshly built map is
+        complete. Versions keep counting; readers of older versions are
+        told that everything may have changed."""
+        self.change_log.clear()
+    
+    def compact_changes(self, version: Optional[int] = None):
+        """Drop the logged changes before version (default: all) that no
+        tracked reader still needs."""
+        self.change_log.compact(version)
+    
+    def track_changes(self, reader):
+        """Keep the changes since reader.env_version for as long as reader lives."""
+        self.change_log.readers.add(reader)
+    
+    def costs_lowered_since(self, version: int) -> bool:
+        """Whether a change since version may have made some cost cheaper;
+        True for invalidate(), which may have changed anything."""
+        return self.change_log.lowered_since(version)
+    
+    def _log_change(self, cell: Optional[Tuple[int, int]], time_step: Optional[int] = None,
+                    lowered: bool = False):
+        self.change_log.append(cell, time_step, lowered or cell is None)
+
         
     def set_terrain_cost(self, x: int, y: int, cost: int):
+        lowered = cost < self.grid[y, x]
         self.grid[y, x] = cost
+        self._log_change((x, y), lowered=lowered)
+        if self._engine is not None:
+            self._engine.patch_terrain(x, y)
+        
+    def set_terrain_costs(self, xs, ys, costs) -> ChangeSummary:
+        """set_terrain_cost for arrays of cells (broadcast together), applied
+        with one indexed assignment. Where a cell repeats, the last cost wins.
+        Returns the summary of the logged changes."""
+        xs, ys, costs = _change_arrays(self.width, self.height, xs, ys, costs)
+        version = self.version
+        # NumPy leaves the winner among repeated indices unspecified
+        flat = ys * self.width + xs
+        _, last = np.unique(flat[::-1], return_index=True)
+        keep = len(flat) - 1 - last
+        lowered = bool((costs[keep] < np.asarray(self.grid[ys[keep], xs[keep]])).any())
+        self.grid[ys[keep], xs[keep]] = costs[keep]
+        self.change_log.extend(xs, ys, np.full(len(xs), ALL, dtype=np.int64), lowered)
+        if self._engine is not None and len(xs):
+            self._engine.patch_terrain(int(xs[0]), int(ys[0]))
+        return self.change_summary(version)
         
     def add_static_obstacle(self, x: int, y: int):
         self.static_obstacles.add((x, y))
+        self._log_change((x, y))
+        if self._engine is not None:
+            self._engine.patch_static(x, y)
         
     def add_moving_obstacle(self, positions: List[Tuple[int, int]]):
         self.moving_obstacles.append(MovingObstacle(positions))
+        for position in positions:
+            self._log_change(position)
+        if self._engine is not None:
+            self._engine.patch_moving(positions)
         
     def add_dynamic_change(self, time_step: int, x: int, y: int, new_cost: int):
         if time_step not in self.dynamic_changes:
             self.dynamic_changes[time_step] = []
+        # Without a compiled engine nothing has read the costs yet; the
+        # change counts as a possible decrease rather than compiling one
+        lowered = new_cost < (BLOCKED if self._engine is None else self._engine.get_cost(x, y, time_step))
         self.dynamic_changes[time_step].append((x, y, new_cost))
+        self._log_change((x, y), time_step, lowered)
+        if self._engine is not None:
+            self._engine.patch_dynamic(time_step, x, y, new_cost)
+    
+    def add_dynamic_changes(self, time_steps, xs, ys, new_costs) -> ChangeSummary:
+        """add_dynamic_change for arrays of changes (broadcast together), grouped
+        by time step. As for single changes, the first change recorded for a
+        cell at a time step wins. Returns the summary of the logged changes."""
+        time_steps, xs, ys, new_costs = _change_arrays(self.width, self.height, time_steps, xs, ys, new_costs)
+        version = self.version
+        before = (np.full(len(xs), BLOCKED, dtype=np.int64) if self._engine is None
+                  else self._engine.costs_along(xs, ys, time_steps))
+        lowered = bool((new_costs < before).any())
+        order = np.argsort(time_steps, kind='stable')
+        sorted_times = time_steps[order]
+        sorted_xs, sorted_ys, costs = xs[order].tolist(), ys[order].tolist(), new_costs[order].tolist()
+        cells = list(zip(sorted_xs, sorted_ys))
+        entries = list(zip(sorted_xs, sorted_ys, costs))
+        bounds = np.flatnonzero(np.diff(sorted_times)) + 1
+        for lo, hi in zip([0] + bounds.tolist(), bounds.tolist() + [len(order)]):
+            if lo == hi:
+                continue
+            time_step = int(sorted_times[lo])
+            self.dynamic_changes.setdefault(time_step, []).extend(entries[lo:hi])
+            if self._engine is not None:
+                self._engine.patch_dynamic_group(time_step, cells[lo:hi], costs[lo:hi])
+        self.change_log.extend(xs, ys, time_steps, lowered)
+        return self.change_summary(version)
+    
+    def compile(self) -> CompiledCostEngine:
+        """Return the compiled cost engine, building it on first use."""
+        if self._engine is None:
+            with BUILD_LOCK:
+                if self._engine is None:
+                    self._engine = CompiledCostEngine(self)
+        return self._engine
+    
+    def invalidate(self):
+        """Drop the compiled engine after mutating the public attributes directly."""
+        self._engine = None
+        self._log_change(None)
         
     def get_cost(self, x: int, y: int, time_step: int = 0) -> int:
-        if (x, y) in self.static_obstacles:
-            return 9999
-            
-        if time_step in self.dynamic_changes:
-            for dx, dy, new_cost in self.dynamic_changes[time_step]:
-                if dx == x and dy == y:
-                    return new_cost
-        
-        for obstacle in self.moving_obstacles:
-            if obstacle.get_position_at_time(time_step) == (x, y):
-                return 9999
-                
-        return self.grid[y, x]
+        engine = self._engine
+        if engine is None:
+            engine = self.compile()
+        return engine.get_cost(x, y, time_step)
+    
+    def get_costs(self, xs, ys, time_step: int = 0) -> np.ndarray:
+        return self.compile().costs(xs, ys, time_step)
+    
+    def costs_along(self, xs, ys, times) -> np.ndarray:
+        """Cost of each cell at its own time step, e.g. along a path."""
+        return self.compile().costs_along(xs, ys, times)
     
     def is_valid_position(self, x: int, y: int, time_step: int = 0) -> bool:
         return (0 <= x < self.width and 0 <= y < self.height and 
-                self.get_cost(x, y, time_step) < 9999)
+                self.get_cost(x, y, time_step) < BLOCKED)
 
 def load_map_from_file(filename: str) -> GridEnvironment:
-    with open(filename, 'r') as f:
-        lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
-    
-    if not lines:
-        raise ValueError("Map file is empty")
-    
-    width, height = map(int, lines[0].split())
-    env = GridEnvironment(width, height)
-    
-    for y in range(height):
-        if y + 1 >= len(lines):
-            break
-        row = list(map(int, lines[1+y].split()))
-        for x in range(min(width, len(row))):
-            env.set_terrain_cost(x, y, row[x])
+    # Binary maps are memory-mapped; text maps are parsed with all sections
+    try:
+        from map_format import is_binary_map, load_binary_map, parse_text_map
+    except ImportError:  # imported as src.environment
+        from .map_format import is_binary_map, load_binary_map, parse_text_map
     
-    return env
\ No newline at end of file
+    if is_binary_map(filename):
+        env = load_binary_map(filename)
+    else:
+        env = parse_text_map(filename).to_environment()
+    env.source, env.source_version = filename, env.version
+    return env
@@ -0,0 +1,255 @@
+"""
+Cooperative planning for fleets of delivery agents sharing one grid
+"""
+
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+try:
+    from agent import DeliveryAgent
+    from planners.informed import AStarPlanner
+except ImportError:  # imported as src.fleet
+    from .agent import DeliveryAgent
+    from .planners.informed import AStarPlanner
+
+Cell = Tuple[int, int]
+
+class ReservationTable:
+    """Space-time cells and moves claimed by already planned agents.
+
+    Vertex reservations are keyed time * cells + flat cell, move
+    reservations by (arrival time, from, to), and an agent parked on its
+    goal blocks that cell from its arrival on. Every check is a few dict
+    lookups, independent of the number of agents.
+
+    Planners read the table through planner.reservations: the search
+    kernel skips a move into a reserved cell, and a move that swaps
+    places with another agent.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.cells = width * height
+        self.vertices: Dict[int, Hashable] = {}
+        self.edges: Dict[int, Hashable] = {}
+        self.parked: Dict[int, Tuple[int, Hashable]] = {}
+        self.owned: Dict[Hashable, List[Tuple[Dict, int]]] = {}
+        # Latest vertex reservation per flat cell, and over all cells
+        self.latest: Dict[int, int] = {}
+        self.horizon = -1
+
+    def __len__(self) -> int:
+        return len(self.vertices) + len(self.parked)
+
+    def _flat(self, cell: Cell) -> int:
+        return cell[1] * self.width + cell[0]
+
+    def reserve_path(self, agent: Hashable, path: Sequence[Cell], start_time: int = 0,
+                     steps: Optional[int] = None, park: bool = True):
+        """Reserve path[0..steps] from start_time, and the last cell for good
+        when the whole path is reserved and park is set."""
+        if not path:
+            return
+        owned = self.owned.setdefault(agent, [])
+        last = len(path) - 1 if steps is None else min(steps, len(path) - 1)
+        previous = None
+        for i in range(last + 1):
+            flat = self._flat(path[i])
+            time_step = start_time + i
+            key = time_step * self.cells + flat
+            self.vertices[key] = agent
+            owned.append((self.vertices, key))
+            if self.latest.get(flat, -1) < time_step:
+                self.latest[flat] = time_step
+            if previous is not None and previous != flat:
+                key = (time_step * self.cells + previous) * self.cells + flat
+                self.edges[key] = agent
+                owned.append((self.edges, key))
+            previous = flat
+        self.horizon = max(self.horizon, start_time + last)
+        if park and last == len(path) - 1:
+            self.parked[previous] = (start_time + last, agent)
+            owned.append((self.parked, previous))
+
+    def release(self, agent: Hashable):
+        """Drop every reservation of agent."""
+        for table, key in self.owned.pop(agent, ()):
+            holder = table.get(key)
+            if holder is not None and (holder[1] if table is self.parked else holder) == agent:
+                del table[key]
+        self.latest = {}
+        for key in self.vertices:
+            time_step, flat = divmod(key, self.cells)
+            if self.latest.get(flat, -1) < time_step:
+                self.latest[flat] = time_step
+
+    def clear(self):
+        self.vertices.clear()
+        self.edges.clear()
+        self.parked.clear()
+        self.owned.clear()
+        self.latest.clear()
+        self.horizon = -1
+
+    def blocks(self, source: int, target: int, time_step: int) -> bool:
+        """Whether moving from flat cell source to target, arriving at
+        time_step, runs into a reservation."""
+        cells = self.cells
+        key = time_step * cells + target
+        if key in self.vertices:
+            return True
+        parked = self.parked.get(target)
+        if parked is not None and time_step >= parked[0]:
+            return True
+        # Another agent moving target -> source over the same step
+        return source != target and key * cells + source in self.edges
+
+    def can_stay(self, flat: int, time_step: int) -> bool:
+        """Whether an agent reaching flat cell at time_step may stay there for
+        good, i.e. no other agent passes through it later."""
+        return self.latest.get(flat, -1) <= time_step and flat not in self.parked
+
+    def is_reserved(self, x: int, y: int, time_step: int) -> bool:
+        flat = y * self.width + x
+        return self.blocks(flat, flat, time_step)
+
+def find_conflicts(paths: Dict[Hashable, Sequence[Cell]], start_time: int = 0) -> List[Tuple]:
+    """Vertex and swap conflicts between paths that all start at start_time.
+
+    An agent stays on the last cell of its path once it gets there.
+    Returns ('vertex', time, cell, a, b) and ('swap', time, cell, a, b)
+    tuples.
+    """
+    conflicts = []
+    agents = [agent for agent, path in paths.items() if path]
+    end = max((len(paths[agent]) for agent in agents), default=0)
+    position = lambda agent, i: paths[agent][min(i, len(paths[agent]) - 1)]
+    for i in range(end):
+        occupied = {}
+        for agent in agents:
+            cell = position(agent, i)
+            other = occupied.get(cell)
+            if other is not None:
+                conflicts.append(('vertex', start_time + i, cell, other, agent))
+            else:
+                occupied[cell] = agent
+            if i:
+                previous = position(agent, i - 1)
+                if previous != cell:
+                    other = occupied.get(previous)
+                    if other is not None and other != agent and position(other, i - 1) == cell:
+                        conflicts.append(('swap', start_time + i, cell, other, agent))
+    return conflicts
+
+class FleetPlanner:
+    """Prioritized cooperative planning for DeliveryAgents on one environment.
+
+    Agents plan one after another in priority order; each path is written
+    to a shared ReservationTable, so later agents route around earlier
+    ones as around moving obstacles, waiting in place where needed.
+
+    priority is 'distance' (longest trip first), 'order' (as given) or a
+    key function of the agent. With a window, only the first `window`
+    steps of each path are reserved and run() re-plans every `window`
+    steps, rotating the priorities between rounds.
+    """
+
+    def __init__(self, env, planner_factory: Optional[Callable] = None,
+                 priority: Union[str, Callable[[DeliveryAgent], float]] = 'distance',
+                 window: Optional[int] = None):
+        self.env = env
+        self.planner = (planner_factory or self._default_planner)(env)
+        self.reservations = ReservationTable(env.width, env.height)
+        self.planner.reservations = self.reservations
+        self.priority = priority
+        self.window = window
+        self.last_stats: Dict[str, float] = {}
+
+    @staticmethod
+    def _default_planner(env):
+        return AStarPlanner(env, allow_wait=True, bidirectional=False)
+
+    def _ordered(self, agents: Sequence[DeliveryAgent]) -> List[int]:
+        indices = list(range(len(agents)))
+        if self.priority == 'order':
+            return indices
+        if self.priority == 'distance':
+            key = lambda i: -(abs(agents[i].goal[0] - agents[i].position[0]) +
+                              abs(agents[i].goal[1] - agents[i].position[1]))
+        else:
+            key = lambda i: self.priority(agents[i])
+        return sorted(indices, key=key)
+
+    def _stay(self, index: int, agent: DeliveryAgent):
+        self.reservations.reserve_path(index, [agent.position] * ((self.window or 0) + 1),
+                                       agent.time_step, self.window)
+
+    def plan(self, agents: Sequence[DeliveryAgent], order: Optional[List[int]] = None) -> List[List[Cell]]:
+        """Plan every agent from its position and time step, in priority order.
+
+        Sets each agent's path, as DeliveryAgent.replan does, and returns
+        the paths. An agent without a path stays put: its cell is reserved
+        ahead of everyone and the agents planned before it plan again, so
+        none of them drives through it.
+        """
+        order = order if order is not None else self._ordered(agents)
+        stuck: List[int] = []
+        nodes = 0
+        while True:
+            self.reservations.clear()
+            for index in stuck:
+                self._stay(index, agents[index])
+            planned = 0
+            for index in order:
+                if index in stuck:
+                    continue
+                agent = agents[index]
+                path = agent.replan(self.planner)
+                nodes += self.planner.nodes_expanded
+                if not path:
+                    stuck.append(index)
+                    if planned:
+                        break
+                    self._stay(index, agent)
+                    continue
+                self.reservations.reserve_path(index, path, agent.time_step, self.window)
+                planned += 1
+            else:
+                break
+        self.last_stats = {'agents': len(agents), 'failed': len(stuck), 'nodes_expanded': nodes,
+                           'reservations': len(self.reservations)}
+        return [agent.path for agent in agents]
+
+    def run(self, agents: Sequence[DeliveryAgent], max_steps: int = 1000) -> Dict[Hashable, List[Cell]]:
+        """Plan and move every agent until all reach their goals or max_steps pass.
+
+        Without a window the agents plan once and follow their paths. With
+        one they re-plan every `window` steps from where they stand.
+        Returns the cells each agent occupied from the first time step on.
+        """
+        order = self._ordered(agents)
+        traces = {index: [agent.position] for index, agent in enumerate(agents)}
+        rounds = nodes = 0
+        step = 0
+        while step < max_steps and any(agent.position != agent.goal for agent in agents):
+            self.plan(agents, order)
+            rounds += 1
+            nodes += self.last_stats['nodes_expanded']
+            span = self.window or max(len(agent.path) for agent in agents) - 1
+            for offset in range(1, span + 1):
+                if step >= max_steps:
+                    break
+                for index, agent in enumerate(agents):
+                    if offset < len(agent.path):
+                        agent.move_to(agent.path[offset])
+                    else:
+                        # Parked on the goal, or stuck without a path
+                        agent.time_step += 1
+                    traces[index].append(agent.position)
+                step += 1
+            if self.window:
+                order = order[1:] + order[:1]
+            else:
+                break
+        self.last_stats.update({'rounds': rounds, 'steps': step, 'nodes_expanded': nodes,
+                                'arrived': sum(agent.position == agent.goal for agent in agents)})
+        return traces
@@ -0,0 +1,154 @@
+"""
+Counters and phase timers for planners
+"""
+
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+class _Phase:
+    __slots__ = ('instrumentation', 'name', 'started')
+
+    def __init__(self, instrumentation: 'Instrumentation', name: str):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        phases = self.instrumentation.phases
+        phases[self.name] = phases.get(self.name, 0.0) + time.perf_counter() - self.started
+        return False
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_PHASE = _NoPhase()
+
+class Instrumentation:
+    """Counters and phase timers for one planner, reported once per plan() call.
+
+    Planners count in local variables on their hot paths and add the totals
+    with update() when a search ends, so nothing is paid per node. Each
+    record is passed to the sink, any callable taking a dict.
+    """
+
+    enabled = True
+
+    def __init__(self, sink: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.sink = sink
+        self.reset()
+
+    def reset(self):
+        self.counters: Dict[str, int] = {}
+        self.phases: Dict[str, float] = {}
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def update(self, counts: Dict[str, Any]):
+        for name, amount in counts.items():
+            if isinstance(amount, (int, float)) and not isinstance(amount, bool):
+                self.count(name, amount)
+
+    def phase(self, name: str):
+        return _Phase(self, name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'counters': dict(self.counters), 'phases': dict(self.phases)}
+
+    def emit(self, record: Dict[str, Any]):
+        if self.sink is not None:
+            self.sink(record)
+
+class _DisabledInstrumentation(Instrumentation):
+    enabled = False
+
+    def count(self, name: str, amount: int = 1):
+        pass
+
+    def update(self, counts: Dict[str, Any]):
+        pass
+
+    def phase(self, name: str):
+        return _NO_PHASE
+
+    def emit(self, record: Dict[str, Any]):
+        pass
+
+# Shared by every planner that has not been instrumented
+DISABLED = _DisabledInstrumentation()
+
+class MemorySink:
+    """Keep every record in a list."""
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+
+    def __call__(self, record: Dict[str, Any]):
+        self.records.append(record)
+
+    @property
+    def last(self) -> Optional[Dict[str, Any]]:
+        return self.records[-1] if self.records else None
+
+class JsonLinesSink:
+    """Append every record as one JSON line to a path or an open file."""
+
+    def __init__(self, target):
+        self.file = open(target, 'a') if isinstance(target, str) else target
+        self.owned = isinstance(target, str)
+
+    def __call__(self, record: Dict[str, Any]):
+        self.file.write(json.dumps(record, default=str) + '\n')
+        self.file.flush()
+
+    def close(self):
+        if self.owned:
+            self.file.close()
+
+class CountingEnvironment:
+    """Environment proxy counting cost lookups while an instrumented plan runs."""
+
+    def __init__(self, env):
+        self._env = env
+        self.cost_lookups = 0
+        self.validity_checks = 0
+        self.batch_lookups = 0
+
+    def __getattr__(self, name):
+        return getattr(self._env, name)
+
+    def get_cost(self, x: int, y: int, time_step: int = 0) -> int:
+        self.cost_lookups += 1
+        return self._env.get_cost(x, y, time_step)
+
+    def get_costs(self, xs, ys, time_step: int = 0):
+        self.batch_lookups += 1
+        return self._env.get_costs(xs, ys, time_step)
+
+    def costs_along(self, xs, ys, times):
+        self.batch_lookups += 1
+        return self._env.costs_along(xs, ys, times)
+
+    def is_valid_position(self, x: int, y: int, time_step: int = 0) -> bool:
+        self.validity_checks += 1
+        return self._env.is_valid_position(x, y, time_step)
+
+    def counters(self) -> Dict[str, int]:
+        return {'get_cost': self.cost_lookups, 'is_valid_position': self.validity_checks,
+                'get_costs': self.batch_lookups}
+
+def format_record(record: Dict[str, Any]) -> str:
+    """One-line summary of a record for console output."""
+    counters = ', '.join(f"{name}={value}" for name, value in sorted(record['counters'].items()))
+    phases = ', '.join(f"{name}={seconds * 1000:.2f}ms" for name, seconds in sorted(record['phases'].items()))
+    return f"{record['planner']}: {record['total_time'] * 1000:.2f}ms [{phases}] {counters}"
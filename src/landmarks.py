@@ -0,0 +1,208 @@
+"""
+Landmark (ALT) lower bounds on path cost, with tables persisted next to the map
+
+A landmark table holds, for k landmark cells L, the exact cost D_L(v) of
+the cheapest path from L to every cell v. Costs are those of the cheapest
+time step: terrain with static obstacles blocked, lowered where a dynamic
+change ever makes a cell cheaper; moving obstacles are ignored. Every
+real path costs at least as much, so the bounds below hold at any time.
+
+A move costs the cell entered, so the cost from v back to L is
+D_L(v) + c(L) - c(v), and the triangle inequality gives, for every L,
+
+    d(n, g) >= D_L(g) - D_L(n)
+    d(n, g) >= D_L(n) - D_L(g) + c(g) - c(n)
+
+together with the Manhattan distance times the cheapest cost. Their
+maximum is consistent, so A* still closes every state at its best cost.
+"""
+
+import hashlib
+import json
+import os
+from array import array
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from cost_engine import BLOCKED
+except ImportError:  # imported as src.landmarks
+    from .cost_engine import BLOCKED
+
+Cell = Tuple[int, int]
+# Stored distance of cells a landmark cannot reach
+UNREACHABLE = np.iinfo(np.int32).max
+# Bump when the table layout or the cost model changes
+TABLE_VERSION = 1
+
+def lower_bound_costs(env) -> np.ndarray:
+    """(height, width) int64 costs of the cheapest time step, BLOCKED for static obstacles."""
+    engine = env.compile()
+    costs = engine.base_costs()
+    _, keys, new_costs = engine._space_time_index()
+    if len(keys):
+        np.minimum.at(costs, keys % len(costs), new_costs)
+        costs[engine._static_flat] = BLOCKED
+    return costs.reshape(env.height, env.width)
+
+def cost_field(costs: np.ndarray, source: Cell) -> np.ndarray:
+    """Cost of the cheapest path from source to every cell, inf where unreachable.
+
+    Label-correcting sweeps in place of a priority queue: each pass scans
+    every row left and right and every column up and down, settling whole
+    straight runs at once through running minima over prefix sums. Passes
+    repeat until nothing changes, about once per turn of the longest
+    shortest path, and end at the same fixed point as Dijkstra.
+    """
+    height, width = costs.shape
+    finite = costs < BLOCKED
+    # Entering a blocked cell costs more than any real path, and prefix
+    # sums of such costs along a row or column stay exact in float64
+    wall = float(np.where(finite, costs, 0).sum() + 1)
+    step = np.where(finite, costs, wall).astype(np.float64)
+    scans = []
+    for axis in (1, 0):
+        for flip in (False, True):
+            ordered = np.flip(step, axis) if flip else step
+            scans.append((axis, flip, np.cumsum(ordered, axis=axis)))
+
+    dist = np.full((height, width), np.inf)
+    dist[source[1], source[0]] = 0
+    while True:
+        previous = dist
+        for axis, flip, prefix in scans:
+            ordered = np.flip(dist, axis) if flip else dist
+            # d[i] = min over j <= i of d[j] + (S[i] - S[j])
+            relaxed = prefix + np.minimum.accumulate(ordered - prefix, axis=axis)
+            relaxed = np.minimum(ordered, relaxed)
+            dist = np.flip(relaxed, axis) if flip else relaxed
+        if np.array_equal(dist, previous):
+            break
+    dist[dist >= wall] = np.inf
+    return dist
+
+class LandmarkTable:
+    """Cost fields from landmarks picked by farthest-point selection.
+
+    fields is a (k, height * width) int32 array, memory-mapped when loaded
+    from disk, with UNREACHABLE where a landmark cannot reach a cell.
+    """
+
+    def __init__(self, landmarks: List[Cell], fields: np.ndarray, costs: np.ndarray, key: str):
+        self.landmarks = landmarks
+        self.fields = fields
+        self.costs = costs.reshape(-1)
+        self.width = costs.shape[1]
+        self.key = key
+        free = self.costs[self.costs < BLOCKED]
+        self.min_cost = int(free.min()) if len(free) else 0
+
+    @staticmethod
+    def content_key(costs: np.ndarray, count: int) -> str:
+        digest = hashlib.sha256()
+        digest.update(json.dumps([TABLE_VERSION, count, list(costs.shape)]).encode())
+        digest.update(np.ascontiguousarray(costs, dtype='<i8').tobytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def build(cls, env, count: int = 8) -> 'LandmarkTable':
+        costs = lower_bound_costs(env)
+        free = np.flatnonzero(costs.reshape(-1) < BLOCKED)
+        if not len(free):
+            raise ValueError("no free cell to place landmarks on")
+        width = env.width
+        # Landmarks go into the component of the free cell nearest the
+        # centre; cells walled off from it get no landmarks of their own
+        ys, xs = np.divmod(free, width)
+        seed = int(free[np.argmin(np.abs(xs - env.width // 2) + np.abs(ys - env.height // 2))])
+        nearest = cost_field(costs, (seed % width, seed // width)).reshape(-1)
+        candidates = np.flatnonzero(np.isfinite(nearest))
+
+        landmarks, fields = [], []
+        for _ in range(min(count, len(candidates))):
+            cell = int(candidates[np.argmax(nearest[candidates])])
+            landmark = (cell % width, cell // width)
+            if landmark in landmarks:
+                break
+            field = cost_field(costs, landmark).reshape(-1)
+            landmarks.append(landmark)
+            fields.append(np.where(np.isfinite(field), field, UNREACHABLE).astype(np.int32))
+            nearest = field if len(landmarks) == 1 else np.minimum(nearest, field)
+        return cls(landmarks, np.stack(fields), costs, cls.content_key(costs, count))
+
+    @staticmethod
+    def paths(map_file: str, count: int) -> Tuple[str, str]:
+        # One table per map and landmark count; a table for other content is replaced
+        base = f"{map_file}.alt-{count}"
+        return base + '.npy', base + '.json'
+
+    @classmethod
+    def load_or_build(cls, env, count: int = 8, map_file: Optional[str] = None) -> Optional['LandmarkTable']:
+        """The table for env's current costs: memory-mapped from next to
+        map_file when the one saved there has the same content key, else
+        built and, with a map_file, saved there. None for terrain paged in
+        by tile, which has no dense cost array."""
+        if not isinstance(env.compile().grid, np.ndarray):
+            return None
+        if map_file is None:
+            return cls.build(env, count)
+        costs = lower_bound_costs(env)
+        key = cls.content_key(costs, count)
+        fields_path, meta_path = cls.paths(map_file, count)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get('key') == key:
+                fields = np.load(fields_path, mmap_mode='r')
+                return cls([tuple(cell) for cell in meta['landmarks']], fields, costs, key)
+        except (OSError, ValueError):
+            pass
+        table = cls.build(env, count)
+        table.save(map_file, count)
+        return table
+
+    def save(self, map_file: str, count: int):
+        """Save next to map_file as the table for count landmarks."""
+        fields_path, meta_path = self.paths(map_file, count)
+        try:
+            # The old metadata goes first, so no reader pairs it with the new
+            # fields; both files are written under temporary names first
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            np.save(fields_path + '.tmp.npy', np.ascontiguousarray(self.fields))
+            os.replace(fields_path + '.tmp.npy', fields_path)
+            with open(meta_path + '.tmp', 'w') as f:
+                json.dump({'key': self.key, 'version': TABLE_VERSION, 'landmarks': self.landmarks,
+                           'shape': list(self.fields.shape)}, f)
+            os.replace(meta_path + '.tmp', meta_path)
+        except OSError:
+            pass  # a read-only map directory only costs a rebuild next time
+
+    def bound(self, cell: Cell, goal: Cell) -> int:
+        """Lower bound on the cost from cell to goal."""
+        width = self.width
+        n, g = cell[1] * width + cell[0], goal[1] * width + goal[0]
+        best = (abs(cell[0] - goal[0]) + abs(cell[1] - goal[1])) * self.min_cost
+        for field in self.fields:
+            dn, dg = int(field[n]), int(field[g])
+            if dn == UNREACHABLE or dg == UNREACHABLE:
+                continue
+            best = max(best, dg - dn, dn - dg + int(self.costs[g]) - int(self.costs[n]))
+        return best
+
+    def bounds_to(self, goal: Cell) -> array:
+        """bound(cell, goal) for every cell, indexed y * width + x, as array('q')."""
+        g = goal[1] * self.width + goal[0]
+        ys, xs = np.divmod(np.arange(self.fields.shape[1], dtype=np.int64), self.width)
+        best = (np.abs(xs - goal[0]) + np.abs(ys - goal[1])) * self.min_cost
+        finite_costs = np.where(self.costs < BLOCKED, self.costs, 0)
+        for field in self.fields:
+            dg = int(field[g])
+            if dg == UNREACHABLE:
+                continue
+            field = np.asarray(field, dtype=np.int64)
+            reached = field != UNREACHABLE
+            bound = np.maximum(dg - field, field - dg + int(finite_costs[g]) - finite_costs)
+            np.maximum(best, np.where(reached, bound, 0), out=best)
+        return array('q', best.tobytes())
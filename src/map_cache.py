@@ -0,0 +1,93 @@
+"""
+Loaded environments and reusable planners for long-running processes
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, List, Tuple
+
+try:
+    from environment import load_map_from_file
+except ImportError:  # imported as src.map_cache
+    from .environment import load_map_from_file
+
+class MapCache:
+    """Environments keyed by map path and file modification stamp.
+
+    A map is parsed once and served until its file changes on disk, which
+    drops it together with the planners built on it. At most max_maps
+    maps stay loaded, least recently used first out.
+
+    Planners are pooled per map and key: checkout() hands an idle
+    instance to one caller at a time, so planners that keep state between
+    queries (compiled engines, HPA* abstractions) are reused safely from
+    several threads.
+    """
+
+    def __init__(self, max_maps: int = 16, loader: Callable = load_map_from_file):
+        self.max_maps = max_maps
+        self.loader = loader
+        # path -> (stamp, env, {key: [idle planners]})
+        self.entries: 'OrderedDict[str, Tuple[Tuple, object, Dict[Hashable, List]]]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'loads': 0, 'reloads': 0, 'evictions': 0,
+                      'planners_built': 0, 'planners_reused': 0}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _stamp(path: str) -> Tuple[int, int]:
+        info = os.stat(path)
+        return info.st_mtime_ns, info.st_size
+
+    def _entry(self, path: str):
+        path = os.path.realpath(path)
+        stamp = self._stamp(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == stamp:
+                self.entries.move_to_end(path)
+                self.stats['hits'] += 1
+                return entry
+        # Parse outside the lock; a concurrent load of the same map is harmless
+        env = self.loader(path)
+        with self.lock:
+            current = self.entries.get(path)
+            if current is not None and current[0] == stamp:
+                return current
+            self.stats['reloads' if current is not None else 'loads'] += 1
+            entry = self.entries[path] = (stamp, env, {})
+            self.entries.move_to_end(path)
+            while len(self.entries) > self.max_maps:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+            return entry
+
+    def get(self, path: str):
+        """The environment for path, loaded or reloaded as needed."""
+        return self._entry(path)[1]
+
+    @contextmanager
+    def checkout(self, path: str, key: Hashable, factory: Callable):
+        """Yield (env, planner) for path, with an idle planner stored under key
+        or a new one from factory(env). The planner goes back to the pool
+        afterwards unless the map was reloaded in the meantime."""
+        stamp, env, pools = self._entry(path)
+        with self.lock:
+            idle = pools.setdefault(key, [])
+            planner = idle.pop() if idle else None
+            self.stats['planners_reused' if planner is not None else 'planners_built'] += 1
+        if planner is None:
+            planner = factory(env)
+        try:
+            yield env, planner
+        finally:
+            with self.lock:
+                idle.append(planner)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
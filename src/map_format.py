@@ -0,0 +1,172 @@
+"""
+Text and binary map formats
+
+Text maps start with a "width height" line followed by one row of terrain
+costs per grid row. Optional sections follow, separated by blank lines:
+static obstacles ("x,y" cells), moving obstacles (one obstacle per line,
+listing the cells it cycles through) and dynamic changes
+("time:x,y:cost" entries).
+
+Binary maps hold the same data in a fixed little-endian layout: a header,
+the terrain as an int32 array that can be memory-mapped, and packed
+obstacle and change tables.
+"""
+
+import struct
+import sys
+import numpy as np
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+try:
+    from environment import GridEnvironment, MovingObstacle
+except ImportError:  # imported as src.map_format
+    from .environment import GridEnvironment, MovingObstacle
+
+MAGIC = b'DLVRYMAP'
+VERSION = 1
+# magic, version, width, height, static count, moving count,
+# moving position count, dynamic change count, terrain offset
+HEADER = struct.Struct('<8sIIIQQQQQ')
+ALIGNMENT = 64
+
+@dataclass
+class MapSections:
+    width: int
+    height: int
+    terrain: np.ndarray
+    static_obstacles: List[Tuple[int, int]] = field(default_factory=list)
+    moving_obstacles: List[List[Tuple[int, int]]] = field(default_factory=list)
+    dynamic_changes: List[Tuple[int, int, int, int]] = field(default_factory=list)
+
+    def to_environment(self) -> GridEnvironment:
+        """Build a GridEnvironment around the terrain array without copying it."""
+        env = GridEnvironment(self.width, self.height, grid=self.terrain)
+        env.static_obstacles.update(self.static_obstacles)
+        env.moving_obstacles.extend(MovingObstacle(positions) for positions in self.moving_obstacles)
+        for time_step, x, y, new_cost in self.dynamic_changes:
+            env.dynamic_changes.setdefault(time_step, []).append((x, y, new_cost))
+        return env
+
+def _parse_cell(token: str) -> Tuple[int, int]:
+    x, y = token.split(',')
+    return int(x), int(y)
+
+def _parse_change(token: str) -> Tuple[int, int, int, int]:
+    time_step, cell, new_cost = token.split(':')
+    x, y = _parse_cell(cell)
+    return int(time_step), x, y, int(new_cost)
+
+def parse_text_map(filename: str) -> MapSections:
+    with open(filename, 'r') as f:
+        lines = [line.strip() for line in f if not line.startswith('#')]
+
+    content = [i for i, line in enumerate(lines) if line]
+    if not content:
+        raise ValueError("Map file is empty")
+
+    width, height = map(int, lines[content[0]].split())
+    terrain = np.ones((height, width), dtype=np.int32)
+    rows = content[1:1 + height]
+    for y, i in enumerate(rows):
+        row = list(map(int, lines[i].split()))[:width]
+        terrain[y, :len(row)] = row
+
+    sections = MapSections(width, height, terrain)
+    # Sections after the terrain are split on blank lines and come in the
+    # order static, moving; entries with ':' are dynamic changes wherever
+    # they appear.
+    section = -1
+    previous = rows[-1] if rows else content[0]
+    for i in content[1 + height:]:
+        tokens = lines[i].split()
+        if any(':' in token for token in tokens):
+            sections.dynamic_changes.extend(_parse_change(token) for token in tokens)
+            previous = i
+            continue
+        if section < 0 or i > previous + 1:
+            section += 1
+        previous = i
+        cells = [_parse_cell(token) for token in tokens]
+        if section == 0:
+            sections.static_obstacles.extend(cells)
+        else:
+            sections.moving_obstacles.append(cells)
+    return sections
+
+def sections_from_environment(env: GridEnvironment) -> MapSections:
+    changes = [(time_step, x, y, new_cost)
+               for time_step, entries in sorted(env.dynamic_changes.items())
+               for x, y, new_cost in entries]
+    return MapSections(env.width, env.height, np.asarray(env.grid),
+                       sorted(env.static_obstacles),
+                       [list(obstacle.positions) for obstacle in env.moving_obstacles],
+                       changes)
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def write_binary_map(sections: MapSections, filename: str):
+    static = np.asarray(sections.static_obstacles, dtype='<i4').reshape(-1, 2)
+    moving_offsets = np.zeros(len(sections.moving_obstacles) + 1, dtype='<i8')
+    moving_offsets[1:] = np.cumsum([len(p) for p in sections.moving_obstacles])
+    moving = np.asarray([cell for positions in sections.moving_obstacles for cell in positions],
+                        dtype='<i4').reshape(-1, 2)
+    dynamic = np.asarray(sections.dynamic_changes, dtype='<i4').reshape(-1, 4)
+
+    terrain_offset = _aligned(HEADER.size)
+    header = HEADER.pack(MAGIC, VERSION, sections.width, sections.height, len(static),
+                         len(sections.moving_obstacles), len(moving), len(dynamic), terrain_offset)
+    with open(filename, 'wb') as f:
+        f.write(header.ljust(terrain_offset, b'\0'))
+        f.write(np.ascontiguousarray(sections.terrain, dtype='<i4').tobytes())
+        for table in (static, moving_offsets, moving, dynamic):
+            f.write(table.tobytes())
+
+def convert_text_map(source: str, destination: str):
+    write_binary_map(parse_text_map(source), destination)
+
+def is_binary_map(filename: str) -> bool:
+    with open(filename, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def read_binary_map(filename: str, mmap: bool = True) -> MapSections:
+    """Read a binary map; with mmap the terrain is a copy-on-write memory map."""
+    with open(filename, 'rb') as f:
+        fields = HEADER.unpack(f.read(HEADER.size))
+    magic, version, width, height, n_static, n_moving, n_positions, n_dynamic, terrain_offset = fields
+    if magic != MAGIC:
+        raise ValueError(f"{filename} is not a binary map")
+    if version != VERSION:
+        raise ValueError(f"Unsupported binary map version {version}")
+
+    if mmap:
+        terrain = np.memmap(filename, dtype='<i4', mode='c', offset=terrain_offset, shape=(height, width))
+    else:
+        terrain = np.fromfile(filename, dtype='<i4', count=width * height,
+                              offset=terrain_offset).reshape(height, width)
+
+    offset = terrain_offset + width * height * 4
+    tables = []
+    for dtype, count, columns in [('<i4', n_static, 2), ('<i8', n_moving + 1, 1),
+                                  ('<i4', n_positions, 2), ('<i4', n_dynamic, 4)]:
+        table = np.fromfile(filename, dtype=dtype, count=count * columns, offset=offset)
+        tables.append(table.reshape(count, columns) if columns > 1 else table)
+        offset += count * columns * np.dtype(dtype).itemsize
+    static, moving_offsets, moving, dynamic = tables
+
+    positions = [tuple(cell) for cell in moving.tolist()]
+    return MapSections(
+        width, height, terrain,
+        [tuple(cell) for cell in static.tolist()],
+        [positions[moving_offsets[i]:moving_offsets[i + 1]] for i in range(n_moving)],
+        [tuple(change) for change in dynamic.tolist()])
+
+def load_binary_map(filename: str, mmap: bool = True) -> GridEnvironment:
+    return read_binary_map(filename, mmap).to_environment()
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Usage: python map_format.py <input.map> <output.bmap>")
+        sys.exit(1)
+    convert_text_map(sys.argv[1], sys.argv[2])
@@ -0,0 +1,133 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+from agent import Planner
+from cost_engine import BLOCKED
+from planners.search import SearchKernel
+
+Cell = Tuple[int, int]
+INF = float('inf')
+
+class BidirectionalDijkstraPlanner(Planner):
+    """Dijkstra searching from the start and from the goal at the same time.
+
+    Only valid when no cell changes cost during the query, i.e. when
+    CompiledCostEngine.is_static_from(start_time) holds; every cell then
+    costs what it costs at start_time. Other queries go to the
+    unidirectional time-expanded SearchKernel. A move costs the cost of the cell
+    entered, so the backward search relaxes a cell's predecessors by the
+    cell's own cost.
+
+    The searches alternate by smaller queue top. mu is the cost of the
+    best start-goal path seen through a cell labelled by both, and the
+    search stops once the two queue tops together reach mu.
+    """
+
+    # Guides the time-expanded search that answers time-dependent queries
+    heuristic = None
+
+    def potential(self, cell: Cell, start: Cell, goal: Cell) -> float:
+        return 0
+
+    def _in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.env.width and 0 <= y < self.env.height
+
+    def plan(self, start: Tuple[int, int], goal: Tuple[int, int],
+             start_time: int = 0, recalculate_heuristic: bool = True) -> List[Tuple[int, int]]:
+        self.nodes_expanded = 0
+        start, goal = tuple(start), tuple(goal)
+        if not (self._in_bounds(*start) and self._in_bounds(*goal)):
+            return []
+        engine = self.env.compile()
+        if not engine.is_static_from(start_time):
+            heuristic = None if self.heuristic is None else (lambda cell: self.heuristic(cell, goal))
+            kernel = SearchKernel(self, heuristic=heuristic)
+            with self.instrumentation.phase('search'):
+                slot = kernel.run(start, goal, start_time)
+            with self.instrumentation.phase('reconstruct'):
+                return kernel.path(slot) if slot is not None else []
+        if start == goal:
+            return [start]
+
+        costs: Dict[Cell, int] = {}
+
+        def cost(cell: Cell) -> int:
+            value = costs.get(cell)
+            if value is None:
+                value = costs[cell] = engine.get_cost(cell[0], cell[1], start_time)
+            return value
+
+        if cost(goal) >= BLOCKED:
+            return []
+
+        # Keys carry the potential: forward g + p(v), backward g - p(v).
+        # With p = 0 this is bidirectional Dijkstra; a consistent average
+        # potential turns it into bidirectional A*.
+        potential = lambda cell: self.potential(cell, start, goal)
+        g = ({start: 0}, {goal: 0})
+        link: Tuple[Dict[Cell, Optional[Cell]], Dict[Cell, Optional[Cell]]] = ({start: None}, {goal: None})
+        queues = ([(potential(start), start)], [(-potential(goal), goal)])
+        closed = (set(), set())
+        best, meeting = INF, None
+
+        with self.instrumentation.phase('search'):
+            while queues[0] and queues[1]:
+                if queues[0][0][0] + queues[1][0][0] >= best:
+                    break
+                side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+                _, cell = heapq.heappop(queues[side])
+                if cell in closed[side]:
+                    continue
+                closed[side].add(cell)
+                self.nodes_expanded += 1
+                if side == 1 and cost(cell) >= BLOCKED:
+                    continue
+
+                mine, other = g[side], g[1 - side]
+                x, y = cell
+                for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+                    nx, ny = x + dx, y + dy
+                    if not self._in_bounds(nx, ny):
+                        continue
+                    neighbour = (nx, ny)
+                    if side == 0:
+                        if cost(neighbour) >= BLOCKED:
+                            continue
+                        new_g = mine[cell] + cost(neighbour)
+                    else:
+                        # The start may sit on a blocked cell; it is left, never entered
+                        if cost(neighbour) >= BLOCKED and neighbour != start:
+                            continue
+                        new_g = mine[cell] + cost(cell)
+                    if new_g < mine.get(neighbour, INF):
+                        mine[neighbour] = new_g
+                        link[side][neighbour] = cell
+                        key = new_g + potential(neighbour) if side == 0 else new_g - potential(neighbour)
+                        heapq.heappush(queues[side], (key, neighbour))
+                        if neighbour in other and new_g + other[neighbour] < best:
+                            best, meeting = new_g + other[neighbour], neighbour
+
+        self.instrumentation.update({'forward_closed': len(closed[0]), 'backward_closed': len(closed[1])})
+        if meeting is None:
+            return []
+        with self.instrumentation.phase('reconstruct'):
+            path = []
+            cell = meeting
+            while cell is not None:
+                path.append(cell)
+                cell = link[0][cell]
+            path.reverse()
+            cell = link[1][meeting]
+            while cell is not None:
+                path.append(cell)
+                cell = link[1][cell]
+        return path
+
+class BidirectionalAStarPlanner(BidirectionalDijkstraPlanner):
+    """Bidirectional A* with the average of the Manhattan potentials towards
+    the goal and from the start, which keeps both directions consistent."""
+
+    def heuristic(self, a: Cell, b: Cell) -> int:
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def potential(self, cell: Cell, start: Cell, goal: Cell) -> float:
+        return (self.heuristic(cell, goal) - self.heuristic(start, cell)) / 2
@@ -0,0 +1,132 @@
+import sys
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from agent import Planner
+
+Cell = Tuple[int, int]
+Key = Tuple[Cell, Cell, int]
+
+# Rough footprint of one cached cell: a list slot, its tuple and two ints,
+# plus the cell's entry in the invalidation index
+CELL_BYTES = 8 + sys.getsizeof((0, 0)) + 2 * sys.getsizeof(0) + 64
+ENTRY_BYTES = 256
+
+class RouteCache(Planner):
+    """LRU cache of routes in front of another planner.
+
+    Routes are keyed by start, goal and start-time class, the start time
+    folded by CompiledCostEngine.fold_time: start times in one class see
+    the same costs along any route, so they share one entry. At most
+    max_entries routes and roughly max_bytes of route data are kept.
+
+    Before each lookup the cache replays GridEnvironment.timed_changes_since
+    and drops only the routes the changes touch: those through a cell
+    changed for all time steps, and those entering a cell at the time step
+    a dynamic change applies to. Failed searches are dropped on any change.
+    That keeps every cached route optimal only while costs rise, so a
+    change that may lower a cost (GridEnvironment.costs_lowered_since)
+    clears the cache, as do new moving-obstacle periods and invalidate().
+
+    stats counts hits, misses, invalidations and evictions; last_stats
+    tells whether the last plan() call hit.
+    """
+
+    def __init__(self, planner: Planner, max_entries: int = 4096, max_bytes: int = 16 * 1024 * 1024):
+        super().__init__(planner.env)
+        self.planner = planner
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: 'OrderedDict[Key, List[Cell]]' = OrderedDict()
+        # cell -> keys of the cached routes through it
+        self.index: Dict[Cell, Set[Key]] = {}
+        self.unreachable: Set[Key] = set()
+        self.bytes = 0
+        self.env_version = self.env.version
+        self.env.track_changes(self)
+        self.period = self.env.compile().period
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0}
+        self.last_stats: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _size(route: List[Cell]) -> int:
+        return ENTRY_BYTES + CELL_BYTES * len(route)
+
+    def _drop(self, key: Key):
+        route = self.entries.pop(key)
+        self.bytes -= self._size(route)
+        for cell in set(route):
+            keys = self.index[cell]
+            keys.discard(key)
+            if not keys:
+                del self.index[cell]
+
+    def clear(self):
+        self.stats['invalidations'] += len(self.entries) + len(self.unreachable)
+        self.entries.clear()
+        self.index.clear()
+        self.unreachable.clear()
+        self.bytes = 0
+
+    def _sync(self):
+        """Drop the routes touched by the environment changes since the last call."""
+        env = self.env
+        if env.version == self.env_version:
+            return
+        changes = env.timed_changes_since(self.env_version)
+        lowered = env.costs_lowered_since(self.env_version)
+        self.env_version = env.version
+        period = env.compile().period
+        if period != self.period or lowered or any(cell is None for cell, _ in changes):
+            # Start-time classes changed meaning, or a cheaper route may now exist
+            self.period = period
+            self.clear()
+            return
+        self.stats['invalidations'] += len(self.unreachable)
+        self.unreachable.clear()
+        for cell, time_step in changes:
+            for key in list(self.index.get(cell, ())):
+                route = self.entries[key]
+                # route[i] is entered at the cost it has at time step start + i - 1
+                offset = None if time_step is None else time_step - key[2] + 1
+                if offset is None or (1 <= offset < len(route) and route[offset] == cell):
+                    self._drop(key)
+                    self.stats['invalidations'] += 1
+
+    def _store(self, key: Key, route: List[Cell]):
+        if not route:
+            self.unreachable.add(key)
+            return
+        size = self._size(route)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = route
+        self.bytes += size
+        for cell in route:
+            self.index.setdefault(cell, set()).add(key)
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            self._drop(next(iter(self.entries)))
+            self.stats['evictions'] += 1
+
+    def plan(self, start: Tuple[int, int], goal: Tuple[int, int],
+             start_time: int = 0, recalculate_heuristic: bool = True) -> List[Tuple[int, int]]:
+        self.nodes_expanded = 0
+        start, goal = tuple(start), tuple(goal)
+        self._sync()
+        key = (start, goal, self.env.compile().fold_time(start_time))
+        route = self.entries.get(key)
+        if route is not None or key in self.unreachable:
+            if route is not None:
+                self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            self.last_stats = {'cache_hit': 1}
+            return list(route or [])
+
+        self.stats['misses'] += 1
+        route = self.planner.plan(start, goal, start_time, recalculate_heuristic)
+        self.nodes_expanded = self.planner.nodes_expanded
+        self._store(key, list(route))
+        self.last_stats = {'cache_hit': 0}
+        return route
@@ -0,0 +1,170 @@
+import random
+import numpy as np
+from typing import List, Optional, Tuple
+from cost_engine import BLOCKED
+from planners.local_search import HillClimbingPlanner
+
+# Move codes index these offsets, in get_neighbors order
+DX = np.array([0, 1, 0, -1], dtype=np.int64)
+DY = np.array([1, 0, -1, 0], dtype=np.int64)
+
+class GeneticPlanner(HillClimbingPlanner):
+    """Genetic algorithm over a population of move sequences.
+
+    Each individual is a row of a (population, max_length) array of move
+    codes. A path runs from the start through the cumulative moves and ends
+    at its first visit to the goal; the moves after that are padding. The
+    whole population is scored in one pass: cells are looked up in the
+    engine's flat terrain costs and, for moving obstacles and dynamic
+    changes, in a sparse space-time overlay built once per query.
+
+    The population is seeded with generate_random_path walks padded with
+    random moves, then evolved by elitism, tournament selection, one-point
+    crossover and per-move mutation, all on whole arrays. Random moves lean
+    towards the goal by goal_bias. seed and target_cost behave as for the
+    hill-climbing planner; nodes_expanded counts the paths scored.
+    """
+
+    def __init__(self, env, population: int = 200, generations: int = 200,
+                 max_length: Optional[int] = None, crossover_rate: float = 0.9,
+                 mutation_rate: float = 0.02, elite: int = 4, goal_bias: float = 1.0,
+                 seed: Optional[int] = None, target_cost: Optional[float] = None):
+        super().__init__(env, seed=seed, target_cost=target_cost)
+        self.population = population
+        self.generations = generations
+        self.max_length = max_length
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate
+        self.elite = elite
+        self.goal_bias = goal_bias
+
+    def _random_moves(self, rng: np.random.Generator, shape, start, goal) -> np.ndarray:
+        weights = np.ones(4)
+        weights[(DX * np.sign(goal[0] - start[0]) + DY * np.sign(goal[1] - start[1])) > 0] += self.goal_bias
+        return rng.choice(4, size=shape, p=weights / weights.sum()).astype(np.int8)
+
+    def _seed_population(self, rng: np.random.Generator, start, goal, length: int) -> np.ndarray:
+        moves = self._random_moves(rng, (self.population, length), start, goal)
+        for row in range(self.population):
+            walk = self.generate_random_path(start, goal, length)
+            steps = np.diff(np.array(walk, dtype=np.int64), axis=0)
+            if len(steps):
+                moves[row, :len(steps)] = self._codes(steps[:, 0], steps[:, 1])
+        return moves
+
+    @staticmethod
+    def _codes(dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+        return np.select([dy == 1, dx == 1, dy == -1], [0, 1, 2], 3).astype(np.int8)
+
+    def _decode(self, moves: np.ndarray, start) -> Tuple[np.ndarray, np.ndarray]:
+        xs = start[0] + np.cumsum(DX[moves], axis=1)
+        ys = start[1] + np.cumsum(DY[moves], axis=1)
+        return xs, ys
+
+    def _score(self, moves: np.ndarray, start, goal, base, overlay) -> Tuple[np.ndarray, np.ndarray]:
+        """Fitness of every individual and the index of its goal move (-1 if invalid).
+
+        Valid paths score their cost. Invalid ones score above any valid
+        path, by the distance left to the goal from their last good cell
+        and then by the cost up to it. base(flat) gives the terrain costs
+        of flat cells and the overlay's varying(flat) whether it touches them.
+        """
+        width, height = self.env.width, self.env.height
+        count, length = moves.shape
+        xs, ys = self._decode(moves, start)
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        flat = np.where(inside, ys * width + xs, 0)
+        costs = base(flat)
+        keys, overlay_costs, varying = overlay
+        if len(keys):
+            # Only cells the overlay touches at some time are looked up in it
+            rows, steps = np.nonzero(varying(flat))
+            space_time = steps * (width * height) + flat[rows, steps]
+            pos = np.searchsorted(keys, space_time)
+            pos[pos == len(keys)] = 0
+            hit = keys[pos] == space_time
+            costs[rows[hit], steps[hit]] = overlay_costs[pos[hit]]
+        costs[~inside] = BLOCKED
+
+        at_goal = (xs == goal[0]) & (ys == goal[1])
+        arrived = at_goal.any(axis=1)
+        end = np.where(arrived, at_goal.argmax(axis=1), length - 1)
+        blocked = costs >= BLOCKED
+        first_blocked = np.where(blocked.any(axis=1), blocked.argmax(axis=1), length)
+        valid = arrived & (first_blocked > end)
+
+        # Last move that keeps the path on free cells
+        last = np.minimum(end, first_blocked - 1)
+        steps = np.arange(length)
+        partial = np.where(steps <= last[:, None], costs, 0).sum(axis=1)
+        rows = np.arange(count)
+        safe = np.maximum(last, 0)
+        reached_x = np.where(last >= 0, xs[rows, safe], start[0])
+        reached_y = np.where(last >= 0, ys[rows, safe], start[1])
+        distance = np.abs(reached_x - goal[0]) + np.abs(reached_y - goal[1])
+        penalty = float(BLOCKED) * length
+        fitness = np.where(valid, partial, penalty * (1 + distance) + partial).astype(np.float64)
+        return fitness, np.where(valid, end, -1)
+
+    def plan(self, start: Tuple[int, int], goal: Tuple[int, int],
+             start_time: int = 0, recalculate_heuristic: bool = True) -> List[Tuple[int, int]]:
+        self.nodes_expanded = 0
+        start, goal = tuple(start), tuple(goal)
+        if start == goal:
+            return [start]
+        instrumentation = self.instrumentation
+        self.rng = random if self.seed is None else random.Random(self.seed)
+        rng = np.random.default_rng(self.rng.getrandbits(64))
+        distance = abs(goal[0] - start[0]) + abs(goal[1] - start[1])
+        length = self.max_length or max(4 * distance, 50)
+        elite = min(self.elite, self.population)
+
+        engine = self.env.compile()
+        with instrumentation.phase('initial_path'):
+            cells = self.env.width * self.env.height
+            keys, overlay_costs = engine.overlay(start_time, start_time + length)
+            if isinstance(engine.grid, np.ndarray):
+                dense, touched = engine.base_costs(), np.zeros(cells, dtype=bool)
+                touched[keys % cells] = True
+                base, varying = (lambda flat: dense[flat]), (lambda flat: touched[flat])
+            else:
+                # Terrain paged in by tile is read only where the paths go
+                touched = np.unique(keys % cells)
+                base, varying = engine.base_costs_at, (lambda flat: np.isin(flat, touched))
+            overlay = (keys, overlay_costs, varying)
+            moves = self._seed_population(rng, start, goal, length)
+            fitness, ends = self._score(moves, start, goal, base, overlay)
+        self.nodes_expanded += len(moves)
+
+        best_cost, best_moves, best_end = float('inf'), None, -1
+        generations = 0
+        with instrumentation.phase('improve'):
+            for generation in range(self.generations + 1):
+                leader = int(np.argmin(fitness))
+                if ends[leader] >= 0 and fitness[leader] < best_cost:
+                    best_cost, best_moves, best_end = fitness[leader], moves[leader].copy(), ends[leader]
+                if generation == self.generations or (self.target_cost is not None and best_cost <= self.target_cost):
+                    break
+                generations += 1
+
+                children = self.population - elite
+                contenders = rng.integers(0, self.population, size=(2, 2, children))
+                pick = np.where(fitness[contenders[:, 0]] <= fitness[contenders[:, 1]],
+                                contenders[:, 0], contenders[:, 1])
+                first, second = moves[pick[0]], moves[pick[1]]
+                cut = rng.integers(1, length, size=children)
+                cut[rng.random(children) >= self.crossover_rate] = length
+                offspring = np.where(np.arange(length) < cut[:, None], first, second)
+                mutate = rng.random(offspring.shape) < self.mutation_rate
+                offspring[mutate] = self._random_moves(rng, int(mutate.sum()), start, goal)
+
+                moves = np.concatenate([moves[np.argsort(fitness, kind='stable')[:elite]], offspring])
+                fitness, ends = self._score(moves, start, goal, base, overlay)
+                self.nodes_expanded += len(moves)
+
+        instrumentation.update({'generations': generations})
+        if best_moves is None:
+            return []
+        with instrumentation.phase('reconstruct'):
+            xs, ys = self._decode(best_moves[None, :best_end + 1], start)
+            return [start] + list(zip(xs[0].tolist(), ys[0].tolist()))
@@ -0,0 +1,378 @@
+import heapq
+import numpy as np
+from typing import Dict, List, Optional, Set, Tuple
+from agent import Planner, is_valid_path
+from cost_engine import BLOCKED
+from planners.informed import AStarPlanner
+
+Cell = Tuple[int, int]
+INF = float('inf')
+
+class AbstractGraph:
+    """Cluster abstraction of a grid with each cell's cost taken at one time step.
+
+    The grid is cut into square clusters. Where two clusters share a run
+    of free border cells, one transition (two for runs of 6 or more)
+    links a cell on each side; those cells are the abstract nodes. Within a
+    cluster every pair of nodes is joined by the cost of the cheapest path
+    that stays inside it. The costs come from a NumPy sweep that relaxes
+    the distance fields of all the cluster's nodes at once; the fields are
+    kept to refine abstract edges into cells later.
+
+    Everything is built per cluster on first use and cached; invalidate()
+    drops the clusters containing changed cells together with the
+    transitions and intra-cluster edges of their neighbours.
+    """
+
+    def __init__(self, env, cluster_size: int, time_step: int):
+        self.env = env
+        self.size = cluster_size
+        self.time_step = time_step
+        self.cols = (env.width + cluster_size - 1) // cluster_size
+        self.rows = (env.height + cluster_size - 1) // cluster_size
+        self.costs: Dict[int, np.ndarray] = {}
+        self.borders: Dict[Tuple[int, int], List[Tuple[Cell, Cell]]] = {}
+        self.nodes: Dict[int, Dict[Cell, List[Tuple[Cell, int]]]] = {}
+        self.edges: Dict[int, Dict[Cell, List[Tuple[Cell, int]]]] = {}
+        self.fields: Dict[Cell, np.ndarray] = {}
+        self.settled = 0
+        self.clusters_built = 0
+
+    def cluster_of(self, cell: Cell) -> int:
+        return (cell[1] // self.size) * self.cols + cell[0] // self.size
+
+    def bounds(self, cid: int) -> Tuple[int, int, int, int]:
+        cy, cx = divmod(cid, self.cols)
+        x0, y0 = cx * self.size, cy * self.size
+        return x0, y0, min(x0 + self.size, self.env.width), min(y0 + self.size, self.env.height)
+
+    def _block(self, cid: int) -> np.ndarray:
+        """Cell costs of a cluster as floats, with blocked cells set to infinity."""
+        block = self.costs.get(cid)
+        if block is None:
+            x0, y0, x1, y1 = self.bounds(cid)
+            ys, xs = np.mgrid[y0:y1, x0:x1]
+            block = self.env.get_costs(xs, ys, self.time_step).astype(float)
+            block[block >= BLOCKED] = INF
+            self.costs[cid] = block
+            self.clusters_built += 1
+        return block
+
+    def cost(self, cell: Cell) -> float:
+        cid = self.cluster_of(cell)
+        x0, y0, _, _ = self.bounds(cid)
+        return self._block(cid)[cell[1] - y0, cell[0] - x0]
+
+    def _border(self, a: int, b: int) -> List[Tuple[Cell, Cell]]:
+        """Transitions (cell in a, cell in b) between cluster a and the cluster b right of or below it."""
+        transitions = self.borders.get((a, b))
+        if transitions is not None:
+            return transitions
+        ax0, ay0, ax1, ay1 = self.bounds(a)
+        if b == a + 1:
+            pairs = [((ax1 - 1, y), (ax1, y)) for y in range(ay0, ay1)]
+        else:
+            pairs = [((x, ay1 - 1), (x, ay1)) for x in range(ax0, ax1)]
+
+        transitions = []
+        run: List[Tuple[Cell, Cell]] = []
+        for pair in pairs + [None]:
+            if pair is not None and self.cost(pair[0]) < INF and self.cost(pair[1]) < INF:
+                run.append(pair)
+                continue
+            if run:
+                if len(run) >= 6:
+                    transitions.extend([run[0], run[-1]])
+                else:
+                    transitions.append(run[len(run) // 2])
+                run = []
+        self.borders[(a, b)] = transitions
+        return transitions
+
+    def _neighbour_clusters(self, cid: int) -> List[int]:
+        cy, cx = divmod(cid, self.cols)
+        around = []
+        if cx > 0:
+            around.append(cid - 1)
+        if cx < self.cols - 1:
+            around.append(cid + 1)
+        if cy > 0:
+            around.append(cid - self.cols)
+        if cy < self.rows - 1:
+            around.append(cid + self.cols)
+        return around
+
+    def cluster_nodes(self, cid: int) -> Dict[Cell, List[Tuple[Cell, int]]]:
+        """Abstract nodes of a cluster, each with its transitions into neighbouring clusters."""
+        nodes = self.nodes.get(cid)
+        if nodes is not None:
+            return nodes
+        nodes = {}
+        for other in self._neighbour_clusters(cid):
+            if other > cid:
+                links = [(a, b) for a, b in self._border(cid, other)]
+            else:
+                links = [(b, a) for a, b in self._border(other, cid)]
+            for mine, theirs in links:
+                nodes.setdefault(mine, []).append((theirs, int(self.cost(theirs))))
+        self.nodes[cid] = nodes
+        return nodes
+
+    def sweep(self, cid: int, sources: List[Cell], reverse: bool = False) -> np.ndarray:
+        """Distance fields inside one cluster, one per source.
+
+        Forward fields hold the cost from the source to each cell, reverse
+        fields the cost from each cell to the source. Each pass relaxes
+        every cell against its four neighbours until nothing changes.
+        """
+        x0, y0, x1, y1 = self.bounds(cid)
+        cost = self._block(cid)
+        dist = np.full((len(sources), y1 - y0, x1 - x0), INF)
+        for i, (x, y) in enumerate(sources):
+            dist[i, y - y0, x - x0] = 0
+        blocked = np.isinf(cost)
+        best = np.empty_like(dist)
+        while True:
+            # A forward step adds the cost of the cell entered; a reverse
+            # step adds the cost of the neighbour moved into.
+            carried = dist + cost if reverse else dist
+            best.fill(INF)
+            np.minimum(best[:, 1:, :], carried[:, :-1, :], out=best[:, 1:, :])
+            np.minimum(best[:, :-1, :], carried[:, 1:, :], out=best[:, :-1, :])
+            np.minimum(best[:, :, 1:], carried[:, :, :-1], out=best[:, :, 1:])
+            np.minimum(best[:, :, :-1], carried[:, :, 1:], out=best[:, :, :-1])
+            if reverse:
+                best[:, blocked] = INF
+            else:
+                best += cost
+            relaxed = np.minimum(dist, best)
+            if np.array_equal(relaxed, dist):
+                break
+            dist = relaxed
+        self.settled += int(np.isfinite(dist).sum())
+        return dist
+
+    def walk(self, field: np.ndarray, cid: int, source: Cell, target: Cell, reverse: bool = False) -> List[Cell]:
+        """Cells after source up to target along a distance field from sweep().
+
+        A forward field from source is followed backwards from target; a
+        reverse field towards target is followed forwards from source.
+        """
+        x0, y0, x1, y1 = self.bounds(cid)
+        cost = self._block(cid)
+        cells = []
+        cell = source if reverse else target
+        end = target if reverse else source
+        while cell != end:
+            x, y = cell
+            here = field[y - y0, x - x0]
+            step = None
+            for nx, ny in ((x, y + 1), (x + 1, y), (x, y - 1), (x - 1, y)):
+                if not (x0 <= nx < x1 and y0 <= ny < y1):
+                    continue
+                there = field[ny - y0, nx - x0]
+                if reverse and cost[ny - y0, nx - x0] + there == here:
+                    step = (nx, ny)
+                    break
+                if not reverse and there + cost[y - y0, x - x0] == here:
+                    step = (nx, ny)
+                    break
+            if step is None:
+                raise ValueError(f"{target} is not reachable from {source} inside the cluster")
+            cell = step
+            cells.append(cell if reverse else (x, y))
+        return cells if reverse else cells[::-1]
+
+    def cluster_edges(self, cid: int) -> Dict[Cell, List[Tuple[Cell, int]]]:
+        edges = self.edges.get(cid)
+        if edges is not None:
+            return edges
+        nodes = list(self.cluster_nodes(cid))
+        x0, y0, _, _ = self.bounds(cid)
+        fields = self.sweep(cid, nodes) if nodes else []
+        edges = {}
+        for node, field in zip(nodes, fields):
+            self.fields[node] = field
+            edges[node] = [(other, int(field[other[1] - y0, other[0] - x0])) for other in nodes
+                           if other != node and field[other[1] - y0, other[0] - x0] < INF]
+        self.edges[cid] = edges
+        return edges
+
+    def invalidate(self, cells: Set[Cell]) -> int:
+        """Forget the clusters holding any of cells; returns how many were dropped."""
+        dirty = {self.cluster_of(cell) for cell in cells
+                 if 0 <= cell[0] < self.env.width and 0 <= cell[1] < self.env.height}
+        dirty &= set(self.costs)
+        for cid in dirty:
+            del self.costs[cid]
+            for other in self._neighbour_clusters(cid):
+                self.borders.pop((min(cid, other), max(cid, other)), None)
+            for affected in [cid] + self._neighbour_clusters(cid):
+                self.nodes.pop(affected, None)
+                for node in self.edges.pop(affected, {}):
+                    self.fields.pop(node, None)
+        return len(dirty)
+
+class HPAStarPlanner(Planner):
+    """Hierarchical A*: search the cluster graph, then refine into grid moves.
+
+    Like DStarLitePlanner, it takes every cell's cost at the start time of
+    the call and keeps the abstraction between calls. When the start time
+    moves, the cells of moving obstacles and dynamic changes at the old and
+    new times are invalidated along with the cells in
+    GridEnvironment.change_log. Refined paths are checked against the
+    time-dependent costs; if one runs into a cell that is blocked when it
+    is reached, or no path is found while costs still change over time,
+    the call falls back to a flat time-expanded A* search.
+
+    Paths are near-optimal rather than optimal, since the abstract graph
+    only crosses cluster borders at transition cells.
+    """
+
+    def __init__(self, env, cluster_size: int = 16):
+        super().__init__(env)
+        self.cluster_size = cluster_size
+        self.graph: Optional[AbstractGraph] = None
+        self.env_version = env.version
+        env.track_changes(self)
+        self.last_stats: Dict[str, int] = {}
+
+    def heuristic(self, a: Cell, b: Cell) -> int:
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def _graph_at(self, start_time: int) -> Tuple[AbstractGraph, int]:
+        graph = self.graph
+        changes = self.env.changes_since(self.env_version)
+        self.env_version = self.env.version
+        if graph is None or None in changes:
+            self.graph = AbstractGraph(self.env, self.cluster_size, start_time)
+            return self.graph, 0
+        graph.env = self.env
+        cells = set(changes)
+        if start_time != graph.time_step:
+            engine = self.env.compile()
+            cells |= engine.time_dependent_cells(graph.time_step)
+            cells |= engine.time_dependent_cells(start_time)
+            graph.time_step = start_time
+        return graph, graph.invalidate(cells)
+
+    def _field_costs(self, graph: AbstractGraph, field: np.ndarray, cid: int,
+                     cells: List[Cell]) -> Dict[Cell, int]:
+        """Finite field values at those of cells that lie in cluster cid."""
+        x0, y0, x1, y1 = graph.bounds(cid)
+        costs = {}
+        for x, y in cells:
+            if x0 <= x < x1 and y0 <= y < y1 and field[y - y0, x - x0] < INF:
+                costs[(x, y)] = int(field[y - y0, x - x0])
+        return costs
+
+    def _abstract_search(self, graph: AbstractGraph, start: Cell, goal: Cell,
+                         from_start: Dict[Cell, int], to_goal: Dict[Cell, int]) -> List[Cell]:
+        start_cluster = graph.cluster_of(start)
+        parent: Dict[Cell, Optional[Cell]] = {start: None}
+        g = {start: 0}
+        queue = [(self.heuristic(start, goal), 0, start)]
+        closed = set()
+        while queue:
+            _, cost, node = heapq.heappop(queue)
+            if node == goal:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parent[node]
+                return path[::-1]
+            if node in closed:
+                continue
+            closed.add(node)
+            self.nodes_expanded += 1
+
+            if node == start:
+                nodes = graph.cluster_nodes(start_cluster)
+                successors = [(other, from_start[other]) for other in nodes
+                              if other in from_start and other != start]
+                successors += nodes.get(start, [])
+                if goal in from_start:
+                    successors.append((goal, from_start[goal]))
+            else:
+                cid = graph.cluster_of(node)
+                successors = list(graph.cluster_edges(cid).get(node, []))
+                successors += graph.cluster_nodes(cid).get(node, [])
+            if node in to_goal:
+                successors.append((goal, to_goal[node]))
+
+            for succ, step in successors:
+                new_cost = cost + step
+                if new_cost < g.get(succ, INF):
+                    g[succ] = new_cost
+                    parent[succ] = node
+                    heapq.heappush(queue, (new_cost + self.heuristic(succ, goal), new_cost, succ))
+        return []
+
+    def _refine(self, graph: AbstractGraph, abstract: List[Cell], start_field: np.ndarray,
+                goal_field: np.ndarray) -> List[Cell]:
+        start, goal = abstract[0], abstract[-1]
+        start_cluster, goal_cluster = graph.cluster_of(start), graph.cluster_of(goal)
+        path = [start]
+        for a, b in zip(abstract, abstract[1:]):
+            cid = graph.cluster_of(a)
+            if cid != graph.cluster_of(b):
+                path.append(b)
+            elif a == start:
+                path.extend(graph.walk(start_field, start_cluster, start, b))
+            elif b == goal:
+                path.extend(graph.walk(goal_field, goal_cluster, a, goal, reverse=True))
+            else:
+                path.extend(graph.walk(graph.fields[a], cid, a, b))
+        return path
+
+    def plan(self, start: Tuple[int, int], goal: Tuple[int, int],
+             start_time: int = 0, recalculate_heuristic: bool = True) -> List[Tuple[int, int]]:
+        self.nodes_expanded = 0
+        instrumentation = self.instrumentation
+        start, goal = tuple(start), tuple(goal)
+        if not all(0 <= x < self.env.width and 0 <= y < self.env.height for x, y in (start, goal)):
+            self.last_stats = {'abstract_expansions': 0, 'cells_settled': 0, 'clusters_built': 0,
+                               'clusters_invalidated': 0, 'fallback': 0}
+            return []
+
+        with instrumentation.phase('abstraction'):
+            graph, invalidated = self._graph_at(start_time)
+        settled_before, built_before = graph.settled, graph.clusters_built
+        if graph.cost(start) == INF or graph.cost(goal) == INF:
+            path: List[Cell] = []
+        elif start == goal:
+            path = [start]
+        else:
+            with instrumentation.phase('search'):
+                start_cluster, goal_cluster = graph.cluster_of(start), graph.cluster_of(goal)
+                start_field = graph.sweep(start_cluster, [start])[0]
+                goal_field = graph.sweep(goal_cluster, [goal], reverse=True)[0]
+                from_start = self._field_costs(graph, start_field, start_cluster,
+                                               list(graph.cluster_nodes(start_cluster)) + [goal])
+                to_goal = self._field_costs(graph, goal_field, goal_cluster, list(graph.cluster_nodes(goal_cluster)))
+                abstract = self._abstract_search(graph, start, goal, from_start, to_goal)
+            with instrumentation.phase('reconstruct'):
+                path = self._refine(graph, abstract, start_field, goal_field) if abstract else []
+
+        settled = graph.settled - settled_before
+        self.last_stats = {
+            'abstract_expansions': self.nodes_expanded,
+            'cells_settled': settled,
+            'clusters_built': graph.clusters_built - built_before,
+            'clusters_invalidated': invalidated,
+            'fallback': 0,
+        }
+        self.nodes_expanded += settled
+
+        # A refined path may run into a cell blocked when it is reached, and a
+        # cell blocked at the start time (an endpoint or a chokepoint) may
+        # clear later, which the frozen abstraction cannot see
+        if (not is_valid_path(self.env, path, start, goal, start_time) if path
+                else not self.env.compile().is_static_from(start_time)):
+            with instrumentation.phase('fallback'):
+                fallback = AStarPlanner(self.env)
+                path = fallback.plan(start, goal, start_time)
+            self.nodes_expanded += fallback.nodes_expanded
+            self.last_stats['fallback'] = 1
+        instrumentation.update(self.last_stats)
+        return path
@@ -0,0 +1,214 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+from agent import Planner, calculate_path_cost, is_valid_path
+from cost_engine import BLOCKED
+from planners.search import SearchKernel
+
+INF = float('inf')
+
+class DStarLitePlanner(Planner):
+    """D* Lite planner that keeps its search tree between plan() calls.
+
+    The search runs backwards from the goal over the grid with each cell
+    costing the least it costs from the start time of the current call
+    on: its terrain cost, lowered by any later dynamic change, blocked
+    only by static obstacles. On the next call for the same goal it moves
+    the start, collects the cells whose cost changed (through
+    GridEnvironment.change_log and the dynamic changes between the old
+    and new start time) and repairs only the vertices affected by them.
+
+    When costs no longer change from the start time on, these are the
+    real costs and the repaired path is returned. Otherwise they are
+    lower bounds: the repaired path is re-costed at the time each cell is
+    entered, and returned when it costs no more than the bound, which
+    proves it optimal. A path that runs into a moving obstacle or a
+    costlier dynamic change is answered by the time-expanded SearchKernel
+    instead; the search tree is kept either way.
+
+    last_stats reports the expansions of the last call and, when
+    compare_full is set, the expansions a from-scratch search would need.
+    """
+
+    def __init__(self, env, compare_full: bool = False):
+        super().__init__(env)
+        self.compare_full = compare_full
+        self.last_stats: Dict[str, Optional[int]] = {}
+        # Cheapest dynamic cost per cell from the start time on, for (version, start time)
+        self.lowest: Dict[Tuple[int, int], int] = {}
+        self.lowest_key: Optional[Tuple[int, int]] = None
+        self.reset()
+        env.track_changes(self)
+
+    def reset(self):
+        self.goal: Optional[Tuple[int, int]] = None
+        self.start: Optional[Tuple[int, int]] = None
+        self.g: Dict[Tuple[int, int], float] = {}
+        self.rhs: Dict[Tuple[int, int], float] = {}
+        self.queue = []
+        self.queued: Dict[Tuple[int, int], Tuple[float, float]] = {}
+        self.km = 0
+        self.costs: Dict[Tuple[int, int], float] = {}
+        self.cost_time = 0
+        self.env_version = self.env.version
+
+    def heuristic(self, a: Tuple[int, int], b: Tuple[int, int]) -> int:
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def _cells_around(self, cell: Tuple[int, int]) -> List[Tuple[int, int]]:
+        x, y = cell
+        return [(x + dx, y + dy) for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]
+                if 0 <= x + dx < self.env.width and 0 <= y + dy < self.env.height]
+
+    def _cost(self, cell: Tuple[int, int]) -> float:
+        cost = self.costs.get(cell)
+        if cost is None:
+            engine = self.env.compile()
+            if cell in engine.static:
+                cost = INF
+            else:
+                cost = min(engine.grid.item(cell[1], cell[0]), self.lowest.get(cell, BLOCKED))
+                cost = INF if cost >= BLOCKED else cost
+            self.costs[cell] = cost
+        return cost
+
+    def _key(self, cell: Tuple[int, int]) -> Tuple[float, float]:
+        best = min(self.g.get(cell, INF), self.rhs.get(cell, INF))
+        return (best + self.heuristic(self.start, cell) + self.km, best)
+
+    def _update_vertex(self, cell: Tuple[int, int]):
+        if cell != self.goal:
+            self.rhs[cell] = min((self._cost(succ) + self.g.get(succ, INF)
+                                  for succ in self._cells_around(cell)), default=INF)
+        self.queued.pop(cell, None)
+        if self.g.get(cell, INF) != self.rhs.get(cell, INF):
+            key = self._key(cell)
+            self.queued[cell] = key
+            heapq.heappush(self.queue, (key, cell))
+
+    def _top_key(self) -> Tuple[float, float]:
+        while self.queue and self.queued.get(self.queue[0][1]) != self.queue[0][0]:
+            heapq.heappop(self.queue)
+        return self.queue[0][0] if self.queue else (INF, INF)
+
+    def _compute_shortest_path(self) -> int:
+        expanded = 0
+        start = self.start
+        while (self._top_key() < self._key(start) or
+               self.rhs.get(start, INF) != self.g.get(start, INF)):
+            if not self.queue:
+                break
+            old_key, cell = heapq.heappop(self.queue)
+            new_key = self._key(cell)
+            if old_key < new_key:
+                self.queued[cell] = new_key
+                heapq.heappush(self.queue, (new_key, cell))
+                continue
+            del self.queued[cell]
+            expanded += 1
+            if self.g.get(cell, INF) > self.rhs.get(cell, INF):
+                self.g[cell] = self.rhs[cell]
+                for pred in self._cells_around(cell):
+                    self._update_vertex(pred)
+            else:
+                self.g[cell] = INF
+                self._update_vertex(cell)
+                for pred in self._cells_around(cell):
+                    self._update_vertex(pred)
+        return expanded
+
+    def _changed_cells(self, start_time: int) -> Optional[set]:
+        """Cells whose cost may differ from the cached ones, None to start over."""
+        cells = set()
+        for cell in self.env.changes_since(self.env_version):
+            if cell is None:
+                return None
+            cells.add(cell)
+        if start_time != self.cost_time:
+            # Dynamic changes between the two start times leave or join the bounds
+            first, last = sorted((self.cost_time, start_time))
+            for change_time, changes in self.env.compile().dynamic.items():
+                if first <= change_time < last:
+                    cells.update(changes)
+        return cells
+
+    def _extract_path(self) -> List[Tuple[int, int]]:
+        path = [self.start]
+        current = self.start
+        while current != self.goal:
+            if self.g.get(current, INF) == INF or len(path) > len(self.g) + 1:
+                return []
+            current = min(self._cells_around(current),
+                          key=lambda cell: self._cost(cell) + self.g.get(cell, INF))
+            path.append(current)
+        return path
+
+    def _repair(self, changed: Optional[set], goal: Tuple[int, int], start: Tuple[int, int], start_time: int):
+        """Move the start and update the changed cells, or start over when changed is None."""
+        if changed is not None:
+            self.km += self.heuristic(self.start, start)
+            self.start = start
+            self.cost_time = start_time
+            for cell in changed:
+                if cell not in self.costs:
+                    continue
+                old_cost = self.costs.pop(cell)
+                if self._cost(cell) != old_cost:
+                    self._update_vertex(cell)
+                    for pred in self._cells_around(cell):
+                        self._update_vertex(pred)
+        else:
+            self.reset()
+            self.goal, self.start, self.cost_time = goal, start, start_time
+            self.rhs[goal] = 0
+            self.queued[goal] = self._key(goal)
+            heapq.heappush(self.queue, (self.queued[goal], goal))
+
+    def _time_expanded(self, start: Tuple[int, int], goal: Tuple[int, int], start_time: int) -> List[Tuple[int, int]]:
+        with self.instrumentation.phase('fallback'):
+            kernel = SearchKernel(self, heuristic=lambda cell: self.heuristic(cell, goal))
+            slot = kernel.run(start, goal, start_time)
+            path = kernel.path(slot) if slot is not None else []
+        self.last_stats['fallback'] = 1
+        return path
+
+    def plan(self, start: Tuple[int, int], goal: Tuple[int, int],
+             start_time: int = 0, recalculate_heuristic: bool = True) -> List[Tuple[int, int]]:
+        start, goal = tuple(start), tuple(goal)
+        instrumentation = self.instrumentation
+        changed = self._changed_cells(start_time) if goal == self.goal else None
+        incremental = changed is not None
+        engine = self.env.compile()
+        if self.lowest_key != (self.env.version, start_time):
+            self.lowest = engine.lowest_dynamic_costs(start_time)
+            self.lowest_key = (self.env.version, start_time)
+
+        with instrumentation.phase('repair'):
+            self._repair(changed, goal, start, start_time)
+        self.env_version = self.env.version
+
+        with instrumentation.phase('search'):
+            self.nodes_expanded = self._compute_shortest_path()
+        self.last_stats = {
+            'incremental': incremental,
+            'nodes_expanded': self.nodes_expanded,
+            'changed_cells': len(changed) if incremental else None,
+            'full_replan_expansions': None,
+            'fallback': 0,
+        }
+        if self.compare_full and incremental:
+            fresh = DStarLitePlanner(self.env)
+            fresh.plan(start, goal, start_time)
+            self.last_stats['full_replan_expansions'] = fresh.nodes_expanded
+        instrumentation.update({'changed_cells': len(changed) if incremental else 0,
+                                'incremental_plans': int(incremental),
+                                'queue_size': len(self.queued), 'cached_costs': len(self.costs)})
+
+        with instrumentation.phase('reconstruct'):
+            path = self._extract_path()
+        # No path under the lower bounds means none at all
+        if path and not (is_valid_path(self.env, path, start, goal, start_time) and
+                         (engine.is_static_from(start_time) or
+                          calculate_path_cost(self.env, path, start_time) <= self.g.get(start, INF))):
+            path = self._time_expanded(start, goal, start_time)
+            self.last_stats['nodes_expanded'] = self.nodes_expanded
+        return path
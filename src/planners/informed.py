@@ -1,36 +1,230 @@
 import heapq
-from typing import List, Tuple, Dict
-from agent import Planner
+import time
+from typing import Dict, List, Optional, Tuple
+from agent import Planner, calculate_path_cost
+from planners.search import SearchKernel
+from planners.bidirectional import BidirectionalAStarPlanner
+from landmarks import LandmarkTable
 
 class AStarPlanner(Planner):
+    def __init__(self, env, queue='heap', fold_time: bool = True, allow_wait: bool = False,
+                 bidirectional: bool = True):
+        super().__init__(env, fold_time, allow_wait)
+        self.queue = queue
+        self.queue_stats = {}
+        # Queries whose costs cannot change over time go to BidirectionalAStarPlanner
+        self.bidirectional = bidirectional
+        
     def heuristic(self, a: Tuple[int, int], b: Tuple[int, int]) -> int:
         return abs(a[0] - b[0]) + abs(a[1] - b[1])
     
     def plan(self, start: Tuple[int, int], goal: Tuple[int, int], 
              start_time: int = 0, recalculate_heuristic: bool = True) -> List[Tuple[int, int]]:
         self.nodes_expanded = 0
-        queue = [(self.heuristic(start, goal), 0, start[0], start[1], start_time, [start])]
-        visited = {}
-        
-        while queue:
-            f_cost, g_cost, x, y, time_step, path = heapq.heappop(queue)
-            
-            if (x, y) == goal:
-                return path
-                
-            state = (x, y, time_step)
-            if state in visited and visited[state] <= g_cost:
-                continue
-            visited[state] = g_cost
-            self.nodes_expanded += 1
-            
-            for nx, ny, cost in self.get_neighbors(x, y, time_step):
-                new_g_cost = g_cost + cost
-                new_f_cost = new_g_cost + self.heuristic((nx, ny), goal)
-                new_state = (nx, ny, time_step + 1)
-                
-                if new_state not in visited or new_g_cost < visited[new_state]:
-                    new_path = path + [(nx, ny)]
-                    heapq.heappush(queue, (new_f_cost, new_g_cost, nx, ny, time_step + 1, new_path))
-                    
-        return []
\ No newline at end of file
+        if (self.bidirectional and self.reservations is None
+                and self.env.compile().is_static_from(start_time)):
+            static = BidirectionalAStarPlanner(self.env)
+            static.instrumentation = self.instrumentation
+            path = static.plan(start, goal, start_time)
+            self.nodes_expanded = static.nodes_expanded
+            self.queue_stats = {}
+            return path
+        kernel = SearchKernel(self, heuristic=lambda cell: self.heuristic(cell, goal), queue=self.queue)
+        with self.instrumentation.phase('search'):
+            slot = kernel.run(start, goal, start_time)
+        self.queue_stats = kernel.queue.stats()
+        with self.instrumentation.phase('reconstruct'):
+            return kernel.path(slot) if slot is not None else []
+
+class AnytimeAStarPlanner(AStarPlanner):
+    """Anytime Repairing A* (ARA*) under a wall-clock or expansion budget.
+
+    The first search inflates the heuristic by epsilon and finds a path
+    quickly; epsilon is then lowered step by step towards 1. Each repair
+    keeps the g-values of the previous searches and only re-expands the
+    states whose g improved after they were closed, so earlier effort is
+    reused. When the budget runs out the best path so far is returned.
+
+    self.bound holds the suboptimality bound of the returned path: its
+    cost is at most bound times the optimal cost. It is 1.0 once the
+    search has proven the path optimal and inf until a repair completes.
+    self.solutions lists every improvement with its time and expansions.
+    Queries always search time-expanded states, never bidirectionally.
+    """
+
+    def __init__(self, env, epsilon: float = 3.0, epsilon_step: float = 0.5,
+                 deadline: Optional[float] = None, max_expansions: Optional[int] = None,
+                 fold_time: bool = True, allow_wait: bool = False):
+        super().__init__(env, fold_time=fold_time, allow_wait=allow_wait, bidirectional=False)
+        self.epsilon = epsilon
+        self.epsilon_step = epsilon_step
+        # Budgets used when plan() is not given its own
+        self.deadline = deadline
+        self.max_expansions = max_expansions
+        self.bound = float('inf')
+        self.solutions: List[Dict[str, float]] = []
+
+    def plan(self, start: Tuple[int, int], goal: Tuple[int, int],
+             start_time: int = 0, recalculate_heuristic: bool = True,
+             deadline: Optional[float] = None, max_expansions: Optional[int] = None) -> List[Tuple[int, int]]:
+        """deadline is a budget in seconds from the call, max_expansions a
+        budget in expanded states; whichever runs out first stops the search."""
+        started = time.perf_counter()
+        deadline = self.deadline if deadline is None else deadline
+        max_expansions = self.max_expansions if max_expansions is None else max_expansions
+        stop_at = started + deadline if deadline is not None else float('inf')
+        expansion_limit = max_expansions if max_expansions is not None else float('inf')
+
+        self.nodes_expanded = 0
+        self.bound = float('inf')
+        self.solutions = []
+        goal = tuple(goal)
+        h = lambda x, y: abs(x - goal[0]) + abs(y - goal[1])
+        kernel = SearchKernel(self, queue='heap')
+        if not (kernel.on_grid(start) and kernel.on_grid(goal)):
+            return []
+        layer, width = kernel.cells_per_layer, self.env.width
+        slot_of, g, closed, parent = kernel.slot_of, kernel.g, kernel.closed, kernel.parent
+        get_neighbors, fold = self.get_neighbors, kernel.fold
+
+        start_time = fold(start_time)
+        slot = kernel._new_slot(start_time * layer + start[1] * width + start[0], -1, 0)
+        epsilon = max(self.epsilon, 1.0)
+        open_list = [(epsilon * h(*start), 0, start[0], start[1], start_time, slot)]
+        incons = {}
+        best_g, best_slot = (0, slot) if tuple(start) == goal else (float('inf'), None)
+        iterations = 0
+        out_of_budget = False
+
+        while True:
+            # One weighted A* repair: expand until no open state can beat the incumbent
+            with self.instrumentation.phase('search'):
+                while open_list and open_list[0][0] < best_g:
+                    if self.nodes_expanded >= expansion_limit or (
+                            self.nodes_expanded & 63 == 0 and time.perf_counter() >= stop_at):
+                        out_of_budget = True
+                        break
+                    _, g_cost, x, y, time_step, slot = heapq.heappop(open_list)
+                    if closed[slot] or g_cost > g[slot]:
+                        continue
+                    closed[slot] = 1
+                    if (x, y) == goal:
+                        continue
+                    self.nodes_expanded += 1
+
+                    next_time = fold(time_step + 1)
+                    base = next_time * layer
+                    for nx, ny, cost in get_neighbors(x, y, time_step):
+                        new_g = g_cost + cost
+                        key = base + ny * width + nx
+                        child = slot_of.get(key)
+                        if child is None:
+                            child = kernel._new_slot(key, slot, new_g)
+                        elif new_g < g[child]:
+                            g[child] = new_g
+                            parent[child] = slot
+                        else:
+                            continue
+                        if (nx, ny) == goal and new_g < best_g:
+                            best_g, best_slot = new_g, child
+                        if closed[child]:
+                            incons[child] = (nx, ny, next_time)
+                        else:
+                            heapq.heappush(open_list, (new_g + epsilon * h(nx, ny), new_g, nx, ny, next_time, child))
+            iterations += 1
+            if best_slot is not None:
+                # Ancestors improved after the goal was reached shorten its
+                # parent chain without lowering the goal's g
+                best_g = min(best_g, calculate_path_cost(self.env, kernel.path(best_slot), start_time))
+
+            # The epsilon bound only holds once a repair has run to completion.
+            # An interrupted repair can still lower the cost, and the bound of
+            # the last completed one then remains valid for the cheaper path.
+            bound = self.bound
+            if not out_of_budget and best_slot is not None:
+                lower = best_g
+                for entry in open_list:
+                    if not closed[entry[5]] and entry[1] == g[entry[5]]:
+                        lower = min(lower, entry[1] + h(entry[2], entry[3]))
+                for child, (x, y, _) in incons.items():
+                    lower = min(lower, g[child] + h(x, y))
+                bound = min(bound, epsilon, best_g / lower if lower > 0 else 1.0)
+            if best_slot is not None and (not self.solutions or best_g < self.solutions[-1]['cost']
+                                          or bound < self.bound):
+                self.solutions.append({'time': time.perf_counter() - started, 'cost': best_g,
+                                       'bound': bound, 'nodes_expanded': self.nodes_expanded})
+            self.bound = bound
+            if out_of_budget or epsilon <= 1.0 or self.bound <= 1.0 or not (open_list or incons):
+                break
+
+            # Next repair: lower epsilon, reopen the inconsistent states and re-key everything
+            epsilon = max(1.0, epsilon - self.epsilon_step)
+            states = {entry[5]: entry[2:5] for entry in open_list
+                      if not closed[entry[5]] and entry[1] == g[entry[5]]}
+            states.update(incons)
+            open_list = [(g[child] + epsilon * h(x, y), g[child], x, y, t, child)
+                         for child, (x, y, t) in states.items()]
+            heapq.heapify(open_list)
+            incons = {}
+            closed[:] = bytes(len(closed))
+
+        self.queue_stats = {}
+        self.instrumentation.update({'iterations': iterations, 'solutions': len(self.solutions),
+                                     'states': len(kernel.keys)})
+        if best_slot is None:
+            return []
+        with self.instrumentation.phase('reconstruct'):
+            return kernel.path(best_slot)
+
+class ALTAStarPlanner(AStarPlanner):
+    """A* guided by landmark (ALT) lower bounds instead of Manhattan distance.
+
+    The LandmarkTable is built on the first query, or memory-mapped from
+    next to map_file (default: the file env was loaded from) when a table
+    for the same costs was saved there, and is rebuilt after the
+    environment changes. Only the table of the map as loaded (or, with an
+    explicit map_file, as given) is saved; tables of edited maps stay in
+    memory. Each query turns the table into a per-cell heuristic array
+    for its goal. Terrain paged in by tile gets no table and falls back
+    to Manhattan distance. Paths are optimal as with A*.
+    """
+
+    def __init__(self, env, landmarks: int = 8, map_file: Optional[str] = None, queue='heap',
+                 fold_time: bool = True, allow_wait: bool = False):
+        super().__init__(env, queue=queue, fold_time=fold_time, allow_wait=allow_wait, bidirectional=False)
+        self.landmarks = landmarks
+        self.map_file = map_file or env.source
+        # env.version whose table is saved next to map_file
+        self.saved_version = env.version if map_file is not None else env.source_version
+        self.table: Optional[LandmarkTable] = None
+        self.table_version = -1
+
+    def landmark_table(self) -> Optional[LandmarkTable]:
+        if self.table_version != self.env.version:
+            with self.instrumentation.phase('landmarks'):
+                map_file = self.map_file if self.env.version == self.saved_version else None
+                self.table = LandmarkTable.load_or_build(self.env, self.landmarks, map_file)
+            self.table_version = self.env.version
+        return self.table
+
+    def heuristic(self, a: Tuple[int, int], b: Tuple[int, int]) -> int:
+        table = self.landmark_table()
+        return table.bound(a, b) if table is not None else super().heuristic(a, b)
+
+    def plan(self, start: Tuple[int, int], goal: Tuple[int, int],
+             start_time: int = 0, recalculate_heuristic: bool = True) -> List[Tuple[int, int]]:
+        self.nodes_expanded = 0
+        table = self.landmark_table()
+        if not all(0 <= x < self.env.width and 0 <= y < self.env.height for x, y in (start, goal)):
+            return []
+        if table is None:
+            heuristic = lambda cell: AStarPlanner.heuristic(self, cell, goal)
+        else:
+            bounds, width = table.bounds_to(goal), table.width
+            heuristic = lambda cell: bounds[cell[1] * width + cell[0]]
+        kernel = SearchKernel(self, heuristic=heuristic, queue=self.queue)
+        with self.instrumentation.phase('search'):
+            slot = kernel.run(start, goal, start_time)
+        self.queue_stats = kernel.queue.stats()
+        with self.instrumentation.phase('reconstruct'):
+            return kernel.path(slot) if slot is not None else []
@@ -1,26 +1,131 @@
+import bisect
 import random
 import math
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from agent import Planner
+from cost_engine import BLOCKED
+from instrumentation import CountingEnvironment
+from path_eval import evaluate_path
+
+class _ScoredPath:
+    """A path with the cost of entering each of its cells and the running
+    total, plus the positions of cells whose cost varies over time."""
+
+    __slots__ = ('path', 'steps', 'prefix', 'varying', 'cost')
+
+    def __init__(self, path, steps, varying_cells):
+        self.path = path
+        self.steps = steps
+        self.prefix = list(accumulate(steps))
+        self.cost = self.prefix[-1]
+        self.varying = [k for k in range(1, len(path)) if path[k] in varying_cells] if varying_cells else []
+
+# (best path or None, its cost, iterations, counters) from one restart or chain
+ChainResult = Tuple[Optional[List[Tuple[int, int]]], float, int, Dict[str, int]]
 
 class HillClimbingPlanner(Planner):
-    def __init__(self, env, max_restarts=10, max_iterations=1000):
+    """Random-restart hill climbing over mutated paths.
+
+    Without a seed the restarts draw from the global random module one after
+    another. With a seed, restart i draws from its own random.Random seeded
+    from (seed, i), so restarts are independent and can run in a process
+    pool of `workers`. Their results are reduced in restart order, keeping
+    the first cheapest path, and with a target_cost the reduction stops at
+    the first restart whose path reaches it. The result for a seed is the
+    same for every worker count.
+    """
+
+    def __init__(self, env, max_restarts=10, max_iterations=1000, seed: Optional[int] = None,
+                 workers: int = 1, target_cost: Optional[float] = None):
         super().__init__(env)
         self.max_restarts = max_restarts
         self.max_iterations = max_iterations
+        self.seed = seed
+        self.workers = workers
+        self.target_cost = target_cost
+        self.rng = random
+    
+    def _settings(self) -> Dict[str, Any]:
+        """Constructor arguments that rebuild this planner in a worker process."""
+        return {'max_restarts': self.max_restarts, 'max_iterations': self.max_iterations}
         
     def evaluate_path(self, path: List[Tuple[int, int]], start_time: int) -> int:
-        total_cost = 0
-        current_time = start_time
+        return evaluate_path(self.env, path, start_time)
+    
+    def _prepare(self, start_time: int):
+        # Cells whose cost can depend on when they are entered; a mutation that
+        # shifts the rest of the path in time re-checks only these.
+        engine = self.env.compile()
+        self._varying = set() if engine.is_static_from(start_time) else engine.varying_cells(start_time)
+    
+    def _step_costs(self, cells, first_time: int) -> List[int]:
+        """Cost of entering each cell in turn from first_time on; inf from the first blocked one."""
+        get_cost = self.env.get_cost
+        steps = []
+        for offset, (x, y) in enumerate(cells):
+            cost = get_cost(x, y, first_time + offset)
+            if cost >= BLOCKED:
+                steps.extend([float('inf')] * (len(cells) - offset))
+                break
+            steps.append(cost)
+        return steps
+    
+    def _score_path(self, path: List[Tuple[int, int]], start_time: int) -> _ScoredPath:
+        return _ScoredPath(path, [0] + self._step_costs(path[1:], start_time), self._varying)
+    
+    def _score_mutation(self, current: _ScoredPath, mutation, start_time: int):
+        """Cost of current with a mutation applied, walking only the new segment.
         
-        for i in range(1, len(path)):
-            x, y = path[i]
-            if not self.env.is_valid_position(x, y, current_time):
+        The suffix after the segment keeps its cost unless the segment changed
+        length and the suffix holds cells whose cost varies over time; only
+        those cells are looked up again at their shifted time steps.
+        """
+        if mutation is None:
+            return current.cost
+        i, j, segment = mutation
+        if current.cost == float('inf'):
+            return self.evaluate_path(self._apply_path(current.path, mutation), start_time)
+        
+        get_cost = self.env.get_cost
+        cost = current.prefix[i]
+        for offset in range(1, len(segment)):
+            x, y = segment[offset]
+            step = get_cost(x, y, start_time + i + offset - 1)
+            if step >= BLOCKED:
                 return float('inf')
-            total_cost += self.env.get_cost(x, y, current_time)
-            current_time += 1
-            
-        return total_cost
+            cost += step
+        cost += current.cost - current.prefix[j]
+        
+        shift = len(segment) - 1 - (j - i)
+        if shift:
+            steps, path = current.steps, current.path
+            for k in current.varying[bisect.bisect_right(current.varying, j):]:
+                x, y = path[k]
+                step = get_cost(x, y, start_time + k + shift - 1)
+                if step >= BLOCKED:
+                    return float('inf')
+                cost += step - steps[k]
+        return cost
+    
+    def _apply_mutation(self, current: _ScoredPath, mutation, start_time: int) -> _ScoredPath:
+        if mutation is None:
+            return current
+        if current.cost == float('inf'):
+            return self._score_path(self._apply_path(current.path, mutation), start_time)
+        i, j, segment = mutation
+        path = self._apply_path(current.path, mutation)
+        steps = current.steps[:i + 1] + self._step_costs(segment[1:], start_time + i)
+        suffix = current.steps[j + 1:]
+        shift = len(segment) - 1 - (j - i)
+        if shift:
+            for k in current.varying[bisect.bisect_right(current.varying, j):]:
+                x, y = path[k + shift]
+                step = self.env.get_cost(x, y, start_time + k + shift - 1)
+                suffix[k - j - 1] = step if step < BLOCKED else float('inf')
+        steps += suffix
+        return _ScoredPath(path, steps, self._varying)
     
     def generate_random_path(self, start: Tuple[int, int], goal: Tuple[int, int], 
                            max_length: int = 50) -> List[Tuple[int, int]]:
@@ -39,89 +144,174 @@ class HillClimbingPlanner(Planner):
             if not valid_neighbors:
                 break
                 
-            next_cell = random.choice(valid_neighbors)
+            next_cell = self.rng.choice(valid_neighbors)
             path.append(next_cell)
             visited.add(next_cell)
             current = next_cell
             
         return path
     
-    def mutate_path(self, path: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    def propose_mutation(self, path: List[Tuple[int, int]]) -> Optional[Tuple[int, int, List[Tuple[int, int]]]]:
+        """Pick a segment path[i..j] and a random replacement for it.
+        
+        Returns (i, j, new_segment), or None when the path is left as it is.
+        """
         if len(path) <= 2:
-            return path
+            return None
             
-        i = random.randint(0, len(path) - 2)
-        j = random.randint(i + 1, len(path) - 1)
+        i = self.rng.randint(0, len(path) - 2)
+        j = self.rng.randint(i + 1, len(path) - 1)
         
         new_segment = self.generate_random_path(path[i], path[j], j - i + 5)
         
         if len(new_segment) > 1:
-            return path[:i] + new_segment + path[j+1:]
-        return path
+            return i, j, new_segment
+        return None
+    
+    @staticmethod
+    def _apply_path(path: List[Tuple[int, int]], mutation) -> List[Tuple[int, int]]:
+        if mutation is None:
+            return path
+        i, j, new_segment = mutation
+        return path[:i] + new_segment + path[j+1:]
+    
+    def mutate_path(self, path: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        return self._apply_path(path, self.propose_mutation(path))
     
     def plan(self, start: Tuple[int, int], goal: Tuple[int, int], 
              start_time: int = 0, recalculate_heuristic: bool = True) -> List[Tuple[int, int]]:
         self.nodes_expanded = 0
         best_path = None
         best_cost = float('inf')
+        totals: Dict[str, int] = {}
+        self._prepare(start_time)
         
-        for restart in range(self.max_restarts):
-            current_path = self.generate_random_path(start, goal)
-            current_cost = self.evaluate_path(current_path, start_time)
-            
+        for path, cost, iterations, counts in self._chains(start, goal, start_time):
+            self.nodes_expanded += iterations
+            for name, amount in counts.items():
+                totals[name] = totals.get(name, 0) + amount
+            if path is not None and (best_path is None or cost < best_cost):
+                best_path, best_cost = path, cost
+            if self.target_cost is not None and best_cost <= self.target_cost:
+                break
+                
+        self.instrumentation.update(totals)
+        return best_path if best_path else []
+    
+    def _chains(self, start: Tuple[int, int], goal: Tuple[int, int], start_time: int) -> Iterator[ChainResult]:
+        """Run the restarts and yield their results in restart order."""
+        if self.seed is None:
+            self.rng = random
+            for _ in range(self.max_restarts):
+                yield self._chain(start, goal, start_time)
+            return
+        
+        seeds = [f"{self.seed}/{index}" for index in range(self.max_restarts)]
+        if self.workers <= 1 or len(seeds) <= 1:
+            for chain_seed in seeds:
+                self.rng = random.Random(chain_seed)
+                yield self._chain(start, goal, start_time)
+            return
+        
+        env = self.env._env if isinstance(self.env, CountingEnvironment) else self.env
+        pool = ProcessPoolExecutor(max_workers=min(self.workers, len(seeds)), initializer=_init_worker,
+                                   initargs=(type(self), env, self._settings()))
+        try:
+            futures = [pool.submit(_chain_worker, start, goal, start_time, chain_seed) for chain_seed in seeds]
+            for future in futures:
+                yield future.result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def _chain(self, start: Tuple[int, int], goal: Tuple[int, int], start_time: int) -> ChainResult:
+        """One restart: climb from a random path and return the best path it accepted."""
+        instrumentation = self.instrumentation
+        best_path = None
+        best_cost = float('inf')
+        iterations = accepted = 0
+        
+        with instrumentation.phase('initial_path'):
+            current = self._score_path(self.generate_random_path(start, goal), start_time)
+        
+        with instrumentation.phase('improve'):
             for iteration in range(self.max_iterations):
-                self.nodes_expanded += 1
+                iterations += 1
                 
-                new_path = self.mutate_path(current_path)
-                new_cost = self.evaluate_path(new_path, start_time)
+                mutation = self.propose_mutation(current.path)
+                new_cost = self._score_mutation(current, mutation, start_time)
                 
-                if new_cost < current_cost:
-                    current_path, current_cost = new_path, new_cost
+                if new_cost < current.cost:
+                    current = self._apply_mutation(current, mutation, start_time)
+                    accepted += 1
                     
                     if new_cost < best_cost:
-                        best_path, best_cost = new_path, new_cost
+                        best_path, best_cost = current.path, new_cost
                         
-                if random.random() < 0.1:
+                if self.rng.random() < 0.1:
                     break
                     
-        return best_path if best_path else []
+        return best_path, best_cost, iterations, {'restarts': 1, 'accepted_moves': accepted}
 
 class SimulatedAnnealingPlanner(HillClimbingPlanner):
-    def __init__(self, env, initial_temp=1000, cooling_rate=0.95, max_iterations=1000):
-        super().__init__(env, max_restarts=1, max_iterations=max_iterations)
+    """Simulated annealing; with chains > 1 it runs independent annealing
+    chains, seeded and reduced like the hill-climbing restarts."""
+    
+    def __init__(self, env, initial_temp=1000, cooling_rate=0.95, max_iterations=1000, chains: int = 1,
+                 seed: Optional[int] = None, workers: int = 1, target_cost: Optional[float] = None):
+        super().__init__(env, max_restarts=chains, max_iterations=max_iterations, seed=seed,
+                         workers=workers, target_cost=target_cost)
         self.initial_temp = initial_temp
         self.cooling_rate = cooling_rate
+    
+    def _settings(self) -> Dict[str, Any]:
+        return {'initial_temp': self.initial_temp, 'cooling_rate': self.cooling_rate,
+                'max_iterations': self.max_iterations, 'chains': self.max_restarts}
         
-    def plan(self, start: Tuple[int, int], goal: Tuple[int, int], 
-             start_time: int = 0, recalculate_heuristic: bool = True) -> List[Tuple[int, int]]:
-        self.nodes_expanded = 0
+    def _chain(self, start: Tuple[int, int], goal: Tuple[int, int], start_time: int) -> ChainResult:
+        instrumentation = self.instrumentation
+        iterations = improved = uphill = 0
         
-        current_path = self.generate_random_path(start, goal)
-        current_cost = self.evaluate_path(current_path, start_time)
-        best_path, best_cost = current_path, current_cost
+        with instrumentation.phase('initial_path'):
+            current = self._score_path(self.generate_random_path(start, goal), start_time)
+        best_path, best_cost = current.path, current.cost
         
         temperature = self.initial_temp
         
-        for iteration in range(self.max_iterations):
-            self.nodes_expanded += 1
-            
-            new_path = self.mutate_path(current_path)
-            new_cost = self.evaluate_path(new_path, start_time)
-            
-            if new_cost < current_cost:
-                current_path, current_cost = new_path, new_cost
-                if new_cost < best_cost:
-                    best_path, best_cost = new_path, new_cost
-            else:
-                delta = new_cost - current_cost
-                acceptance_prob = math.exp(-delta / temperature)
+        with instrumentation.phase('improve'):
+            for iteration in range(self.max_iterations):
+                iterations += 1
                 
-                if random.random() < acceptance_prob:
-                    current_path, current_cost = new_path, new_cost
-            
-            temperature *= self.cooling_rate
-            
-            if temperature < 1e-6:
-                break
+                mutation = self.propose_mutation(current.path)
+                new_cost = self._score_mutation(current, mutation, start_time)
+                
+                if new_cost < current.cost:
+                    current = self._apply_mutation(current, mutation, start_time)
+                    improved += 1
+                    if new_cost < best_cost:
+                        best_path, best_cost = current.path, new_cost
+                else:
+                    delta = new_cost - current.cost
+                    acceptance_prob = math.exp(-delta / temperature)
+                    
+                    if self.rng.random() < acceptance_prob:
+                        current = self._apply_mutation(current, mutation, start_time)
+                        uphill += 1
+                
+                temperature *= self.cooling_rate
+                
+                if temperature < 1e-6:
+                    break
                 
-        return best_path
\ No newline at end of file
+        return best_path, best_cost, iterations, {'accepted_moves': improved + uphill, 'uphill_moves': uphill}
+
+_worker_planner: Optional[HillClimbingPlanner] = None
+
+def _init_worker(planner_class, env, settings):
+    global _worker_planner
+    _worker_planner = planner_class(env, **settings)
+
+def _chain_worker(start, goal, start_time, chain_seed) -> ChainResult:
+    planner = _worker_planner
+    planner.rng = random.Random(chain_seed)
+    planner._prepare(start_time)
+    return planner._chain(start, goal, start_time)
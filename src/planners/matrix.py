@@ -0,0 +1,65 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+from planners.uninformed import UniformCostPlanner
+from planners.search import SearchKernel
+
+class DistanceMatrixPlanner(UniformCostPlanner):
+    """Uniform Cost planner answering one-to-many and many-to-many queries.
+
+    Each source runs a single Dijkstra that stops once every target is
+    settled. Unreachable targets get an infinite cost and an empty path.
+    """
+
+    def one_to_many(self, source: Tuple[int, int], targets: Sequence[Tuple[int, int]],
+                    start_time: int = 0, paths: bool = False):
+        """Costs from source to every target, plus the paths when paths=True."""
+        self.nodes_expanded = 0
+        kernel = SearchKernel(self, queue=self.queue)
+        found = kernel.run_many(source, targets, start_time)
+        self.queue_stats = kernel.queue.stats()
+
+        costs = np.full(len(targets), np.inf)
+        routes: List[List[Tuple[int, int]]] = []
+        for i, target in enumerate(targets):
+            slot = found.get(tuple(target))
+            if slot is not None:
+                costs[i] = kernel.g[slot]
+            if paths:
+                routes.append(kernel.path(slot) if slot is not None else [])
+        return (costs, routes) if paths else costs
+
+    def many_to_many(self, sources: Sequence[Tuple[int, int]], targets: Sequence[Tuple[int, int]],
+                     start_time: int = 0, paths: bool = False, processes: Optional[int] = None):
+        """Cost matrix indexed [source, target], plus the paths when paths=True.
+
+        With processes > 1 the sources are spread over a process pool that
+        receives the environment once per worker.
+        """
+        if processes and processes > 1 and len(sources) > 1:
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                     initargs=(self.env, self.queue, self.fold_time, self.allow_wait)) as pool:
+                rows = list(pool.map(_one_to_many_worker,
+                                     [(source, targets, start_time, paths) for source in sources]))
+        else:
+            rows = []
+            for source in sources:
+                row = self.one_to_many(source, targets, start_time, paths)
+                rows.append((row, self.nodes_expanded))
+
+        self.nodes_expanded = sum(expanded for _, expanded in rows)
+        if not paths:
+            return np.vstack([row for row, _ in rows]) if rows else np.empty((0, len(targets)))
+        costs = np.vstack([row[0] for row, _ in rows]) if rows else np.empty((0, len(targets)))
+        return costs, [row[1] for row, _ in rows]
+
+_worker_planner: Optional[DistanceMatrixPlanner] = None
+
+def _init_worker(env, queue, fold_time, allow_wait):
+    global _worker_planner
+    _worker_planner = DistanceMatrixPlanner(env, queue, fold_time, allow_wait)
+
+def _one_to_many_worker(task):
+    source, targets, start_time, paths = task
+    row = _worker_planner.one_to_many(source, targets, start_time, paths)
+    return row, _worker_planner.nodes_expanded
@@ -0,0 +1,193 @@
+"""
+Priority-queue backends for the cost-based planners
+"""
+
+import heapq
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Dict, Tuple, Union
+
+class PriorityQueue(ABC):
+    """Min-queue of search entries.
+
+    An entry is a tuple whose first elements are the priority and whose last
+    element is the search slot it refers to. Backends count pushes, pops and
+    stale pops; the search kernel reports the stale ones it skips.
+    """
+
+    name = 'base'
+
+    def __init__(self):
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+
+    @abstractmethod
+    def push(self, entry: Tuple):
+        pass
+
+    @abstractmethod
+    def pop(self) -> Tuple:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return {'backend': self.name, 'pushes': self.pushes, 'pops': self.pops,
+                'stale_pops': self.stale_pops}
+
+class BinaryHeapQueue(PriorityQueue):
+    """heapq with lazy deletion: an improved entry is pushed again and the
+    outdated one is skipped when it reaches the top."""
+
+    name = 'heap'
+
+    def __init__(self):
+        super().__init__()
+        self.heap = []
+
+    def push(self, entry: Tuple):
+        self.pushes += 1
+        heapq.heappush(self.heap, entry)
+
+    def pop(self) -> Tuple:
+        self.pops += 1
+        return heapq.heappop(self.heap)
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+class IndexedDaryHeap(PriorityQueue):
+    """d-ary heap holding at most one entry per slot, with decrease-key.
+
+    Pushing an entry for a slot that is already queued replaces it when the
+    new entry is smaller and is ignored otherwise, so no stale entries exist.
+    """
+
+    name = 'dary'
+
+    def __init__(self, arity: int = 4):
+        super().__init__()
+        self.arity = arity
+        self.heap = []
+        self.position = {}
+
+    def push(self, entry: Tuple):
+        self.pushes += 1
+        slot = entry[-1]
+        index = self.position.get(slot)
+        if index is None:
+            self.heap.append(entry)
+            self._sift_up(len(self.heap) - 1)
+        elif entry < self.heap[index]:
+            self.heap[index] = entry
+            self._sift_up(index)
+
+    def pop(self) -> Tuple:
+        self.pops += 1
+        heap = self.heap
+        top = heap[0]
+        del self.position[top[-1]]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self.position[last[-1]] = 0
+            self._sift_down(0)
+        return top
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def _sift_up(self, index: int):
+        heap, position, arity = self.heap, self.position, self.arity
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) // arity
+            if not entry < heap[parent]:
+                break
+            heap[index] = heap[parent]
+            position[heap[index][-1]] = index
+            index = parent
+        heap[index] = entry
+        position[entry[-1]] = index
+
+    def _sift_down(self, index: int):
+        heap, position, arity = self.heap, self.position, self.arity
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            first = index * arity + 1
+            if first >= size:
+                break
+            smallest = min(range(first, min(first + arity, size)), key=heap.__getitem__)
+            if not heap[smallest] < entry:
+                break
+            heap[index] = heap[smallest]
+            position[heap[index][-1]] = index
+            index = smallest
+        heap[index] = entry
+        position[entry[-1]] = index
+
+class BucketQueue(PriorityQueue):
+    """Dial's bucket queue for integer priorities.
+
+    Entries are grouped by their first priority element and popped first in,
+    first out within a bucket. Terrain costs are small integers, so the cursor
+    only moves a few buckets at a time. Ties inside a bucket are not ordered
+    by the remaining priority elements, so equal-cost alternatives may be
+    explored in a different order than with the heap backends.
+    """
+
+    name = 'bucket'
+
+    def __init__(self):
+        super().__init__()
+        self.buckets: Dict[int, deque] = {}
+        self.cursor = 0
+        self.size = 0
+
+    def push(self, entry: Tuple):
+        priority = entry[0]
+        if priority != int(priority):
+            raise ValueError(f"BucketQueue needs integer priorities, got {priority!r}")
+        priority = int(priority)
+        self.pushes += 1
+        bucket = self.buckets.get(priority)
+        if bucket is None:
+            bucket = self.buckets[priority] = deque()
+        bucket.append(entry)
+        if self.size == 0 or priority < self.cursor:
+            self.cursor = priority
+        self.size += 1
+
+    def pop(self) -> Tuple:
+        if self.size == 0:
+            raise IndexError("pop from an empty BucketQueue")
+        self.pops += 1
+        while self.cursor not in self.buckets:
+            self.cursor += 1
+        bucket = self.buckets[self.cursor]
+        entry = bucket.popleft()
+        if not bucket:
+            del self.buckets[self.cursor]
+        self.size -= 1
+        return entry
+
+    def __len__(self) -> int:
+        return self.size
+
+QUEUE_BACKENDS: Dict[str, Callable[[], PriorityQueue]] = {
+    'heap': BinaryHeapQueue,
+    'dary': IndexedDaryHeap,
+    'bucket': BucketQueue,
+}
+
+def make_queue(queue: Union[str, Callable[[], PriorityQueue]] = 'heap') -> PriorityQueue:
+    """Build a queue from a backend name or a zero-argument factory."""
+    if callable(queue):
+        return queue()
+    if queue not in QUEUE_BACKENDS:
+        raise ValueError(f"Unknown queue backend {queue!r}, expected one of {sorted(QUEUE_BACKENDS)}")
+    return QUEUE_BACKENDS[queue]()
@@ -0,0 +1,363 @@
+"""
+Parent-pointer search kernel shared by the BFS, Uniform Cost and A* planners
+"""
+
+from array import array
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+from agent import Planner
+from cost_engine import BLOCKED
+from planners.queues import PriorityQueue, make_queue
+
+class SearchKernel:
+    """Best-first search over (x, y, time_step) states.
+
+    When the planner folds time, child time steps go through
+    CompiledCostEngine.fold_time, so states that only differ by a whole
+    obstacle period are detected as duplicates and the search terminates
+    even when the goal is unreachable.
+
+    Every discovered state gets a slot in flat arrays holding its encoded
+    key, parent slot and g-cost. Queue entries carry only a slot, and the
+    path is rebuilt from the parent pointers once a goal is popped.
+
+    The list-carrying planners broke ties between equal-cost paths into a
+    state by comparing the paths lexicographically. Ties only decide which
+    path is returned, never the expansion order, so the kernel records the
+    extra equal-cost parents and picks the lexicographically smallest path
+    when rebuilding it. Expansion counts and returned paths are unchanged.
+
+    Planners that keep the default get_neighbors are expanded straight from
+    the engine's NeighborTable: terrain costs come from the table and only
+    cells flagged as time-dependent are looked up at the time of the move.
+    Instrumented planners and planners with their own get_neighbors go
+    through get_neighbors.
+
+    With planner.reservations set, moves into cells reserved by other
+    agents, and swaps with them, are skipped.
+
+    States are keyed by their flat index, so an off-grid start or target
+    would alias an on-grid cell; such searches find nothing.
+    """
+
+    def __init__(self, planner, heuristic: Optional[Callable[[Tuple[int, int]], int]] = None,
+                 fifo: bool = False, queue='heap'):
+        self.planner = planner
+        self.env = planner.env
+        self.heuristic = heuristic
+        self.fifo = fifo
+        self.queue: Optional[PriorityQueue] = None if fifo else make_queue(queue)
+        self.cells_per_layer = self.env.width * self.env.height
+        engine = self.env.compile()
+        self.fold = engine.fold_time if planner.fold_time else (lambda time_step: time_step)
+        self.reservations = planner.reservations
+        if self.reservations is not None and planner.fold_time:
+            # Reservations end at their horizon; only later time steps fold
+            horizon = max(self.reservations.horizon, engine.last_change)
+            period = engine.period
+            self.fold = lambda time_step: (time_step if time_step <= horizon
+                                           else horizon + 1 + (time_step - horizon - 1) % period)
+        self.table = None
+        if type(planner).get_neighbors is Planner.get_neighbors and 'get_neighbors' not in planner.__dict__:
+            self.table = engine.neighbor_table()
+
+        self.slot_of = {}
+        self.keys = array('q')
+        self.parent = array('q')
+        self.g = array('q')
+        self.closed = bytearray()
+        self.tied = {}
+
+    def _new_slot(self, key: int, parent: int, g_cost: int) -> int:
+        slot = len(self.keys)
+        self.slot_of[key] = slot
+        self.keys.append(key)
+        self.parent.append(parent)
+        self.g.append(g_cost)
+        self.closed.append(0)
+        return slot
+
+    def state(self, slot: int) -> Tuple[int, int, int]:
+        time_step, cell = divmod(self.keys[slot], self.cells_per_layer)
+        y, x = divmod(cell, self.env.width)
+        return x, y, time_step
+
+    def path(self, slot: int) -> List[Tuple[int, int]]:
+        if self.tied:
+            return self._smallest_path(slot)
+        path = []
+        while slot >= 0:
+            x, y, _ = self.state(slot)
+            path.append((x, y))
+            slot = self.parent[slot]
+        path.reverse()
+        return path
+
+    def _smallest_path(self, slot: int) -> List[Tuple[int, int]]:
+        """Lexicographically smallest path to slot over all equal-cost parents."""
+        children = {}
+        seen = {slot}
+        stack = [slot]
+        while stack:
+            child = stack.pop()
+            for parent in (self.parent[child],) + tuple(self.tied.get(child, ())):
+                if parent < 0:
+                    continue
+                children.setdefault(parent, []).append(child)
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+
+        # Every ancestor chain ends at the start slot; walking forward and
+        # taking the smallest next cell yields the smallest complete path.
+        current = 0
+        path = [self.state(current)[:2]]
+        while current != slot:
+            current = min(children[current], key=lambda child: self.state(child)[:2])
+            path.append(self.state(current)[:2])
+        return path
+
+    def on_grid(self, cell: Tuple[int, int]) -> bool:
+        return 0 <= cell[0] < self.env.width and 0 <= cell[1] < self.env.height
+
+    def run(self, start: Tuple[int, int], goal: Tuple[int, int], start_time: int = 0) -> Optional[int]:
+        """Search until a state on the goal cell is popped and return its slot."""
+        if not (self.on_grid(start) and self.on_grid(goal)):
+            slot = None
+        elif self.fifo:
+            run_fifo = self._run_fifo if self.table is None else self._run_fifo_table
+            slot = run_fifo(start, goal, start_time)
+        else:
+            run = self._run_best_first if self.table is None else self._run_best_first_table
+            slot = run(start, {goal}, start_time).get(goal)
+        self._report()
+        return slot
+
+    def run_many(self, start: Tuple[int, int], targets, start_time: int = 0) -> Dict[Tuple[int, int], int]:
+        """Search until every target cell is settled and map each reached one to its slot."""
+        run = self._run_best_first if self.table is None else self._run_best_first_table
+        targets = {tuple(target) for target in targets if self.on_grid(target)}
+        found = run(start, targets, start_time) if self.on_grid(start) else {}
+        self._report()
+        return found
+
+    def _report(self):
+        # The search loops keep no counters of their own; the totals are
+        # read off the slot arrays and the queue once the search is over.
+        instrumentation = self.planner.instrumentation
+        if instrumentation.enabled:
+            instrumentation.update({'states': len(self.keys), 'tied_states': len(self.tied)})
+            if self.queue is not None:
+                instrumentation.update(self.queue.stats())
+
+    def _run_fifo(self, start, goal, start_time):
+        planner = self.planner
+        layer, width = self.cells_per_layer, self.env.width
+        slot_of, keys = self.slot_of, self.keys
+        get_neighbors, fold = planner.get_neighbors, self.fold
+        reserved = self.reservations.blocks if self.reservations is not None else None
+
+        start_time = fold(start_time)
+        queue = deque([self._new_slot(start_time * layer + start[1] * width + start[0], -1, 0)])
+        while queue:
+            slot = queue.popleft()
+            time_step, cell = divmod(keys[slot], layer)
+            y, x = divmod(cell, width)
+
+            if (x, y) == goal and (reserved is None or self.reservations.can_stay(cell, time_step)):
+                return slot
+            planner.nodes_expanded += 1
+
+            next_time = fold(time_step + 1)
+            base = next_time * layer
+            for nx, ny, cost in get_neighbors(x, y, time_step):
+                if reserved is not None and reserved(cell, ny * width + nx, next_time):
+                    continue
+                key = base + ny * width + nx
+                if key not in slot_of:
+                    queue.append(self._new_slot(key, slot, 0))
+        return None
+
+    def _run_best_first(self, start, targets, start_time):
+        planner = self.planner
+        heuristic = self.heuristic
+        layer, width = self.cells_per_layer, self.env.width
+        slot_of, keys, g, closed, parent, tied = (self.slot_of, self.keys, self.g,
+                                                  self.closed, self.parent, self.tied)
+        get_neighbors, fold = planner.get_neighbors, self.fold
+        reserved = self.reservations.blocks if self.reservations is not None else None
+
+        # Entries mirror the tuples the planners used to push, (f,) g, x, y,
+        # time, with the slot standing in for the path list.
+        queue = self.queue
+        push, pop = queue.push, queue.pop
+        start_time = fold(start_time)
+        slot = self._new_slot(start_time * layer + start[1] * width + start[0], -1, 0)
+        if heuristic is None:
+            push((0, start[0], start[1], start_time, slot))
+        else:
+            push((heuristic(start), 0, start[0], start[1], start_time, slot))
+
+        # Targets are settled when first popped; the search only goes on
+        # through them while other targets remain.
+        found = {}
+        while queue:
+            entry = pop()
+            g_cost, x, y, time_step, slot = entry[-5:]
+
+            if (x, y) in targets and (reserved is None or self.reservations.can_stay(y * width + x, time_step)):
+                found[(x, y)] = slot
+                targets.discard((x, y))
+                if not targets:
+                    return found
+            if closed[slot] or g_cost > g[slot]:
+                queue.stale_pops += 1
+                continue
+            closed[slot] = 1
+            planner.nodes_expanded += 1
+
+            next_time = fold(time_step + 1)
+            base = next_time * layer
+            for nx, ny, cost in get_neighbors(x, y, time_step):
+                if reserved is not None and reserved(y * width + x, ny * width + nx, next_time):
+                    continue
+                new_g = g_cost + cost
+                key = base + ny * width + nx
+                child = slot_of.get(key)
+                if child is None:
+                    child = self._new_slot(key, slot, new_g)
+                elif new_g < g[child]:
+                    g[child] = new_g
+                    parent[child] = slot
+                    closed[child] = 0
+                    tied.pop(child, None)
+                else:
+                    if new_g == g[child] and not closed[child]:
+                        tied.setdefault(child, []).append(slot)
+                    continue
+                if heuristic is None:
+                    push((new_g, nx, ny, next_time, child))
+                else:
+                    push((new_g + heuristic((nx, ny)), new_g, nx, ny, next_time, child))
+        return found
+
+    def _run_fifo_table(self, start, goal, start_time):
+        planner = self.planner
+        layer, width = self.cells_per_layer, self.env.width
+        slot_of, keys = self.slot_of, self.keys
+        indptr, indices, costs, dynamic = self.table.scalar_view()
+        get_cost, fold, allow_wait = self.env.compile().get_cost, self.fold, planner.allow_wait
+        reserved = self.reservations.blocks if self.reservations is not None else None
+
+        start_time = fold(start_time)
+        queue = deque([self._new_slot(start_time * layer + start[1] * width + start[0], -1, 0)])
+        while queue:
+            slot = queue.popleft()
+            time_step, cell = divmod(keys[slot], layer)
+            y, x = divmod(cell, width)
+
+            if (x, y) == goal and (reserved is None or self.reservations.can_stay(cell, time_step)):
+                return slot
+            planner.nodes_expanded += 1
+
+            next_time = fold(time_step + 1)
+            base = next_time * layer
+            for edge in range(indptr[cell], indptr[cell + 1]):
+                neighbor = indices[edge]
+                if dynamic[neighbor] and get_cost(neighbor % width, neighbor // width, time_step) >= BLOCKED:
+                    continue
+                if reserved is not None and reserved(cell, neighbor, next_time):
+                    continue
+                key = base + neighbor
+                if key not in slot_of:
+                    queue.append(self._new_slot(key, slot, 0))
+            if (allow_wait and get_cost(x, y, time_step) < BLOCKED
+                    and (reserved is None or not reserved(cell, cell, next_time))):
+                key = base + cell
+                if key not in slot_of:
+                    queue.append(self._new_slot(key, slot, 0))
+        return None
+
+    def _run_best_first_table(self, start, targets, start_time):
+        """_run_best_first expanding cells from the NeighborTable."""
+        planner = self.planner
+        heuristic = self.heuristic
+        layer, width = self.cells_per_layer, self.env.width
+        slot_of, keys, g, closed, parent, tied = (self.slot_of, self.keys, self.g,
+                                                  self.closed, self.parent, self.tied)
+        indptr, indices, costs, dynamic = self.table.scalar_view()
+        get_cost, fold, allow_wait = self.env.compile().get_cost, self.fold, planner.allow_wait
+        add_key, add_parent, add_g, add_closed = keys.append, parent.append, g.append, closed.append
+        reserved = self.reservations.blocks if self.reservations is not None else None
+
+        queue = self.queue
+        push, pop = queue.push, queue.pop
+        start_time = fold(start_time)
+        slot = self._new_slot(start_time * layer + start[1] * width + start[0], -1, 0)
+        if heuristic is None:
+            push((0, start[0], start[1], start_time, slot))
+        else:
+            push((heuristic(start), 0, start[0], start[1], start_time, slot))
+
+        found = {}
+        while queue:
+            entry = pop()
+            g_cost, x, y, time_step, slot = entry[-5:]
+
+            if (x, y) in targets and (reserved is None or self.reservations.can_stay(y * width + x, time_step)):
+                found[(x, y)] = slot
+                targets.discard((x, y))
+                if not targets:
+                    return found
+            if closed[slot] or g_cost > g[slot]:
+                queue.stale_pops += 1
+                continue
+            closed[slot] = 1
+            planner.nodes_expanded += 1
+
+            next_time = fold(time_step + 1)
+            base = next_time * layer
+            cell = y * width + x
+            last = indptr[cell + 1]
+            edge = indptr[cell]
+            # The wait move, when allowed, comes after the moves, as in get_neighbors
+            while edge <= last:
+                if edge < last:
+                    neighbor = indices[edge]
+                    ny, nx = divmod(neighbor, width)
+                    cost = get_cost(nx, ny, time_step) if dynamic[neighbor] else costs[edge]
+                else:
+                    if not allow_wait:
+                        break
+                    neighbor, nx, ny = cell, x, y
+                    cost = get_cost(x, y, time_step)
+                edge += 1
+                if cost >= BLOCKED:
+                    continue
+                if reserved is not None and reserved(cell, neighbor, next_time):
+                    continue
+
+                new_g = g_cost + cost
+                key = base + neighbor
+                child = slot_of.get(key)
+                if child is None:
+                    # _new_slot, inlined
+                    child = slot_of[key] = len(keys)
+                    add_key(key)
+                    add_parent(slot)
+                    add_g(new_g)
+                    add_closed(0)
+                elif new_g < g[child]:
+                    g[child] = new_g
+                    parent[child] = slot
+                    closed[child] = 0
+                    tied.pop(child, None)
+                else:
+                    if new_g == g[child] and not closed[child]:
+                        tied.setdefault(child, []).append(slot)
+                    continue
+                if heuristic is None:
+                    push((new_g, nx, ny, next_time, child))
+                else:
+                    push((new_g + heuristic((nx, ny)), new_g, nx, ny, next_time, child))
+        return found
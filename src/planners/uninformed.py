@@ -1,55 +1,41 @@
-from collections import deque, defaultdict
-import heapq
-from typing import List, Tuple, Dict
+from typing import List, Tuple
 from agent import Planner
+from planners.search import SearchKernel
+from planners.bidirectional import BidirectionalDijkstraPlanner
 
 class BFSPlanner(Planner):
     def plan(self, start: Tuple[int, int], goal: Tuple[int, int], 
              start_time: int = 0, recalculate_heuristic: bool = True) -> List[Tuple[int, int]]:
         self.nodes_expanded = 0
-        queue = deque([(start[0], start[1], start_time, [start])])
-        visited = set()
-        
-        while queue:
-            x, y, time_step, path = queue.popleft()
-            
-            if (x, y) == goal:
-                return path
-                
-            if (x, y, time_step) in visited:
-                continue
-            visited.add((x, y, time_step))
-            self.nodes_expanded += 1
-            
-            for nx, ny, cost in self.get_neighbors(x, y, time_step):
-                if (nx, ny, time_step + 1) not in visited:
-                    new_path = path + [(nx, ny)]
-                    queue.append((nx, ny, time_step + 1, new_path))
-                    
-        return []
+        kernel = SearchKernel(self, fifo=True)
+        with self.instrumentation.phase('search'):
+            slot = kernel.run(start, goal, start_time)
+        with self.instrumentation.phase('reconstruct'):
+            return kernel.path(slot) if slot is not None else []
 
 class UniformCostPlanner(Planner):
+    def __init__(self, env, queue='heap', fold_time: bool = True, allow_wait: bool = False,
+                 bidirectional: bool = True):
+        super().__init__(env, fold_time, allow_wait)
+        self.queue = queue
+        self.queue_stats = {}
+        # Queries whose costs cannot change over time go to BidirectionalDijkstraPlanner
+        self.bidirectional = bidirectional
+        
     def plan(self, start: Tuple[int, int], goal: Tuple[int, int], 
              start_time: int = 0, recalculate_heuristic: bool = True) -> List[Tuple[int, int]]:
         self.nodes_expanded = 0
-        queue = [(0, start[0], start[1], start_time, [start])]
-        visited = defaultdict(lambda: float('inf'))
-        
-        while queue:
-            total_cost, x, y, time_step, path = heapq.heappop(queue)
-            
-            if (x, y) == goal:
-                return path
-                
-            if total_cost >= visited[(x, y, time_step)]:
-                continue
-            visited[(x, y, time_step)] = total_cost
-            self.nodes_expanded += 1
-            
-            for nx, ny, cost in self.get_neighbors(x, y, time_step):
-                new_cost = total_cost + cost
-                if new_cost < visited[(nx, ny, time_step + 1)]:
-                    new_path = path + [(nx, ny)]
-                    heapq.heappush(queue, (new_cost, nx, ny, time_step + 1, new_path))
-                    
-        return []
\ No newline at end of file
+        if (self.bidirectional and self.reservations is None
+                and self.env.compile().is_static_from(start_time)):
+            static = BidirectionalDijkstraPlanner(self.env)
+            static.instrumentation = self.instrumentation
+            path = static.plan(start, goal, start_time)
+            self.nodes_expanded = static.nodes_expanded
+            self.queue_stats = {}
+            return path
+        kernel = SearchKernel(self, queue=self.queue)
+        with self.instrumentation.phase('search'):
+            slot = kernel.run(start, goal, start_time)
+        self.queue_stats = kernel.queue.stats()
+        with self.instrumentation.phase('reconstruct'):
+            return kernel.path(slot) if slot is not None else []
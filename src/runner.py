@@ -0,0 +1,179 @@
+"""
+Parallel experiment runner for sweeps over maps and planners
+"""
+
+import multiprocessing
+import os
+import random
+import signal
+import threading
+import time
+import tracemalloc
+import _thread
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from environment import load_map_from_file
+from agent import calculate_path_cost, is_valid_path
+
+@dataclass
+class ExperimentTask:
+    map_file: str
+    algorithm: str
+    planner_class: Callable
+    start: Tuple[int, int]
+    goal: Optional[Tuple[int, int]] = None  # None plans to the opposite corner
+    start_time: int = 0
+    repeat: int = 1  # timed runs; every run's time is reported in planning_times
+    measure_memory: bool = False  # one extra untimed run under tracemalloc
+    seed: Optional[int] = None  # seeds the random module before each run
+    instrument: bool = False  # report the planner's counters and phase times
+
+class TaskTimeout(Exception):
+    pass
+
+# Per-worker state, set up once by _init_worker
+_maps: Dict[str, Any] = {}
+_loader: Callable = load_map_from_file
+_timeout: Optional[float] = None
+
+def _init_worker(loader: Callable, timeout: Optional[float], memory_limit_mb: Optional[int]):
+    global _loader, _timeout
+    _loader = loader
+    _timeout = timeout
+    # Let the parent handle Ctrl-C and tear the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if memory_limit_mb and resource is not None:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _raise_timeout(signum, frame):
+    raise TaskTimeout()
+
+class _Deadline:
+    """Interrupt the worker's main thread once the task runs out of time."""
+
+    def __init__(self, seconds: Optional[float]):
+        self.seconds = seconds
+        self.timer = None
+
+    def __enter__(self):
+        if not self.seconds:
+            return self
+        if hasattr(signal, 'setitimer'):
+            signal.signal(signal.SIGALRM, _raise_timeout)
+            signal.setitimer(signal.ITIMER_REAL, self.seconds)
+        else:
+            self.timer = threading.Timer(self.seconds, _thread.interrupt_main)
+            self.timer.start()
+        return self
+
+    def __exit__(self, *exc):
+        if not self.seconds:
+            return False
+        if self.timer is not None:
+            self.timer.cancel()
+        else:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        return False
+
+def _load(map_file: str):
+    env = _maps.get(map_file)
+    if env is None:
+        env = _loader(map_file)
+        _maps[map_file] = env
+    return env
+
+def run_task(task: ExperimentTask) -> Dict[str, Any]:
+    """Run one (map, algorithm) experiment; never raises."""
+    result: Dict[str, Any] = {
+        'map': task.map_file,
+        'algorithm': task.algorithm,
+        'start': tuple(task.start),
+        'goal': tuple(task.goal) if task.goal is not None else None,
+        'status': 'ok',
+        'path': [],
+        'path_cost': float('inf'),
+        'valid': False,
+        'nodes_expanded': 0,
+        'planning_time': 0.0,
+        'planning_times': [],
+        'worker': os.getpid(),
+    }
+    planner = None
+    started = time.time()
+    try:
+        env = _load(task.map_file)
+        result['width'], result['height'] = env.width, env.height
+        goal = task.goal if task.goal is not None else (env.width - 1, env.height - 1)
+        result['goal'] = tuple(goal)
+        with _Deadline(_timeout):
+            for _ in range(max(task.repeat, 1)):
+                # A fresh planner per run, so incremental planners start cold each time
+                planner = task.planner_class(env)
+                if task.instrument:
+                    planner.instrument()
+                if task.seed is not None:
+                    random.seed(task.seed)
+                started = time.time()
+                path = planner.plan(task.start, goal, task.start_time)
+                result['planning_times'].append(time.time() - started)
+            if task.measure_memory:
+                if task.seed is not None:
+                    random.seed(task.seed)
+                tracemalloc.start()
+                try:
+                    task.planner_class(env).plan(task.start, goal, task.start_time)
+                    result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+        result['planning_time'] = result['planning_times'][0]
+        if task.instrument:
+            result['instrumentation'] = planner.last_instrumentation
+        result['path'] = [(int(x), int(y)) for x, y in path] if path else []
+        if path:
+            result['path_cost'] = int(calculate_path_cost(env, path, task.start_time))
+            result['valid'] = is_valid_path(env, path, task.start, goal, task.start_time)
+    except (TaskTimeout, KeyboardInterrupt):
+        result['status'] = 'timeout'
+        result['planning_time'] = time.time() - started
+    except MemoryError:
+        result['status'] = 'memory'
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = f"{type(e).__name__}: {e}"
+    if planner is not None:
+        result['nodes_expanded'] = int(planner.nodes_expanded)
+    return result
+
+class ParallelExperimentRunner:
+    """Run experiments on a process pool and stream results as they finish.
+
+    Each worker loads a map the first time one of its tasks needs it and
+    keeps it for later tasks. Tasks that exceed the per-task timeout or the
+    per-worker memory cap come back with status 'timeout' or 'memory', so
+    a planner that never terminates cannot stall the sweep.
+    """
+
+    def __init__(self, workers: Optional[int] = None, timeout: Optional[float] = None,
+                 memory_limit_mb: Optional[int] = None, loader: Callable = load_map_from_file):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.loader = loader
+
+    def run(self, tasks: Iterable[ExperimentTask]) -> Iterator[Dict[str, Any]]:
+        tasks = list(tasks)
+        if not tasks:
+            return
+        # Sorting by map keeps a worker's consecutive tasks on the map it has loaded
+        tasks.sort(key=lambda task: task.map_file)
+        with multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                  initargs=(self.loader, self.timeout, self.memory_limit_mb)) as pool:
+            for result in pool.imap_unordered(run_task, tasks):
+                yield result
@@ -0,0 +1,188 @@
+"""
+Long-running planning service answering JSON queries over a local socket
+
+Queries and replies are JSON objects, one per line, over a Unix socket
+(--socket) or a localhost TCP port (--port). A query carries the cli
+options: map, start, goal, planner and optionally time, deadline,
+max_expansions, seed, workers and stats; an id is echoed back. The reply
+is the cli result, or {"error": ...}. {"op": "stats"} returns the cache
+and service counters.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.cli import PLANNER_TYPES, NumpyEncoder, build_planner, check_positions, parse_position, run_query
+from src.map_cache import MapCache
+
+OPTIONS = ('deadline', 'max_expansions', 'seed', 'workers')
+
+class PlanningService:
+    """Answers planning queries from maps and planners kept in memory.
+
+    Searches run in a thread pool so the event loop keeps serving other
+    connections. Identical queries arriving while one is being searched
+    share its result instead of searching again.
+
+    The searches are pure Python and hold the GIL, so the threads keep
+    the service responsive and overlap map loading and I/O but do not
+    search in parallel; run one service process per core for throughput.
+    Threads planning on one map share its compiled engine, whose lazy
+    tables are built under cost_engine.BUILD_LOCK.
+    """
+
+    def __init__(self, cache: Optional[MapCache] = None, workers: Optional[int] = None):
+        self.cache = cache if cache is not None else MapCache()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {'queries': 0, 'searches': 0, 'coalesced': 0, 'errors': 0}
+
+    @staticmethod
+    def _normalize(query: dict) -> dict:
+        planner = query['planner']
+        if planner not in PLANNER_TYPES:
+            raise ValueError(f"unknown planner {planner!r}")
+        normalized = {'map': os.path.realpath(query['map']), 'planner': planner,
+                      'start': parse_position(query['start']), 'goal': parse_position(query['goal']),
+                      'time': int(query.get('time', 0)), 'stats': bool(query.get('stats', False))}
+        normalized.update({name: query[name] for name in OPTIONS if query.get(name) is not None})
+        return normalized
+
+    def _solve(self, query: dict) -> dict:
+        options = {name: query[name] for name in OPTIONS if name in query}
+        factory = lambda env: build_planner(env, query['planner'], **options)
+        if query['stats']:
+            # Instrumented planners are not pooled
+            env = self.cache.get(query['map'])
+            check_positions(env, query['start'], query['goal'])
+            planner = factory(env)
+            planner.instrument()
+            return run_query(env, planner, query['planner'], query['start'], query['goal'],
+                             query['time'], True)
+        key = (query['planner'], tuple(sorted(options.items())))
+        with self.cache.checkout(query['map'], key, factory) as (env, planner):
+            check_positions(env, query['start'], query['goal'])
+            return run_query(env, planner, query['planner'], query['start'], query['goal'], query['time'])
+
+    async def handle(self, query: dict) -> dict:
+        """Reply to one decoded query."""
+        if query.get('op') == 'stats':
+            return {'service': dict(self.stats), 'cache': dict(self.cache.stats), 'maps': len(self.cache)}
+        self.stats['queries'] += 1
+        try:
+            query = self._normalize(query)
+        except (KeyError, TypeError, ValueError) as e:
+            self.stats['errors'] += 1
+            return {'error': f"bad query: {e}"}
+
+        key = json.dumps(query, sort_keys=True)
+        future = self.inflight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+        else:
+            self.stats['searches'] += 1
+            future = asyncio.get_running_loop().run_in_executor(self.executor, self._solve, query)
+            self.inflight[key] = future
+            future.add_done_callback(lambda done: self.inflight.pop(key, None))
+        try:
+            return await asyncio.shield(future)
+        except Exception as e:  # reported to the client, the service keeps running
+            self.stats['errors'] += 1
+            return {'error': f"{type(e).__name__}: {e}"}
+
+    async def _reply(self, line: bytes, writer: asyncio.StreamWriter):
+        try:
+            query = json.loads(line)
+            if not isinstance(query, dict):
+                raise ValueError('query must be a JSON object')
+        except ValueError as e:
+            self.stats['errors'] += 1
+            query, result = {}, {'error': f"bad query: {e}"}
+        else:
+            result = await self.handle(query)
+        if 'id' in query:
+            result = dict(result, id=query['id'])
+        writer.write(json.dumps(result, cls=NumpyEncoder).encode() + b'\n')
+        await writer.drain()
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Queries on one connection run concurrently; replies carry their id
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(self._reply(line, writer))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path: Optional[str] = None, host: str = '127.0.0.1', port: int = 0):
+        """Serve until cancelled, on socket_path if given, else on host:port."""
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            server = await asyncio.start_unix_server(self._connection, path=socket_path)
+        else:
+            server = await asyncio.start_server(self._connection, host, port)
+        address = socket_path or '%s:%d' % server.sockets[0].getsockname()[:2]
+        print(f"Planning service listening on {address}", file=sys.stderr, flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=False)
+            if socket_path and os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+def send_queries(address: str, queries: Iterable[dict]) -> List[dict]:
+    """Send queries to a running service and return its replies in query order.
+
+    address is a Unix socket path or host:port.
+    """
+    queries = [dict(query, id=index) for index, query in enumerate(queries)]
+    if os.path.exists(address):
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(address)
+    else:
+        host, port = address.rsplit(':', 1)
+        client = socket.create_connection((host, int(port)))
+    with client, client.makefile('rwb') as stream:
+        for query in queries:
+            stream.write(json.dumps(query).encode() + b'\n')
+        stream.flush()
+        replies = [json.loads(stream.readline()) for _ in queries]
+    return sorted(replies, key=lambda reply: reply['id'])
+
+def main():
+    parser = argparse.ArgumentParser(description='Autonomous Delivery Agent planning service')
+    parser.add_argument('--socket', type=str, help='Listen on this Unix socket')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='TCP host when no socket is given')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port when no socket is given')
+    parser.add_argument('--workers', type=int,
+                        help='Search threads (default: executor default); they share one core through the GIL')
+    parser.add_argument('--max-maps', type=int, default=16, help='Maps kept loaded')
+    args = parser.parse_args()
+
+    service = PlanningService(MapCache(args.max_maps), args.workers)
+    try:
+        asyncio.run(service.serve(args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Tiled out-of-core terrain for maps larger than memory
+"""
+
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+try:
+    from environment import GridEnvironment
+    from map_format import read_binary_map
+except ImportError:  # imported as src.tiled
+    from .environment import GridEnvironment
+    from .map_format import read_binary_map
+
+class TiledTerrain:
+    """Terrain array read from disk in square tiles through an LRU cache.
+
+    It supports the parts of the ndarray interface GridEnvironment and the
+    cost engine use: shape, dtype, item(y, x), scalar and fancy indexing,
+    and scalar assignment. Tiles are read from the terrain block of a
+    binary map only when a cell in them is needed, and the least recently
+    used clean tiles are evicted once the cache exceeds its byte budget.
+    Tiles changed by assignment stay resident so edits are never lost; the
+    map file itself is never written.
+    """
+
+    def __init__(self, filename: str, offset: int, shape: Tuple[int, int], dtype='<i4',
+                 tile_size: int = 256, cache_bytes: int = 64 * 1024 * 1024):
+        self.filename = filename
+        self.offset = offset
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.tile_size = tile_size
+        self.cache_bytes = cache_bytes
+        self._source = None
+        self._reset_cache()
+
+    def _reset_cache(self):
+        self.tiles: 'OrderedDict[Tuple[int, int], np.ndarray]' = OrderedDict()
+        self.dirty = set()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._last_key = None
+        self._last_tile = None
+
+    def __getstate__(self):
+        # Workers reopen the file; only the edited tiles travel with the copy
+        state = self.__dict__.copy()
+        state['_source'] = None
+        state['tiles'] = OrderedDict((key, tile) for key, tile in self.tiles.items() if key in self.dirty)
+        state['dirty'] = set(self.dirty)
+        state['resident_bytes'] = sum(tile.nbytes for tile in state['tiles'].values())
+        state['_last_key'] = state['_last_tile'] = None
+        return state
+
+    def _tile(self, key: Tuple[int, int]) -> np.ndarray:
+        if key == self._last_key:
+            self.hits += 1
+            return self._last_tile
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.hits += 1
+            self.tiles.move_to_end(key)
+        else:
+            self.misses += 1
+            tile = self._read(key)
+            self.tiles[key] = tile
+            self.resident_bytes += tile.nbytes
+            self._evict(key)
+        self._last_key, self._last_tile = key, tile
+        return tile
+
+    def _read(self, key: Tuple[int, int]) -> np.ndarray:
+        if self._source is None:
+            self._source = np.memmap(self.filename, dtype=self.dtype, mode='r',
+                                     offset=self.offset, shape=self.shape)
+        ty, tx = key
+        size = self.tile_size
+        return np.array(self._source[ty * size:(ty + 1) * size, tx * size:(tx + 1) * size])
+
+    def _evict(self, keep: Tuple[int, int]):
+        # keep is the tile just read: evicting it when every older tile is
+        # dirty would leave the caller writing into a dropped copy
+        if self.resident_bytes <= self.cache_bytes:
+            return
+        for key in list(self.tiles):
+            if self.resident_bytes <= self.cache_bytes or len(self.tiles) <= 1:
+                break
+            if key in self.dirty or key == keep:
+                continue
+            self.resident_bytes -= self.tiles.pop(key).nbytes
+            self.evictions += 1
+            if key == self._last_key:
+                self._last_key = self._last_tile = None
+
+    def item(self, y: int, x: int) -> int:
+        height, width = self.shape
+        if y < 0:
+            y += height
+        if x < 0:
+            x += width
+        if not (0 <= y < height and 0 <= x < width):
+            raise IndexError(f"index ({y}, {x}) is out of bounds for terrain of shape {self.shape}")
+        size = self.tile_size
+        return self._tile((y // size, x // size)).item(y % size, x % size)
+
+    def __getitem__(self, key):
+        ys, xs = key
+        if np.isscalar(ys) and np.isscalar(xs):
+            return self.item(int(ys), int(xs))
+        ys, xs = np.broadcast_arrays(np.asarray(ys, dtype=np.int64), np.asarray(xs, dtype=np.int64))
+        result = np.empty(ys.shape, dtype=self.dtype)
+        size = self.tile_size
+        tile_ys, tile_xs = ys // size, xs // size
+        tile_ids = tile_ys * (self.shape[1] // size + 1) + tile_xs
+        for tile_id in np.unique(tile_ids):
+            mask = tile_ids == tile_id
+            index = np.flatnonzero(mask)[0]
+            tile = self._tile((int(tile_ys.flat[index]), int(tile_xs.flat[index])))
+            result[mask] = tile[ys[mask] % size, xs[mask] % size]
+        return result
+
+    def __setitem__(self, key, value):
+        ys, xs = key
+        size = self.tile_size
+        if np.isscalar(ys) and np.isscalar(xs):
+            y, x = int(ys), int(xs)
+            tile_key = (y // size, x // size)
+            tile = self._tile(tile_key)
+            tile[y % size, x % size] = value
+            self.dirty.add(tile_key)
+            return
+        ys, xs, values = np.broadcast_arrays(np.asarray(ys, dtype=np.int64), np.asarray(xs, dtype=np.int64),
+                                             np.asarray(value))
+        tile_ys, tile_xs = ys // size, xs // size
+        tile_ids = tile_ys * (self.shape[1] // size + 1) + tile_xs
+        for tile_id in np.unique(tile_ids):
+            mask = tile_ids == tile_id
+            index = np.flatnonzero(mask)[0]
+            tile_key = (int(tile_ys.flat[index]), int(tile_xs.flat[index]))
+            tile = self._tile(tile_key)
+            tile[ys[mask] % size, xs[mask] % size] = values[mask]
+            self.dirty.add(tile_key)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'tile_size': self.tile_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'resident_tiles': len(self.tiles),
+            'dirty_tiles': len(self.dirty),
+            'resident_bytes': self.resident_bytes,
+            'cache_bytes': self.cache_bytes,
+        }
+
+class TiledGridEnvironment(GridEnvironment):
+    """GridEnvironment whose terrain stays on disk and is paged in by tile."""
+
+    def __init__(self, filename: str, tile_size: int = 256, cache_bytes: int = 64 * 1024 * 1024):
+        sections = read_binary_map(filename, mmap=True)
+        terrain = sections.terrain
+        tiles = TiledTerrain(filename, terrain.offset, terrain.shape, terrain.dtype,
+                             tile_size, cache_bytes)
+        # Drop the full-map memory map; tiles open their own read-only view
+        del terrain
+        sections.terrain = None
+        super().__init__(sections.width, sections.height, grid=tiles)
+        self.static_obstacles.update(sections.static_obstacles)
+        for positions in sections.moving_obstacles:
+            self.add_moving_obstacle(positions)
+        for time_step, x, y, new_cost in sections.dynamic_changes:
+            self.add_dynamic_change(time_step, x, y, new_cost)
+        self.clear_changes()
+        self.source, self.source_version = filename, self.version
+
+    def tile_stats(self) -> Dict[str, int]:
+        return self.grid.stats()
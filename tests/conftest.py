@@ -0,0 +1,6 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules import each other by bare name from src; the scenario generator lives in benchmarks
+sys.path[:0] = [os.path.join(ROOT, 'src'), os.path.join(ROOT, 'benchmarks')]
@@ -0,0 +1,63 @@
+"""
+Reference answers for the differential tests: plain Dijkstra over
+(cell, time) states using nothing but env.get_cost, on seeded scenarios
+"""
+
+import heapq
+from typing import Iterator, List, Optional, Tuple
+
+from agent import calculate_path_cost, is_valid_path
+from cost_engine import BLOCKED
+from scenarios import ScenarioSpec, generate_environment, generate_queries
+
+MOVES = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+def optimal_cost(env, start, goal, start_time: int = 0, allow_wait: bool = False,
+                 unit: bool = False) -> Optional[int]:
+    """Cheapest cost (fewest moves with unit=True) from start to goal, None if unreachable.
+
+    Time is not folded; the horizon is long enough for every distinct
+    state of the folded search to appear on a path.
+    """
+    engine = env.compile()
+    cells = env.width * env.height
+    horizon = start_time + cells * (max(engine.last_change, 0) + 2 + engine.period)
+    moves = MOVES + [(0, 0)] if allow_wait else MOVES
+    best = {(start, start_time): 0}
+    queue = [(0, start_time, start)]
+    while queue:
+        cost, time_step, cell = heapq.heappop(queue)
+        if cell == goal:
+            return cost
+        if cost > best[(cell, time_step)] or time_step >= horizon:
+            continue
+        x, y = cell
+        for dx, dy in moves:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < env.width and 0 <= ny < env.height):
+                continue
+            step = env.get_cost(nx, ny, time_step)
+            if step >= BLOCKED:
+                continue
+            state = ((nx, ny), time_step + 1)
+            new_cost = cost + (1 if unit else step)
+            if new_cost < best.get(state, float('inf')):
+                best[state] = new_cost
+                heapq.heappush(queue, (new_cost, time_step + 1, (nx, ny)))
+    return None
+
+def path_cost(env, path: List[Tuple[int, int]], start, goal, start_time: int = 0) -> Optional[int]:
+    """Cost of a planner's path after checking it, None for no path."""
+    if not path:
+        return None
+    assert is_valid_path(env, path, start, goal, start_time), path
+    return calculate_path_cost(env, path, start_time)
+
+def scenarios(count: int, size: int = 10, moving: bool = True, changes: bool = True,
+              queries: int = 3) -> Iterator[Tuple[object, list]]:
+    """count seeded maps, static or with moving obstacles and dynamic changes, with their queries."""
+    for seed in range(count):
+        spec = ScenarioSpec(size=size, obstacle_density=0.15, moving_obstacles=(seed % 3) if moving else 0,
+                            change_rate=0.5 * (seed % 2) if changes else 0.0, queries=queries, seed=seed)
+        env = generate_environment(spec)
+        yield env, generate_queries(spec, env)
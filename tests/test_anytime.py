@@ -0,0 +1,48 @@
+import pytest
+
+from planners.informed import AnytimeAStarPlanner
+from tests.reference import optimal_cost, path_cost, scenarios
+
+CASES = [(env, start, goal, start_time) for env, queries in scenarios(6)
+         for start, goal in queries for start_time in (0, 4)]
+
+def check_solutions(planner, cost):
+    costs = [s['cost'] for s in planner.solutions]
+    bounds = [s['bound'] for s in planner.solutions]
+    assert costs == sorted(costs, reverse=True) and bounds == sorted(bounds, reverse=True)
+    assert costs[-1] == cost and bounds[-1] == planner.bound
+
+def test_unbounded_search_is_optimal():
+    for env, start, goal, start_time in CASES:
+        planner = AnytimeAStarPlanner(env)
+        path = planner.plan(start, goal, start_time)
+        best = optimal_cost(env, start, goal, start_time)
+        assert path_cost(env, path, start, goal, start_time) == best
+        if best is None:
+            assert planner.bound == float('inf') and planner.solutions == []
+        else:
+            assert planner.bound == 1.0
+            check_solutions(planner, best)
+
+@pytest.mark.parametrize('max_expansions', [0, 3, 15, 40])
+def test_expansion_budget_keeps_the_bound(max_expansions):
+    for env, start, goal, start_time in CASES:
+        planner = AnytimeAStarPlanner(env, epsilon=5.0, epsilon_step=1.0, max_expansions=max_expansions)
+        path = planner.plan(start, goal, start_time)
+        assert planner.nodes_expanded <= max_expansions
+        cost = path_cost(env, path, start, goal, start_time)
+        if cost is None:
+            assert planner.bound == float('inf')
+            continue
+        assert cost <= planner.bound * optimal_cost(env, start, goal, start_time)
+        check_solutions(planner, cost)
+
+def test_plan_budget_overrides_the_default():
+    env, start, goal, start_time = CASES[0]
+    planner = AnytimeAStarPlanner(env, max_expansions=0)
+    assert planner.plan(start, goal, start_time) == []
+    path = planner.plan(start, goal, start_time, max_expansions=10 ** 6)
+    assert path_cost(env, path, start, goal, start_time) == optimal_cost(env, start, goal, start_time)
+
+    planner = AnytimeAStarPlanner(env)
+    assert planner.plan(start, goal, start_time, deadline=0.0) == [] and planner.nodes_expanded == 0
@@ -0,0 +1,47 @@
+import pytest
+
+from planners.bidirectional import BidirectionalAStarPlanner, BidirectionalDijkstraPlanner
+from planners.informed import AStarPlanner
+from planners.uninformed import UniformCostPlanner
+from tests.reference import optimal_cost, path_cost, scenarios
+
+PLANNERS = [BidirectionalDijkstraPlanner, BidirectionalAStarPlanner,
+            lambda env: UniformCostPlanner(env, bidirectional=True),
+            lambda env: AStarPlanner(env, bidirectional=True)]
+IDS = ['dijkstra', 'astar', 'uniform-routed', 'astar-routed']
+
+@pytest.mark.parametrize('make', PLANNERS, ids=IDS)
+def test_static_queries_are_optimal(make):
+    for env, queries in scenarios(8, size=14, moving=False, queries=5):
+        planner = make(env)
+        for start, goal in queries:
+            path = planner.plan(start, goal)
+            assert path_cost(env, path, start, goal) == optimal_cost(env, start, goal)
+
+@pytest.mark.parametrize('start_time', [0, 3, 40])
+@pytest.mark.parametrize('make', PLANNERS, ids=IDS)
+def test_time_dependent_queries_are_optimal(make, start_time):
+    for env, queries in scenarios(6):
+        planner = make(env)
+        for start, goal in queries:
+            path = planner.plan(start, goal, start_time)
+            assert path_cost(env, path, start, goal, start_time) == optimal_cost(env, start, goal, start_time)
+
+@pytest.mark.parametrize('make', PLANNERS, ids=IDS)
+def test_off_grid_endpoints_have_no_path(make):
+    # Seed 0 is static, seed 1 has moving obstacles and dynamic changes
+    for env, _ in scenarios(2):
+        planner = make(env)
+        for start, goal in [((0, 0), (env.width, env.height)), ((0, 0), (-1, 2)), ((-1, 0), (0, 0)),
+                            ((env.width + 2, 1), (0, 0))]:
+            assert planner.plan(start, goal) == []
+
+def test_walled_off_goal_has_no_path():
+    env, queries = next(scenarios(1, moving=False, changes=False))
+    start, goal = queries[0]
+    gx, gy = goal
+    for x, y in [(gx + 1, gy), (gx - 1, gy), (gx, gy + 1), (gx, gy - 1)]:
+        if 0 <= x < env.width and 0 <= y < env.height and (x, y) != start:
+            env.set_terrain_cost(x, y, 9999)
+    for planner in (BidirectionalDijkstraPlanner(env), BidirectionalAStarPlanner(env)):
+        assert (planner.plan(start, goal) == []) == (optimal_cost(env, start, goal) is None)
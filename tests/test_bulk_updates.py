@@ -0,0 +1,103 @@
+import random
+
+import numpy as np
+import pytest
+
+from environment import ChangeLog
+from planners.cached import RouteCache
+from planners.informed import AStarPlanner
+from tests.reference import scenarios
+
+def all_costs(env, times):
+    return [[env.get_cost(x, y, t) for y in range(env.height) for x in range(env.width)] for t in times]
+
+def random_batch(rng, env, count):
+    return (rng.integers(0, 8, count), rng.integers(0, env.width, count), rng.integers(0, env.height, count),
+            rng.choice([1, 3, 10, 15, 9999], count))
+
+@pytest.mark.parametrize('compiled', [False, True])
+def test_bulk_updates_match_single_updates(compiled):
+    rng = np.random.default_rng(0)
+    for (single, _), (bulk, _) in zip(scenarios(4), scenarios(4)):
+        if compiled:
+            single.compile()
+            bulk.compile()
+        for _ in range(5):
+            # Small maps make repeated cells, where the last terrain and the first dynamic change win
+            times, xs, ys, costs = random_batch(rng, bulk, 40)
+            for x, y, cost in zip(xs.tolist(), ys.tolist(), costs.tolist()):
+                single.set_terrain_cost(x, y, cost)
+            bulk.set_terrain_costs(xs, ys, costs)
+            times, xs, ys, costs = random_batch(rng, bulk, 40)
+            for t, x, y, cost in zip(times.tolist(), xs.tolist(), ys.tolist(), costs.tolist()):
+                single.add_dynamic_change(t, x, y, cost)
+            bulk.add_dynamic_changes(times, xs, ys, costs)
+            assert all_costs(bulk, range(12)) == all_costs(single, range(12))
+        # Patched engines agree with one compiled from the final map
+        bulk.invalidate()
+        assert all_costs(bulk, range(12)) == all_costs(single, range(12))
+
+def test_bulk_update_rejects_off_grid_cells():
+    env, _ = next(scenarios(1))
+    with pytest.raises(ValueError):
+        env.set_terrain_costs([0, env.width], [0, 0], [1, 1])
+
+def test_compaction_keeps_what_readers_see():
+    rng = random.Random(0)
+    for trial in range(50):
+        log = ChangeLog(max_entries=rng.choice([5, 20, 1 << 20]))
+        # (cell, time) of every change and the versions marked lowered, never compacted
+        full, marks = [], []
+        for _ in range(40):
+            lowered = rng.random() < 0.2
+            if rng.random() < 0.5:
+                cell, time_step = (rng.randrange(9), rng.randrange(9)), rng.choice([None, rng.randrange(5)])
+                log.append(cell, time_step, lowered)
+                marks += [len(full)] if lowered else []
+                full.append((cell, time_step))
+            else:
+                count = rng.randrange(0, 6)
+                xs = np.array([rng.randrange(9) for _ in range(count)], dtype=np.int64)
+                ys = np.array([rng.randrange(9) for _ in range(count)], dtype=np.int64)
+                times = np.array([rng.randrange(5) for _ in range(count)], dtype=np.int64)
+                log.extend(xs, ys, times, lowered)
+                marks += [len(full)] if lowered and count else []
+                full.extend(((x, y), t) for x, y, t in zip(xs.tolist(), ys.tolist(), times.tolist()))
+            if rng.random() < 0.2:
+                log.compact(rng.randrange(len(full) + 2))
+            assert len(log) == len(full)
+            for version in range(len(full) + 1):
+                changes = log.since(version)
+                if version < log.base:
+                    assert (None, None) in changes
+                    assert log.lowered_since(version)
+                else:
+                    assert changes == full[version:]
+                    # Compaction may add a mark where it cuts a batch, never lose one
+                    if any(mark >= version for mark in marks):
+                        assert log.lowered_since(version)
+
+def test_compaction_waits_for_readers():
+    env, queries = next(scenarios(1))
+    cache = RouteCache(AStarPlanner(env))
+    pinned = env.version
+    for x in range(env.width):
+        env.set_terrain_cost(x, 0, 3)
+    env.compact_changes()
+    assert env.change_log.base == pinned
+    start, goal = queries[0]
+    cache.plan(start, goal)
+    env.compact_changes()
+    assert env.change_log.base == env.version
+
+def test_log_stays_bounded_with_a_reader_keeping_up():
+    env, queries = next(scenarios(1, size=32))
+    env.change_log.max_entries = 200
+    cache = RouteCache(AStarPlanner(env))
+    rng = np.random.default_rng(0)
+    start, goal = queries[0]
+    for _ in range(50):
+        env.set_terrain_costs(rng.integers(0, 32, 50), rng.integers(0, 32, 50), rng.choice([1, 3, 10], 50))
+        cache.plan(start, goal)
+        assert len(env.change_log) - env.change_log.base <= 200 + 50
+    assert env.version >= 2500
@@ -0,0 +1,80 @@
+import io
+import json
+import os
+import sys
+
+import pytest
+
+from src.cli import main, run_batch, run_single_experiment
+from src.map_cache import MapCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAP = os.path.join(ROOT, 'maps', 'medium.map')
+
+def answers(lines, defaults=None, **options):
+    out = io.StringIO()
+    run_batch(lines, out, defaults or {}, **options)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+def without_timing(result):
+    return {key: value for key, value in result.items() if key not in ('planning_time', 'id')}
+
+def test_answers_match_single_queries():
+    queries = [{'id': index, 'map': MAP, 'start': [0, 0], 'goal': goal, 'planner': planner}
+               for index, (planner, goal) in enumerate([('astar', [9, 9]), ('uniform', '5,7'), ('astar', [9, 9]),
+                                                        ('anytime', [9, 0]), ('genetic', [4, 4])])]
+    queries[-1]['seed'] = 3
+    cache = MapCache()
+    results = answers([json.dumps(query) for query in queries], cache=cache)
+    assert [result['id'] for result in results] == list(range(len(queries)))
+    for query, result in zip(queries, results):
+        goal = query['goal'] if isinstance(query['goal'], list) else query['goal'].split(',')
+        expected = run_single_experiment(MAP, (0, 0), tuple(map(int, goal)), query['planner'], seed=query.get('seed'))
+        assert without_timing(result) == without_timing(expected)
+    assert cache.stats['loads'] == 1 and cache.stats['planners_reused'] == 1
+
+def test_errors_are_reported_on_their_line():
+    lines = [
+        '{"id": "a", "start": [0, 0], "goal": [9, 9]}',
+        '{"start": [0, 0], "goal": ',
+        '',
+        '[1, 2]',
+        '{"id": 4, "start": [0, 0], "goal": [9, 9], "planner": "dijkstra"}',
+        '{"id": 5, "start": [0, 0], "goal": [10, 9]}',
+        '{"id": 6, "start": "0;0", "goal": [9, 9]}',
+        '{"id": 7, "map": "missing.map", "start": [0, 0], "goal": [9, 9]}',
+        '{"id": 8, "goal": [9, 9]}',
+        '{"id": "z", "start": [0, 0], "goal": [9, 9], "time": 2}',
+    ]
+    results = answers(lines, {'map': MAP, 'planner': 'astar'})
+    assert len(results) == 9
+    assert results[0]['id'] == 'a' and results[0]['path_found']
+    assert results[-1]['id'] == 'z' and results[-1]['path_found']
+    errors = {result['line']: result for result in results[1:-1]}
+    assert sorted(errors) == [2, 4, 5, 6, 7, 8, 9]
+    assert all(set(result) <= {'error', 'line', 'id'} for result in errors.values())
+    assert errors[2]['error'].startswith('JSONDecodeError') and 'id' not in errors[2]
+    assert errors[4]['error'] == 'ValueError: query must be a JSON object'
+    assert errors[5] == {'error': "ValueError: unknown planner 'dijkstra'", 'line': 5, 'id': 4}
+    assert errors[6] == {'error': 'ValueError: position (10, 9) is outside the 10x10 map', 'line': 6, 'id': 5}
+    assert errors[7]['error'].startswith('ValueError') and errors[7]['id'] == 6
+    assert errors[8]['error'].startswith('FileNotFoundError')
+    assert errors[9] == {'error': "KeyError: 'start'", 'line': 9, 'id': 8}
+
+def test_stats_and_stats_sink():
+    records = []
+    results = answers(['{"start": [0, 0], "goal": [9, 9], "stats": true}', '{"start": [0, 0], "goal": [5, 5]}'],
+                      {'map': MAP, 'planner': 'astar'}, stats_sink=records.append)
+    assert set(results[0]['stats']) == {'counters', 'phases', 'total_time'} and 'stats' not in results[1]
+    assert [record['goal'] for record in records] == [(9, 9), (5, 5)]
+
+def test_batch_option_reads_a_file(tmp_path, monkeypatch, capsys):
+    batch = tmp_path / 'queries.jsonl'
+    batch.write_text('{"goal": [9, 9]}\n{"goal": [9, 9], "planner": "bfs"}\n{"goal": [99, 9]}\n')
+    monkeypatch.setattr(sys, 'argv', ['cli', '--batch', str(batch), '--map', MAP, '--start', '0,0',
+                                      '--planner', 'uniform'])
+    main()
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [result.get('planner') for result in results] == ['uniform', 'bfs', None]
+    assert results[0]['path_cost'] <= results[1]['path_cost']
+    assert results[2]['line'] == 3
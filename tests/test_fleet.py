@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from agent import DeliveryAgent
+from environment import GridEnvironment
+from fleet import FleetPlanner, ReservationTable, find_conflicts
+
+def scenarios(seed, count, size=10, obstacles=15, agents=6):
+    """count maps with random static obstacles and agents on distinct free cells, from one seeded stream."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        env = GridEnvironment(size, size)
+        for _ in range(obstacles):
+            env.add_static_obstacle(rng.randrange(size), rng.randrange(size))
+        free = [(x, y) for y in range(size) for x in range(size) if (x, y) not in env.static_obstacles]
+        cells = rng.sample(free, 2 * agents)
+        fleet = []
+        for i in range(agents):
+            agent = DeliveryAgent(env)
+            agent.set_start_goal(cells[2 * i], cells[2 * i + 1])
+            fleet.append(agent)
+        yield env, fleet
+
+def test_reservations_block_cells_swaps_and_parked_goals():
+    table = ReservationTable(4, 4)
+    table.reserve_path('a', [(0, 0), (1, 0), (2, 0)])
+    assert table.is_reserved(1, 0, 1) and not table.is_reserved(1, 0, 2)
+    # Moving (1, 0) -> (0, 0) while 'a' moves the other way
+    assert table.blocks(1, 0, 1)
+    assert table.is_reserved(2, 0, 2) and table.is_reserved(2, 0, 50)
+    assert not table.can_stay(1, 0) and table.can_stay(1, 1) and not table.can_stay(2, 9)
+    table.release('a')
+    assert len(table) == 0 and not table.is_reserved(2, 0, 50)
+
+def test_windowed_reservations_do_not_park():
+    table = ReservationTable(4, 4)
+    table.reserve_path('a', [(0, 0), (1, 0), (2, 0), (3, 0)], start_time=2, steps=1)
+    assert table.is_reserved(1, 0, 3)
+    assert not table.is_reserved(2, 0, 4) and not table.is_reserved(3, 0, 10)
+    assert table.horizon == 3
+
+def test_find_conflicts_reports_vertex_and_swap():
+    paths = {'a': [(0, 0), (1, 0)], 'b': [(1, 0), (0, 0)], 'c': [(2, 0), (1, 0)]}
+    assert sorted(find_conflicts(paths)) == [('swap', 1, (0, 0), 'a', 'b'), ('vertex', 1, (1, 0), 'a', 'c')]
+
+@pytest.mark.parametrize('window', [None, 4])
+def test_fleet_runs_are_conflict_free(window):
+    for seed in range(8):
+        for env, agents in scenarios(seed, 5):
+            traces = FleetPlanner(env, window=window).run(agents, max_steps=60)
+            assert find_conflicts(traces) == []
+
+@pytest.mark.parametrize('seed, index', [(5, 9), (34, 3)])
+def test_stuck_agents_are_not_driven_through(seed, index):
+    env, agents = list(scenarios(seed, index + 1))[index]
+    fleet = FleetPlanner(env, window=4)
+    traces = fleet.run(agents, max_steps=60)
+    assert find_conflicts(traces) == []
+
+def test_agent_planned_first_replans_around_a_stuck_one():
+    env = GridEnvironment(5, 1)
+    agents = [DeliveryAgent(env), DeliveryAgent(env)]
+    agents[0].set_start_goal((0, 0), (4, 0))
+    agents[1].set_start_goal((4, 0), (0, 0))
+    fleet = FleetPlanner(env, priority='order')
+    # In a corridor the second agent cannot get past, so it stays put and
+    # the first one may no longer drive onto its cell
+    assert fleet.plan(agents) == [[], []]
+    assert fleet.last_stats['failed'] == 2
+    assert find_conflicts(fleet.run(agents, max_steps=10)) == []
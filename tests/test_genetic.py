@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from environment import load_map_from_file
+from map_format import sections_from_environment, write_binary_map
+from path_eval import evaluate_path
+from planners.genetic import GeneticPlanner
+from tiled import TiledGridEnvironment
+from tests.reference import optimal_cost, path_cost, scenarios
+
+OPTIONS = {'population': 60, 'generations': 40}
+
+def plans(env, queries, start_time=0, **options):
+    runs = []
+    for start, goal in queries:
+        planner = GeneticPlanner(env, **dict(OPTIONS, **options))
+        runs.append((planner.plan(start, goal, start_time), planner.nodes_expanded))
+    return runs
+
+@pytest.mark.parametrize('start_time', [0, 3])
+def test_paths_are_valid_and_reproducible(start_time):
+    for env, queries in scenarios(6):
+        runs = plans(env, queries, start_time, seed=5)
+        assert plans(env, queries, start_time, seed=5) == runs
+        for (start, goal), (path, nodes) in zip(queries, runs):
+            assert nodes == OPTIONS['population'] * (OPTIONS['generations'] + 1)
+            cost = path_cost(env, path, start, goal, start_time)
+            if cost is not None:
+                assert cost >= optimal_cost(env, start, goal, start_time)
+
+def test_population_scores_match_path_evaluation():
+    for env, queries in scenarios(6):
+        planner = GeneticPlanner(env, population=300)
+        valid = 0
+        rng = np.random.default_rng(0)
+        engine = env.compile()
+        cells = env.width * env.height
+        for start, goal in queries:
+            length = 40
+            keys, overlay_costs = engine.overlay(0, length)
+            touched = np.zeros(cells, dtype=bool)
+            touched[keys % cells] = True
+            base = engine.base_costs()
+            overlay = (keys, overlay_costs, lambda flat: touched[flat])
+            moves = planner._seed_population(rng, start, goal, length)
+            fitness, ends = planner._score(moves, start, goal, lambda flat: base[flat], overlay)
+            xs, ys = planner._decode(moves, start)
+            valid += int((ends >= 0).sum())
+            for row in range(len(moves)):
+                path = [start] + list(zip(xs[row].tolist(), ys[row].tolist()))
+                # The path ends at its first visit to the goal
+                end = next((k for k, cell in enumerate(path) if cell == goal), None)
+                cost = evaluate_path(env, path[:end + 1]) if end is not None else float('inf')
+                if cost < float('inf'):
+                    assert (ends[row], fitness[row]) == (end - 1, cost)
+                else:
+                    assert ends[row] == -1 and fitness[row] >= 9999
+        assert valid
+
+def test_tiled_terrain_gives_the_same_paths(tmp_path):
+    for index, (env, queries) in enumerate(scenarios(3)):
+        map_file = str(tmp_path / f'{index}.bin')
+        write_binary_map(sections_from_environment(env), map_file)
+        tiled = TiledGridEnvironment(map_file, tile_size=4)
+        assert plans(tiled, queries, seed=2) == plans(load_map_from_file(map_file), queries, seed=2)
+
+def test_target_cost_stops_early():
+    env, queries = next(scenarios(1))
+    for path, nodes in plans(env, queries, seed=1, target_cost=float('inf')):
+        assert nodes == OPTIONS['population']
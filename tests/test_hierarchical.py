@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from environment import GridEnvironment
+from planners.hierarchical import HPAStarPlanner
+from tests.reference import optimal_cost, path_cost, scenarios
+
+def check_near_optimal(env, planner, start, goal, start_time=0):
+    path = planner.plan(start, goal, start_time)
+    cost, best = path_cost(env, path, start, goal, start_time), optimal_cost(env, start, goal, start_time)
+    assert (cost is None) == (best is None)
+    assert cost is None or cost >= best
+
+@pytest.mark.parametrize('start_time', [0, 3])
+def test_paths_are_valid_and_found_whenever_one_exists(start_time):
+    for env, queries in scenarios(8, size=14, queries=4):
+        planner = HPAStarPlanner(env, cluster_size=4)
+        for start, goal in queries:
+            check_near_optimal(env, planner, start, goal, start_time)
+
+def test_static_maps_need_no_fallback():
+    for env, queries in scenarios(6, size=14, moving=False, changes=False, queries=4):
+        planner = HPAStarPlanner(env, cluster_size=4)
+        for start, goal in queries:
+            check_near_optimal(env, planner, start, goal)
+            assert planner.last_stats['fallback'] == 0
+
+def test_replanning_after_terrain_changes():
+    rng = random.Random(0)
+    for env, queries in scenarios(4, size=14, moving=False, changes=False, queries=4):
+        planner = HPAStarPlanner(env, cluster_size=4)
+        for _ in range(10):
+            start, goal = rng.choice(queries)
+            x, y = rng.randrange(env.width), rng.randrange(env.height)
+            if (x, y) not in (start, goal):
+                env.set_terrain_cost(x, y, rng.choice([1, 3, 10, 9999]))
+            check_near_optimal(env, planner, start, goal)
+
+def test_goal_under_a_moving_obstacle_at_the_start_time():
+    env = GridEnvironment(20, 20)
+    env.add_moving_obstacle([(10, 10), (11, 11)])
+    planner = HPAStarPlanner(env)
+    check_near_optimal(env, planner, (0, 0), (10, 10))
+    assert planner.last_stats['fallback'] == 1
+
+def test_chokepoint_occupied_at_the_start_time():
+    env = GridEnvironment(20, 20)
+    for y in range(20):
+        if y != 5:
+            env.add_static_obstacle(10, y)
+    env.add_moving_obstacle([(10, 5), (3, 15), (3, 16)])
+    planner = HPAStarPlanner(env)
+    check_near_optimal(env, planner, (0, 0), (19, 19))
+    assert planner.last_stats['fallback'] == 1
+
+def test_off_grid_endpoints_have_no_path():
+    env = GridEnvironment(10, 10)
+    planner = HPAStarPlanner(env, cluster_size=4)
+    assert planner.plan((-1, 0), (3, 3)) == []
+    assert planner.plan((0, 0), (10, 3)) == []
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from environment import GridEnvironment
+
+from planners.incremental import DStarLitePlanner
+from tests.reference import optimal_cost, path_cost, scenarios
+
+def test_replanning_after_terrain_changes_stays_optimal():
+    rng = random.Random(0)
+    for env, queries in scenarios(6, moving=False, changes=False):
+        planner = DStarLitePlanner(env)
+        for start, goal in queries:
+            for t in range(6):
+                path = planner.plan(start, goal, t)
+                assert path_cost(env, path, start, goal, t) == optimal_cost(env, start, goal, t)
+                # Walk one step along the path, then raise and lower a few cells off it
+                if len(path) > 1:
+                    start = path[1]
+                for _ in range(4):
+                    x, y = rng.randrange(env.width), rng.randrange(env.height)
+                    if (x, y) not in (start, goal):
+                        env.set_terrain_cost(x, y, rng.choice([1, 3, 10, 9999]))
+
+def test_repairs_reuse_the_search_tree():
+    env, queries = next(scenarios(1, size=16, moving=False, changes=False))
+    start, goal = queries[0]
+    planner = DStarLitePlanner(env, compare_full=True)
+    planner.plan(start, goal)
+    x, y = next((x, y) for y in range(env.height) for x in range(env.width)
+                if (x, y) not in (start, goal) and env.get_cost(x, y, 0) < 9999)
+    env.set_terrain_cost(x, y, 15)
+    path = planner.plan(start, goal)
+    assert path_cost(env, path, start, goal) == optimal_cost(env, start, goal)
+    assert planner.last_stats['fallback'] == 0
+
+@pytest.mark.parametrize('start_time', [0, 4])
+def test_time_dependent_queries_stay_optimal(start_time):
+    for env, queries in scenarios(6):
+        planner = DStarLitePlanner(env)
+        for start, goal in queries:
+            path = planner.plan(start, goal, start_time)
+            assert path_cost(env, path, start, goal, start_time) == optimal_cost(env, start, goal, start_time)
+
+def test_frequent_dynamic_changes_are_repaired_incrementally():
+    rng = random.Random(0)
+    repaired = 0
+    for env, queries in scenarios(6, moving=False, changes=False):
+        planner = DStarLitePlanner(env)
+        start, goal = queries[0]
+        for t in range(12):
+            # Pending changes ahead of the agent keep the query time-dependent
+            for _ in range(3):
+                x, y = rng.randrange(env.width), rng.randrange(env.height)
+                if (x, y) not in (start, goal):
+                    env.add_dynamic_change(t + rng.randrange(1, 6), x, y, rng.choice([1, 3, 10, 9999]))
+            path = planner.plan(start, goal, t)
+            assert path_cost(env, path, start, goal, t) == optimal_cost(env, start, goal, t)
+            assert planner.env_version == env.version
+            repaired += planner.last_stats['incremental'] and not planner.last_stats['fallback']
+            if len(path) > 1:
+                start = path[1]
+    assert repaired > 30
+
+def test_moving_obstacle_on_the_path_falls_back_to_the_kernel():
+    env = GridEnvironment(10, 10)
+    start, goal = (0, 0), (0, 9)
+    # Reaches (0, 4) at time 3 on the straight path down the column
+    env.add_moving_obstacle([(0, 4), (0, 3), (0, 2)])
+    planner = DStarLitePlanner(env)
+    path = planner.plan(start, goal)
+    assert path_cost(env, path, start, goal) == optimal_cost(env, start, goal)
+    assert planner.last_stats['fallback'] == 1
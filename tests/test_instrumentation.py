@@ -0,0 +1,78 @@
+import io
+import json
+import random
+
+import pytest
+
+from instrumentation import DISABLED, JsonLinesSink, MemorySink, format_record
+from run_suite import PLANNERS
+from tests.reference import scenarios
+
+@pytest.mark.parametrize('name', sorted(PLANNERS))
+def test_instrumented_plan_matches_plain_plan(name):
+    env, queries = list(scenarios(2))[1]
+    planner_class = PLANNERS[name]
+    for start, goal in queries:
+        random.seed(0)
+        plain = planner_class(env)
+        path = plain.plan(start, goal)
+        assert 'plan' not in vars(plain) and plain.instrumentation is DISABLED
+
+        random.seed(0)
+        planner = planner_class(env)
+        sink = MemorySink()
+        planner.instrument(sink)
+        assert planner.plan(start, goal) == path
+        assert planner.env is env
+        record = sink.last
+        assert record is planner.last_instrumentation and len(sink.records) == 1
+        assert record['planner'] == planner_class.__name__
+        assert (record['start'], record['goal'], record['path_length']) == (start, goal, len(path))
+        counters = record['counters']
+        assert counters['nodes_expanded'] == planner.nodes_expanded == plain.nodes_expanded
+        assert set(counters) >= {'get_cost', 'get_costs', 'get_neighbors', 'neighbors_generated'}
+        assert all(seconds >= 0 for seconds in record['phases'].values())
+        assert sum(record['phases'].values()) <= record['total_time']
+
+def test_counters_reset_per_plan():
+    env, ((start, goal), *_) = next(scenarios(1))
+    planner = PLANNERS['astar'](env, bidirectional=False)
+    sink = MemorySink()
+    planner.instrument(sink)
+    planner.plan(start, goal)
+    planner.plan(start, goal)
+    first, second = sink.records
+    assert first['counters'] == second['counters']
+    assert first['counters']['get_neighbors'] == first['counters']['nodes_expanded'] > 0
+    assert 'search' in first['phases'] and 'reconstruct' in first['phases']
+    assert first['counters']['pushes'] >= first['counters']['nodes_expanded']
+
+    planner.uninstrument()
+    assert planner.instrumentation is DISABLED and 'plan' not in vars(planner)
+    planner.plan(start, goal)
+    assert len(sink.records) == 2
+
+def test_json_lines_sink(tmp_path):
+    env, queries = next(scenarios(1))
+    buffer = io.StringIO()
+    log_file = str(tmp_path / 'stats.jsonl')
+    for sink in (JsonLinesSink(buffer), JsonLinesSink(log_file)):
+        planner = PLANNERS['uniform_cost'](env)
+        planner.instrument(sink)
+        for start, goal in queries:
+            planner.plan(start, goal)
+        sink.close()
+    assert not buffer.closed
+    for text in (buffer.getvalue(), open(log_file).read()):
+        records = [json.loads(line) for line in text.splitlines()]
+        assert [(tuple(r['start']), tuple(r['goal'])) for r in records] == queries
+        assert all(r['planner'] == 'UniformCostPlanner' for r in records)
+
+def test_callback_sink_and_format():
+    env, ((start, goal), *_) = next(scenarios(1))
+    seen = []
+    planner = PLANNERS['bfs'](env)
+    planner.instrument(seen.append)
+    planner.plan(start, goal)
+    line = format_record(seen[0])
+    assert line.startswith('BFSPlanner: ') and f"nodes_expanded={planner.nodes_expanded}" in line
@@ -0,0 +1,98 @@
+import heapq
+import random
+
+import numpy as np
+import pytest
+
+from cost_engine import BLOCKED
+from environment import GridEnvironment, load_map_from_file
+from landmarks import LandmarkTable, cost_field
+from map_format import sections_from_environment, write_binary_map
+from planners.informed import ALTAStarPlanner
+from tiled import TiledGridEnvironment
+from tests.reference import optimal_cost, path_cost, scenarios
+
+def dijkstra_field(costs, source):
+    """Cost of the cheapest path from source to every cell, a move costing the cell entered."""
+    height, width = costs.shape
+    dist = np.full((height, width), np.inf)
+    dist[source[1], source[0]] = 0
+    queue = [(0, source)]
+    while queue:
+        d, (x, y) = heapq.heappop(queue)
+        if d > dist[y, x]:
+            continue
+        for nx, ny in [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]:
+            if 0 <= nx < width and 0 <= ny < height and costs[ny, nx] < BLOCKED:
+                if d + costs[ny, nx] < dist[ny, nx]:
+                    dist[ny, nx] = d + costs[ny, nx]
+                    heapq.heappush(queue, (dist[ny, nx], (nx, ny)))
+    return dist
+
+def test_cost_field_matches_dijkstra():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        height, width = rng.integers(1, 16, 2)
+        costs = rng.choice([1, 3, 10, 15, BLOCKED], (height, width), p=[0.4, 0.2, 0.1, 0.1, 0.2]).astype(np.int64)
+        source = (int(rng.integers(width)), int(rng.integers(height)))
+        costs[source[1], source[0]] = 1
+        assert np.array_equal(cost_field(costs, source), dijkstra_field(costs, source))
+
+def test_bounds_are_admissible_at_every_time():
+    rng = random.Random(0)
+    for env, _ in scenarios(6):
+        table = LandmarkTable.build(env, 4)
+        free = [(x, y) for y in range(env.height) for x in range(env.width) if env.get_cost(x, y, 0) < BLOCKED]
+        for _ in range(10):
+            cell, goal = rng.choice(free), rng.choice(free)
+            bounds = table.bounds_to(goal)
+            assert bounds[cell[1] * env.width + cell[0]] == table.bound(cell, goal)
+            for start_time in (0, 3):
+                cost = optimal_cost(env, cell, goal, start_time)
+                assert cost is None or table.bound(cell, goal) <= cost
+
+@pytest.mark.parametrize('start_time', [0, 3])
+def test_alt_paths_are_optimal(start_time):
+    for env, queries in scenarios(6):
+        planner = ALTAStarPlanner(env, landmarks=4)
+        for start, goal in queries:
+            path = planner.plan(start, goal, start_time)
+            assert path_cost(env, path, start, goal, start_time) == optimal_cost(env, start, goal, start_time)
+
+@pytest.mark.parametrize('start, goal', [((7, 7), (0, 0)), ((-1, 0), (0, 0)), ((0, 0), (5, 0))])
+def test_off_grid_endpoints_have_no_path(start, goal):
+    assert ALTAStarPlanner(GridEnvironment(5, 5), landmarks=2).plan(start, goal) == []
+
+def test_table_is_saved_once_next_to_the_map(tmp_path):
+    env, queries = next(scenarios(1, size=16))
+    map_file = str(tmp_path / 'scenario.map')
+    write_binary_map(sections_from_environment(env), map_file)
+    start, goal = queries[0]
+
+    env = load_map_from_file(map_file)
+    ALTAStarPlanner(env, landmarks=4).plan(start, goal)
+    saved = sorted(path.name for path in tmp_path.iterdir())
+    assert saved == ['scenario.map', 'scenario.map.alt-4.json', 'scenario.map.alt-4.npy']
+
+    # A fresh load maps the saved table
+    reloaded = ALTAStarPlanner(load_map_from_file(map_file), landmarks=4)
+    assert isinstance(reloaded.landmark_table().fields, np.memmap)
+
+    # Tables of edited maps stay in memory
+    planner = ALTAStarPlanner(env, landmarks=4)
+    for x in range(env.width):
+        env.set_terrain_cost(x, env.height // 2, 15)
+        path = planner.plan(start, goal)
+        assert path_cost(env, path, start, goal) == optimal_cost(env, start, goal)
+    assert sorted(path.name for path in tmp_path.iterdir()) == saved
+
+def test_tiled_terrain_falls_back_to_manhattan(tmp_path):
+    env, queries = next(scenarios(1, size=16))
+    map_file = str(tmp_path / 'scenario.bin')
+    write_binary_map(sections_from_environment(env), map_file)
+    tiled = TiledGridEnvironment(map_file, tile_size=4)
+    planner = ALTAStarPlanner(tiled, landmarks=4)
+    for start, goal in queries:
+        path = planner.plan(start, goal, 2)
+        assert planner.table is None
+        assert path_cost(tiled, path, start, goal, 2) == optimal_cost(env, start, goal, 2)
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from path_eval import evaluate_path
+from planners.local_search import HillClimbingPlanner, SimulatedAnnealingPlanner
+from tests.reference import scenarios
+
+@pytest.mark.parametrize('start_time', [0, 5])
+def test_mutation_scores_match_full_evaluation(start_time):
+    for env, queries in scenarios(6):
+        planner = HillClimbingPlanner(env)
+        planner.rng = random.Random(0)
+        planner._prepare(start_time)
+        for start, goal in queries:
+            current = planner._score_path(planner.generate_random_path(start, goal), start_time)
+            assert current.cost == evaluate_path(env, current.path, start_time)
+            for _ in range(200):
+                mutation = planner.propose_mutation(current.path)
+                mutated = planner._apply_path(current.path, mutation)
+                cost = planner._score_mutation(current, mutation, start_time)
+                assert cost == evaluate_path(env, mutated, start_time)
+                # Uphill moves as well, as annealing takes them; like both
+                # planners, never onto a blocked path
+                if cost < current.cost or (cost < float('inf') and planner.rng.random() < 0.5):
+                    applied = planner._apply_mutation(current, mutation, start_time)
+                    fresh = planner._score_path(mutated, start_time)
+                    assert applied.path == mutated
+                    assert (applied.steps, applied.cost, applied.varying) == (fresh.steps, fresh.cost, fresh.varying)
+                    current = applied
+
+@pytest.mark.parametrize('planner_class', [HillClimbingPlanner, SimulatedAnnealingPlanner])
+def test_paths_are_unblocked(planner_class):
+    for env, queries in scenarios(3):
+        for start, goal in queries:
+            path = planner_class(env, seed=1, max_iterations=200).plan(start, goal, 2)
+            assert path and path[0] == start
+            assert evaluate_path(env, path, 2) < float('inf')
+
+def seeded_runs(planner_class, env, queries, **options):
+    runs = []
+    for start, goal in queries:
+        planner = planner_class(env, **options)
+        runs.append((planner.plan(start, goal, 1), planner.nodes_expanded))
+    return runs
+
+@pytest.mark.parametrize('planner_class, options', [
+    (HillClimbingPlanner, {'max_restarts': 4, 'max_iterations': 300}),
+    (SimulatedAnnealingPlanner, {'chains': 4, 'max_iterations': 300}),
+])
+def test_seeded_results_do_not_depend_on_workers(planner_class, options):
+    env, queries = list(scenarios(2))[1]
+    state = random.getstate()
+    serial = seeded_runs(planner_class, env, queries, seed=7, **options)
+    assert random.getstate() == state
+    assert seeded_runs(planner_class, env, queries, seed=7, **options) == serial
+    assert seeded_runs(planner_class, env, queries, seed=7, workers=2, **options) == serial
+    assert seeded_runs(planner_class, env, queries, seed=8, **options) != serial
+
+def test_target_cost_stops_at_the_first_restart_reaching_it():
+    env, ((start, goal), *_) = next(scenarios(1))
+    # A restart without an accepted move has no path
+    seed = next(seed for seed in range(100) if HillClimbingPlanner(env, max_restarts=1, seed=seed).plan(start, goal))
+    first = HillClimbingPlanner(env, max_restarts=1, seed=seed)
+    path = first.plan(start, goal)
+    for workers in (1, 2):
+        planner = HillClimbingPlanner(env, max_restarts=6, seed=seed, workers=workers,
+                                      target_cost=evaluate_path(env, path))
+        assert planner.plan(start, goal) == path
+        assert planner.nodes_expanded == first.nodes_expanded
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from planners.informed import AStarPlanner
+from planners.matrix import DistanceMatrixPlanner
+from tests.reference import path_cost, scenarios
+
+def single_pair_costs(env, sources, targets, start_time):
+    planner = AStarPlanner(env)
+    costs = np.full((len(sources), len(targets)), np.inf)
+    for i, source in enumerate(sources):
+        for j, target in enumerate(targets):
+            target = tuple(target)
+            path = planner.plan(source, target, start_time)
+            if path:
+                costs[i, j] = path_cost(env, path, source, target, start_time)
+    return costs
+
+@pytest.mark.parametrize('start_time', [0, 3])
+def test_matrix_matches_single_pair_astar(start_time):
+    for env, queries in scenarios(6, queries=4):
+        sources = [start for start, _ in queries]
+        # Lists as well as tuples, a repeated target and an off-grid one
+        targets = [list(goal) for _, goal in queries] + [queries[0][1], (env.width, 0)]
+        planner = DistanceMatrixPlanner(env)
+        costs, paths = planner.many_to_many(sources, targets, start_time, paths=True)
+        assert np.array_equal(costs, single_pair_costs(env, sources, targets, start_time))
+        for i, source in enumerate(sources):
+            for j, target in enumerate(targets):
+                cost = path_cost(env, paths[i][j], source, tuple(target), start_time)
+                assert (np.inf if cost is None else cost) == costs[i, j]
+
+def test_one_to_many_without_paths():
+    env, queries = next(scenarios(1, queries=4))
+    source = queries[0][0]
+    targets = [goal for _, goal in queries]
+    costs = DistanceMatrixPlanner(env).one_to_many(source, targets)
+    assert np.array_equal(costs, single_pair_costs(env, [source], targets, 0)[0])
+
+def test_process_pool_matches_in_process():
+    env, queries = next(scenarios(2, queries=4))
+    sources = [start for start, _ in queries]
+    targets = [goal for _, goal in queries]
+    planner = DistanceMatrixPlanner(env)
+    assert np.array_equal(planner.many_to_many(sources, targets, processes=2),
+                          planner.many_to_many(sources, targets))
@@ -0,0 +1,81 @@
+import types
+
+import numpy as np
+import pytest
+
+from agent import Planner
+from cost_engine import BLOCKED
+from environment import GridEnvironment
+from planners.informed import AStarPlanner
+from planners.uninformed import UniformCostPlanner
+from tests.reference import scenarios
+
+def table_neighbors(env, x, y, time_step):
+    """Neighbours of (x, y) as the search kernel reads them from the table."""
+    table = env.compile().neighbor_table()
+    indptr, indices, costs, dynamic = table.scalar_view()
+    neighbors = []
+    for k in range(indptr[y * env.width + x], indptr[y * env.width + x + 1]):
+        target = indices[k]
+        ny, nx = divmod(target, env.width)
+        cost = env.get_cost(nx, ny, time_step) if dynamic[target] else costs[k]
+        if cost < BLOCKED:
+            neighbors.append((nx, ny, cost))
+    return neighbors
+
+def mixed_environment():
+    env = GridEnvironment(6, 5)
+    env.set_terrain_cost(2, 2, 10)
+    env.set_terrain_cost(4, 1, BLOCKED)
+    env.add_static_obstacle(1, 3)
+    env.add_moving_obstacle([(3, 0), (3, 1), (3, 2)])
+    env.add_dynamic_change(2, 5, 4, BLOCKED)
+    env.add_dynamic_change(4, 4, 1, 3)
+    return env
+
+def environments():
+    yield mixed_environment()
+    for env, _ in scenarios(4):
+        yield env
+
+def check_table(env, times=range(8)):
+    planner = UniformCostPlanner(env)
+    for time_step in times:
+        for y in range(env.height):
+            for x in range(env.width):
+                assert table_neighbors(env, x, y, time_step) == Planner.get_neighbors(planner, x, y, time_step)
+
+def test_table_matches_get_neighbors():
+    for env in environments():
+        check_table(env)
+
+def test_table_follows_edits():
+    env = mixed_environment()
+    env.compile().neighbor_table()
+    env.set_terrain_cost(0, 0, 15)
+    env.set_terrain_costs([1, 2], [1, 2], [BLOCKED, 1])
+    env.add_static_obstacle(5, 0)
+    env.add_dynamic_change(1, 0, 4, BLOCKED)
+    env.add_moving_obstacle([(0, 2), (1, 2)])
+    check_table(env)
+
+def test_scalar_view_shares_the_arrays():
+    table = mixed_environment().compile().neighbor_table()
+    view = table.scalar_view()
+    assert view is table.scalar_view()
+    for memory, array in zip(view, (table.indptr, table.indices, table.costs, table.dynamic.view(np.uint8))):
+        assert isinstance(memory, memoryview) and memory.tolist() == array.tolist()
+        assert np.shares_memory(np.asarray(memory), array)
+    # No edges lead into the static obstacle; the blocked cell a dynamic change frees keeps its own
+    assert 1 + 3 * 6 not in table.indices.tolist() and 4 + 1 * 6 in table.indices.tolist()
+
+@pytest.mark.parametrize('planner_class', [UniformCostPlanner, AStarPlanner])
+def test_search_with_and_without_table_agrees(planner_class):
+    for env, queries in scenarios(4):
+        for start, goal in queries:
+            with_table = planner_class(env, bidirectional=False)
+            without = planner_class(env, bidirectional=False)
+            # An overridden get_neighbors keeps the kernel off the table
+            without.get_neighbors = types.MethodType(Planner.get_neighbors, without)
+            assert with_table.plan(start, goal, 1) == without.plan(start, goal, 1)
+            assert with_table.nodes_expanded == without.nodes_expanded
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from cost_engine import BLOCKED
+from map_format import sections_from_environment, write_binary_map
+from path_eval import (MIN_VECTOR_LENGTH, evaluate_path, is_valid_path, path_arrays, path_cost, score_paths,
+                       step_costs)
+from tiled import TiledGridEnvironment
+from tests.reference import scenarios
+
+LENGTHS = [1, 2, 9, MIN_VECTOR_LENGTH - 1, MIN_VECTOR_LENGTH, MIN_VECTOR_LENGTH + 1, 80]
+
+def walk_costs(env, path, start_time):
+    """Cost of entering each cell of path, one get_cost call at a time."""
+    return [env.get_cost(x, y, start_time + i) if 0 <= x < env.width and 0 <= y < env.height else BLOCKED
+            for i, (x, y) in enumerate(path[1:])]
+
+def walk_is_valid(env, path, start, goal, start_time):
+    if not path or path[0] != start or path[-1] != goal:
+        return False
+    adjacent = all(abs(x - px) + abs(y - py) <= 1 for (px, py), (x, y) in zip(path, path[1:]))
+    return adjacent and all(cost < BLOCKED for cost in walk_costs(env, path, start_time))
+
+def random_paths(rng, env, count):
+    """Random walks with waits, edging one cell off the grid and the odd jump."""
+    moves = np.array([(0, 0), (0, 1), (1, 0), (0, -1), (-1, 0), (2, 0)])
+    for _ in range(count):
+        length = int(rng.choice(LENGTHS))
+        x, y = int(rng.integers(env.width)), int(rng.integers(env.height))
+        path = [(x, y)]
+        for dx, dy in moves[rng.choice(len(moves), length - 1, p=[0.15, 0.2, 0.2, 0.2, 0.2, 0.05])]:
+            x = min(max(x + int(dx), -1), env.width)
+            y = min(max(y + int(dy), -1), env.height)
+            path.append((x, y))
+        yield path
+
+def environments(tmp_path):
+    for index, (env, _) in enumerate(scenarios(6)):
+        yield env
+        if index < 2:
+            map_file = str(tmp_path / f'{index}.bin')
+            write_binary_map(sections_from_environment(env), map_file)
+            yield TiledGridEnvironment(map_file, tile_size=4)
+
+@pytest.mark.parametrize('start_time', [0, 7])
+def test_matches_the_get_cost_walk(tmp_path, start_time):
+    rng = np.random.default_rng(start_time)
+    for env in environments(tmp_path):
+        for path in random_paths(rng, env, 60):
+            costs = walk_costs(env, path, start_time)
+            assert step_costs(env, path, start_time).tolist() == costs
+            assert path_cost(env, path, start_time) == sum(costs)
+            expected = sum(costs) if all(cost < BLOCKED for cost in costs) else float('inf')
+            assert evaluate_path(env, path, start_time) == expected
+            assert evaluate_path(env, np.array(path), start_time) == expected
+            for goal in (path[-1], (path[-1][0] + 1, path[-1][1])):
+                assert is_valid_path(env, path, path[0], goal, start_time) == \
+                    walk_is_valid(env, path, path[0], goal, start_time)
+        assert not is_valid_path(env, [], (0, 0), (0, 0), start_time)
+
+def test_score_paths_matches_evaluate_path(tmp_path):
+    rng = np.random.default_rng(1)
+    for env in environments(tmp_path):
+        for length in LENGTHS:
+            paths = [path for path in random_paths(rng, env, 200) if len(path) == length][:20]
+            if not paths:
+                continue
+            for start_time in (0, 5):
+                scores = score_paths(env, paths, start_time)
+                assert scores.tolist() == [float(evaluate_path(env, path, start_time)) for path in paths]
+                assert score_paths(env, np.array(paths), start_time).tolist() == scores.tolist()
+
+def test_path_arrays_and_bad_batches():
+    xs, ys = path_arrays([(1, 2), (3, 4)])
+    assert xs.dtype == ys.dtype == np.int64 and xs.tolist() == [1, 3] and ys.tolist() == [2, 4]
+    xs, ys = path_arrays(np.array([[1, 2], [3, 4]], dtype=np.int32))
+    assert xs.dtype == np.int64 and ys.tolist() == [2, 4]
+    env, _ = next(scenarios(1))
+    with pytest.raises(ValueError):
+        score_paths(env, [[(0, 0), (0, 1)], [(0, 0)]])
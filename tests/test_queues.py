@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from planners.informed import AStarPlanner
+from planners.queues import QUEUE_BACKENDS, BucketQueue, PriorityQueue, make_queue
+from planners.uninformed import UniformCostPlanner
+from tests.reference import optimal_cost, path_cost, scenarios
+
+CASES = list(scenarios(6))
+
+def test_priority_queue_is_abstract():
+    with pytest.raises(TypeError):
+        PriorityQueue()
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        make_queue('fibonacci')
+
+@pytest.mark.parametrize('backend', sorted(QUEUE_BACKENDS))
+def test_backend_pops_in_priority_order(backend):
+    rng = random.Random(0)
+    queue = make_queue(backend)
+    best = {}
+    for _ in range(500):
+        slot, priority = rng.randrange(100), rng.randrange(50)
+        queue.push((priority, slot))
+        best[slot] = min(best.get(slot, priority), priority)
+    popped = []
+    while len(queue):
+        popped.append(queue.pop())
+    priorities = [entry[0] for entry in popped]
+    assert priorities == sorted(priorities)
+    # The first pop of each slot carries its best priority, whatever the backend keeps besides
+    first = {}
+    for priority, slot in popped:
+        first.setdefault(slot, priority)
+    assert first == best
+
+def test_bucket_queue_needs_integer_priorities():
+    with pytest.raises(ValueError):
+        BucketQueue().push((1.5, 0))
+
+@pytest.mark.parametrize('backend', sorted(QUEUE_BACKENDS))
+@pytest.mark.parametrize('planner_class', [UniformCostPlanner, AStarPlanner])
+def test_backends_give_optimal_costs(backend, planner_class):
+    for env, queries in CASES:
+        planner = planner_class(env, queue=backend, bidirectional=False)
+        for start, goal in queries:
+            path = planner.plan(start, goal, 2)
+            assert path_cost(env, path, start, goal, 2) == optimal_cost(env, start, goal, 2)
@@ -0,0 +1,54 @@
+import random
+
+from planners.cached import RouteCache
+from planners.informed import AStarPlanner
+from tests.reference import optimal_cost, path_cost, scenarios
+
+def mutate(env, rng):
+    """One random single or bulk terrain or dynamic change, raising or lowering costs."""
+    kind = rng.randrange(4)
+    count = 1 if kind < 2 else rng.randrange(2, 6)
+    xs = [rng.randrange(env.width) for _ in range(count)]
+    ys = [rng.randrange(env.height) for _ in range(count)]
+    costs = [rng.choice([1, 3, 10, 15, 9999]) for _ in range(count)]
+    times = [rng.randrange(12) for _ in range(count)]
+    if kind == 0:
+        env.set_terrain_cost(xs[0], ys[0], costs[0])
+    elif kind == 1:
+        env.add_dynamic_change(times[0], xs[0], ys[0], costs[0])
+    elif kind == 2:
+        env.set_terrain_costs(xs, ys, costs)
+    else:
+        env.add_dynamic_changes(times, xs, ys, costs)
+
+def test_cached_routes_match_fresh_searches_under_changes():
+    rng = random.Random(0)
+    for env, queries in scenarios(6, queries=4):
+        cache = RouteCache(AStarPlanner(env))
+        for _ in range(30):
+            start, goal = rng.choice(queries)
+            start_time = rng.randrange(6)
+            path = cache.plan(start, goal, start_time)
+            assert path_cost(env, path, start, goal, start_time) == optimal_cost(env, start, goal, start_time)
+            if rng.random() < 0.5:
+                mutate(env, rng)
+
+def test_unchanged_queries_hit():
+    env, queries = next(scenarios(1))
+    cache = RouteCache(AStarPlanner(env))
+    start, goal = queries[0]
+    first = cache.plan(start, goal)
+    assert cache.plan(start, goal) == first
+    assert cache.stats['hits'] == 1 and cache.stats['misses'] == 1
+
+def test_lowered_cost_clears_the_cache():
+    env, queries = next(scenarios(1, moving=False, changes=False))
+    cache = RouteCache(AStarPlanner(env))
+    start, goal = queries[0]
+    cache.plan(start, goal)
+    assert len(cache) == 1
+    x, y = next((x, y) for y in range(env.height) for x in range(env.width) if env.get_cost(x, y, 0) > 1)
+    env.set_terrain_cost(x, y, 1)
+    path = cache.plan(start, goal)
+    assert cache.last_stats['cache_hit'] == 0
+    assert path_cost(env, path, start, goal) == optimal_cost(env, start, goal)
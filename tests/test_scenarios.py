@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from cost_engine import BLOCKED
+from environment import CellType
+from runner import ParallelExperimentRunner
+from run_suite import PLANNERS, REFERENCE, build_tasks, summarize
+from scenarios import ScenarioSpec, default_suite, generate_environment, generate_queries, load_scenario
+
+SPECS = [
+    ScenarioSpec(size=16, seed=3),
+    ScenarioSpec(size=12, terrain_mix={'ROAD': 0.5, 'MOUNTAIN': 0.5}, obstacle_density=0.3,
+                 moving_obstacles=3, moving_period=5, change_rate=2.0, seed=7),
+]
+
+def snapshot(env):
+    return (np.asarray(env.grid).tolist(), [obstacle.positions for obstacle in env.moving_obstacles],
+            sorted((t, changes) for t, changes in env.dynamic_changes.items()))
+
+@pytest.mark.parametrize('spec', SPECS, ids=ScenarioSpec.name)
+def test_same_spec_builds_the_same_scenario(spec):
+    env = generate_environment(spec)
+    assert snapshot(generate_environment(spec)) == snapshot(env)
+    assert snapshot(load_scenario(spec.key())) == snapshot(env)
+    assert ScenarioSpec.from_key(spec.key()) == spec
+    assert generate_queries(spec, generate_environment(spec)) == generate_queries(spec, env)
+
+def test_seeds_differ():
+    maps = [snapshot(generate_environment(ScenarioSpec(size=16, seed=seed))) for seed in range(3)]
+    assert maps[0] != maps[1] != maps[2]
+
+@pytest.mark.parametrize('spec', SPECS, ids=ScenarioSpec.name)
+def test_scenario_follows_spec(spec):
+    env = generate_environment(spec)
+    grid = np.asarray(env.grid)
+    assert grid.shape == (spec.size, spec.size)
+    assert set(np.unique(grid)) <= {CellType[name].value for name in spec.terrain_mix} | {BLOCKED}
+    assert abs((grid == BLOCKED).mean() - spec.obstacle_density) < 0.1
+    assert len(env.moving_obstacles) == spec.moving_obstacles
+    for obstacle in env.moving_obstacles:
+        assert len(obstacle.positions) <= spec.moving_period
+        assert all(0 <= x < spec.size and 0 <= y < spec.size for x, y in obstacle.positions)
+    changes = sum(len(entries) for entries in env.dynamic_changes.values())
+    assert changes == round(spec.change_rate * 2 * spec.size)
+    assert all(1 <= t <= 2 * spec.size for t in env.dynamic_changes)
+
+    queries = generate_queries(spec, env)
+    assert len(queries) == spec.queries
+    for start, goal in queries:
+        assert start != goal
+        assert env.is_valid_position(*start, 0) and env.is_valid_position(*goal, 0)
+
+def test_default_suite_sizes():
+    assert [spec.size for spec in default_suite()[:5]] == [10, 64, 256, 1024, 4096]
+    assert max(spec.size for spec in default_suite(quick=True)) <= 64
+
+def test_suite_reports_each_planner():
+    spec = ScenarioSpec(size=10, seed=1)
+    planners = ['astar', 'bidirectional_dijkstra', REFERENCE]
+    tasks, names = build_tasks([spec], planners, repeat=2, measure_memory=True)
+    assert len(tasks) == spec.queries * len(planners)
+    assert all(task.planner_class is PLANNERS[task.algorithm] for task in tasks)
+
+    results = list(ParallelExperimentRunner(1, loader=load_scenario).run(tasks))
+    optimal = {(r['start'], r['goal']): r['path_cost'] for r in results
+               if r['algorithm'] == REFERENCE and r['valid']}
+    assert optimal
+    for name in planners:
+        record = summarize(names[spec.key()], name, [r for r in results if r['algorithm'] == name], optimal)
+        assert record['statuses'] == {'ok': spec.queries}
+        assert record['found'] == len(optimal)
+        assert record['optimality_gap']['max'] == 0
+        assert 0 < record['latency_ms']['p50'] <= record['latency_ms']['max']
+        assert record['peak_memory_bytes'] > 0
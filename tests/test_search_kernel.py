@@ -0,0 +1,61 @@
+import pytest
+
+from environment import GridEnvironment
+from planners.informed import AStarPlanner, AnytimeAStarPlanner
+from planners.matrix import DistanceMatrixPlanner
+from planners.uninformed import BFSPlanner, UniformCostPlanner
+from tests.reference import optimal_cost, path_cost, scenarios
+
+class LoopUniformCostPlanner(UniformCostPlanner):
+    """Overrides get_neighbors, so the kernel runs its per-move loops instead of the neighbour table."""
+
+    def get_neighbors(self, x, y, time_step=0):
+        return super().get_neighbors(x, y, time_step)
+
+CASES = list(scenarios(8))
+
+@pytest.mark.parametrize('start_time', [0, 3])
+@pytest.mark.parametrize('make', [
+    lambda env: UniformCostPlanner(env, bidirectional=False),
+    lambda env: AStarPlanner(env, bidirectional=False),
+    lambda env: LoopUniformCostPlanner(env, bidirectional=False),
+], ids=['uniform', 'astar', 'uniform-loops'])
+def test_cost_based_planners_are_optimal(make, start_time):
+    for env, queries in CASES:
+        planner = make(env)
+        for start, goal in queries:
+            path = planner.plan(start, goal, start_time)
+            assert path_cost(env, path, start, goal, start_time) == optimal_cost(env, start, goal, start_time)
+
+@pytest.mark.parametrize('start_time', [0, 3])
+def test_bfs_finds_fewest_moves(start_time):
+    for env, queries in CASES:
+        planner = BFSPlanner(env)
+        for start, goal in queries:
+            path = planner.plan(start, goal, start_time)
+            path_cost(env, path, start, goal, start_time)
+            moves = len(path) - 1 if path else None
+            assert moves == optimal_cost(env, start, goal, start_time, unit=True)
+
+def test_blocked_or_off_grid_goal_has_no_path():
+    env, _ = CASES[0]
+    planner = UniformCostPlanner(env, bidirectional=False)
+    assert planner.plan((0, 0), (env.width, 0)) == []
+    assert planner.plan((0, 0), (-1, 0)) == []
+
+@pytest.mark.parametrize('start, goal', [((-1, 0), (0, 0)), ((7, 7), (0, 0)), ((0, 0), (5, 0)), ((0, 0), (0, -1))])
+def test_off_grid_endpoints_are_not_aliased(start, goal):
+    env = GridEnvironment(5, 5)
+    planners = [BFSPlanner(env), UniformCostPlanner(env, bidirectional=False),
+                AStarPlanner(env, bidirectional=False), LoopUniformCostPlanner(env, bidirectional=False),
+                AnytimeAStarPlanner(env)]
+    for planner in planners:
+        assert planner.plan(start, goal) == []
+    costs = DistanceMatrixPlanner(env).one_to_many(start, [goal, (2, 2)])
+    assert costs[0] == float('inf')
+
+def test_start_equals_goal():
+    env, queries = CASES[0]
+    start = queries[0][0]
+    for planner in (BFSPlanner(env), UniformCostPlanner(env), AStarPlanner(env)):
+        assert planner.plan(start, start) == [start]
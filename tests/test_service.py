@@ -0,0 +1,92 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+from src.agent import calculate_path_cost
+from src.environment import load_map_from_file
+from src.map_cache import MapCache
+from src.planners.informed import AStarPlanner
+from src.service import PlanningService, send_queries
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAP = os.path.join(ROOT, 'maps', 'medium.map')
+
+def ask(service, *queries):
+    async def gather():
+        return await asyncio.gather(*(service.handle(query) for query in queries))
+    return asyncio.run(gather())
+
+def test_reply_matches_a_direct_search():
+    env = load_map_from_file(MAP)
+    expected = calculate_path_cost(env, AStarPlanner(env).plan((0, 0), (9, 9)))
+    service = PlanningService()
+    for start, goal in [([0, 0], [9, 9]), ('0,0', '9,9')]:
+        reply, = ask(service, {'map': MAP, 'start': start, 'goal': goal, 'planner': 'astar'})
+        assert reply['path_found'] and reply['path_cost'] == expected
+
+@pytest.mark.parametrize('query, message', [
+    ({'start': [-1, 0], 'goal': [9, 9], 'planner': 'astar'}, 'outside the'),
+    ({'start': [0, 0], 'goal': [7, 70], 'planner': 'bfs', 'stats': True}, 'outside the'),
+    ({'start': [0, 0], 'goal': [9, 9], 'planner': 'dijkstra'}, 'unknown planner'),
+    ({'start': 'a,b', 'goal': [9, 9], 'planner': 'astar'}, 'bad query'),
+    ({'goal': [9, 9], 'planner': 'astar'}, 'bad query'),
+])
+def test_bad_queries_get_an_error(query, message):
+    service = PlanningService()
+    reply, = ask(service, dict(query, map=MAP))
+    assert message in reply['error']
+    assert service.stats['errors'] == 1
+
+def test_identical_queries_in_flight_share_one_search():
+    service = PlanningService()
+    query = {'map': MAP, 'start': [0, 0], 'goal': [9, 9], 'planner': 'uniform'}
+    first, second = ask(service, query, dict(query))
+    assert first == second
+    assert service.stats['searches'] == 1 and service.stats['coalesced'] == 1
+
+def test_uses_the_given_cache():
+    cache = MapCache(max_maps=1)
+    service = PlanningService(cache)
+    ask(service, {'map': MAP, 'start': [0, 0], 'goal': [9, 9], 'planner': 'astar'},
+        {'map': os.path.join(ROOT, 'maps', 'small.map'), 'start': [0, 0], 'goal': [4, 4], 'planner': 'astar'})
+    assert service.cache is cache
+    assert cache.stats['loads'] == 2 and cache.stats['evictions'] == 1 and len(cache) == 1
+
+def test_socket_round_trip():
+    socket_path = os.path.join(tempfile.mkdtemp(), 'planning.sock')
+    service = PlanningService(workers=2)
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(service.serve(socket_path))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        for _ in range(200):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.01)
+        queries = [{'map': MAP, 'start': [0, 0], 'goal': [x, 9], 'planner': planner}
+                   for x in range(5, 10) for planner in ('astar', 'hpastar')]
+        replies = send_queries(socket_path, queries + [{'op': 'stats'}])
+        assert [reply['id'] for reply in replies] == list(range(len(queries) + 1))
+        assert all(reply['path_found'] for reply in replies[:-1])
+        assert replies[-1]['maps'] == 1
+    finally:
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join(0.1)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+def test_threads_build_one_engine_per_map():
+    env = load_map_from_file(MAP)
+    engines = []
+    threads = [threading.Thread(target=lambda: engines.append(env.compile().neighbor_table())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(table) for table in engines}) == 1
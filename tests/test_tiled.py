@@ -0,0 +1,57 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from environment import load_map_from_file
+from map_format import sections_from_environment, write_binary_map
+from planners.uninformed import UniformCostPlanner
+from tiled import TiledGridEnvironment
+from tests.reference import path_cost, scenarios
+
+def all_costs(env, times=range(10)):
+    return [[env.get_cost(x, y, t) for y in range(env.height) for x in range(env.width)] for t in times]
+
+@pytest.fixture(params=[0, 1, 2])
+def pair(request, tmp_path):
+    """An in-memory and a tiled environment loaded from one binary map, with
+    tiles that do not divide the map and a cache of only a few tiles."""
+    env, queries = list(scenarios(request.param + 1, size=13))[request.param]
+    map_file = str(tmp_path / 'scenario.bin')
+    write_binary_map(sections_from_environment(env), map_file)
+    tiled = TiledGridEnvironment(map_file, tile_size=4, cache_bytes=3 * 4 * 4 * 4)
+    return load_map_from_file(map_file), tiled, queries
+
+def test_costs_match_the_in_memory_map(pair):
+    dense, tiled, _ = pair
+    assert all_costs(tiled) == all_costs(dense)
+    assert tiled.tile_stats()['evictions'] > 0
+    rng = np.random.default_rng(0)
+    xs, ys, times = rng.integers(0, 13, 200), rng.integers(0, 13, 200), rng.integers(0, 10, 200)
+    assert np.array_equal(tiled.get_costs(xs, ys, 3), dense.get_costs(xs, ys, 3))
+    assert np.array_equal(tiled.costs_along(xs, ys, times), dense.costs_along(xs, ys, times))
+
+def test_edits_survive_eviction(pair):
+    dense, tiled, _ = pair
+    rng = np.random.default_rng(1)
+    for env in (dense, tiled):
+        env.compile()
+    for _ in range(5):
+        x, y, cost = int(rng.integers(13)), int(rng.integers(13)), int(rng.choice([1, 3, 15]))
+        dense.set_terrain_cost(x, y, cost)
+        tiled.set_terrain_cost(x, y, cost)
+        xs, ys, costs = rng.integers(0, 13, 20), rng.integers(0, 13, 20), rng.choice([1, 10, 9999], 20)
+        dense.set_terrain_costs(xs, ys, costs)
+        tiled.set_terrain_costs(xs, ys, costs)
+        # Touch every tile so clean ones are evicted
+        all_costs(tiled, [0])
+    assert all_costs(tiled) == all_costs(dense)
+    assert all_costs(pickle.loads(pickle.dumps(tiled))) == all_costs(dense)
+
+def test_planners_agree(pair):
+    dense, tiled, queries = pair
+    for start, goal in queries:
+        for start_time in (0, 3):
+            paths = [UniformCostPlanner(env).plan(start, goal, start_time) for env in (dense, tiled)]
+            assert path_cost(tiled, paths[1], start, goal, start_time) == \
+                path_cost(dense, paths[0], start, goal, start_time)
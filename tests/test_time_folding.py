@@ -0,0 +1,35 @@
+import pytest
+
+from planners.uninformed import UniformCostPlanner
+from tests.reference import optimal_cost, path_cost, scenarios
+
+CASES = list(scenarios(6))
+
+def test_folded_time_has_the_same_costs():
+    for env, _ in CASES:
+        engine = env.compile()
+        for t in range(engine.last_change + 3 * engine.period + 5):
+            folded = engine.fold_time(t)
+            assert folded <= t
+            assert all(env.get_cost(x, y, t) == env.get_cost(x, y, folded)
+                       for y in range(env.height) for x in range(env.width))
+
+@pytest.mark.parametrize('start_time', [0, 5, 40])
+def test_folding_keeps_costs_optimal(start_time):
+    for env, queries in CASES:
+        folded = UniformCostPlanner(env, fold_time=True, bidirectional=False)
+        unfolded = UniformCostPlanner(env, fold_time=False, bidirectional=False)
+        for start, goal in queries:
+            expected = optimal_cost(env, start, goal, start_time)
+            assert path_cost(env, folded.plan(start, goal, start_time), start, goal, start_time) == expected
+            assert path_cost(env, unfolded.plan(start, goal, start_time), start, goal, start_time) == expected
+
+@pytest.mark.parametrize('start_time', [0, 5])
+def test_waiting_is_optimal_and_never_costs_more(start_time):
+    for env, queries in CASES:
+        planner = UniformCostPlanner(env, allow_wait=True, bidirectional=False)
+        for start, goal in queries:
+            cost = path_cost(env, planner.plan(start, goal, start_time), start, goal, start_time)
+            assert cost == optimal_cost(env, start, goal, start_time, allow_wait=True)
+            moving_only = optimal_cost(env, start, goal, start_time)
+            assert moving_only is None or cost <= moving_only